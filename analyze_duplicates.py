@@ -5,6 +5,8 @@
 import json
 from collections import defaultdict, Counter
 
+from scraper.dedup import DedupIndex
+
 def analyze_duplicates():
     """重複状況を分析"""
     
@@ -31,6 +33,7 @@ def analyze_duplicates():
                     all_records.append({
                         'company_name': record.get('company_name', ''),
                         'official_site_url': record.get('official_site_url', ''),
+                        'address': record.get('address', ''),
                         'category_group': record.get('category_group', ''),
                         'category_name': record.get('category_name', '')
                     })
@@ -93,6 +96,30 @@ def analyze_duplicates():
             if len(names) > 5:
                 print(f"         他{len(names)-5}個")
     
+    # URL正規化・社名あいまい一致による重複
+    print("\n" + "="*60)
+    print("正規化後の重複分析:")
+    index = DedupIndex()
+    index.extend(record for record in all_records if record['official_site_url'].strip())
+    
+    url_groups = index.url_groups()
+    print(f"  正規化URL数: {len(index.by_url):,}社（生URLより {len(url_counts) - len(index.by_url):,}社少ない）")
+    print(f"  表記ゆれで別扱いになっていたURL: {len(url_groups):,}組")
+    for indexes in url_groups[:10]:
+        raw_urls = sorted({index.records[i]['official_site_url'].strip() for i in indexes})
+        print(f"    {index.records[indexes[0]]['company_name']}: {' / '.join(raw_urls)}")
+    
+    name_matches = index.name_matches()
+    print(f"\n  社名が近い別URLの企業（住所一致またはドメイン類似）: {len(name_matches):,}組")
+    for key_a, key_b, ratio, reason in sorted(name_matches, key=lambda x: -x[2])[:10]:
+        name_a = index.records[index.by_url[key_a][0]]['company_name']
+        name_b = index.records[index.by_url[key_b][0]]['company_name']
+        label = '住所一致' if reason == 'address' else 'ドメイン類似'
+        print(f"    {name_a} ({key_a}) ≒ {name_b} ({key_b}) [類似度 {ratio:.2f}, {label}]")
+    
+    merged = len(index.by_url) - sum(len(c) - 1 for c in _key_clusters(index))
+    print(f"\n  統合後の推定企業数: {merged:,}社")
+    
     # 理論値の計算
     print("\n="*60)
     print("理論値計算:")
@@ -112,5 +139,14 @@ def analyze_duplicates():
     
     print("="*80)
 
+def _key_clusters(index):
+    """URLキー単位のクラスタ（2キー以上をまとめたもの）"""
+    clusters = []
+    for members in index.clusters():
+        keys = {index.url_keys[i] for i in members}
+        if len(keys) > 1:
+            clusters.append(keys)
+    return clusters
+
 if __name__ == "__main__":
     analyze_duplicates()
\ No newline at end of file
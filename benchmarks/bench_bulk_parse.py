@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+複数ページの一括パース（1プロセスで順に / スレッドプール / bs4.bulk のプロセスプール）
+"""
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+from bs4.bulk import BulkParser
+
+HOME_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'home')
+
+
+def extract_links(soup):
+    """ワーカー側で実行する抽出関数（プロセス間で受け渡せるようモジュール直下に置く）"""
+    return [(a['href'], a.get_text(strip=True)) for a in soup.find_all('a', href=True)]
+
+
+def _parse(document):
+    return extract_links(BeautifulSoup(document, 'html.parser'))
+
+
+def bench_bulk_parse(pages=100, workers=None, chunksizes=(1, 4, 16)):
+    """フィクスチャを pages ページ分に複製し、方式ごとの処理時間（ページ/秒）を計測"""
+    paths = sorted(glob.glob(os.path.join(HOME_FIXTURE_DIR, '*.html')))
+    if not paths:
+        print("フィクスチャがありません（python -m benchmarks.make_fixtures）")
+        return []
+    fixtures = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            fixtures.append(f.read())
+    documents = [fixtures[i % len(fixtures)] for i in range(pages)]
+    workers = workers or os.cpu_count() or 1
+
+    print("="*80)
+    print(f"一括パース: {pages}ページ, ワーカー {workers}（CPU {os.cpu_count()}）")
+    print("="*80)
+
+    results = []
+    expected = None
+
+    def run(label, func):
+        nonlocal expected
+        start = time.perf_counter()
+        links = func()
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            expected = links
+        assert links == expected, label
+        print(f"  {label:<28}{elapsed:>8.2f}秒{pages / elapsed:>10.1f}ページ/秒")
+        results.append({'method': label, 'seconds': elapsed, 'pages_per_second': pages / elapsed})
+
+    run("1プロセスで順に", lambda: [_parse(d) for d in documents])
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        run(f"スレッド×{workers}", lambda: list(executor.map(_parse, documents)))
+    for chunksize in chunksizes:
+        with BulkParser(extract_links, 'html.parser', max_workers=workers, chunksize=chunksize) as parser:
+            # プロセス起動の時間は含めない（ワーカーは使い回される）
+            list(parser.map(documents[:workers]))
+            run(f"BulkParser chunksize={chunksize}", lambda: list(parser.map(documents)))
+    return results
+
+
+if __name__ == "__main__":
+    bench_bulk_parse()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+問い合わせキーワード判定のベンチマーク（キーワードごとの部分文字列検索 vs 一括照合）
+"""
+import csv
+import glob
+import os
+import time
+
+from scraper.contact_engine import (
+    CONTACT_KEYWORDS, CONTACT_WEIGHTS, EXCLUDE_KEYWORDS, contact_match, is_contact_url
+)
+from scraper.keyword_matcher import KeywordMatch
+from scraper.parsing import ANCHOR_STRAINER, make_soup
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOME_FIXTURE_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fixtures', 'home')
+ANCHOR_CSVS = ['contact_summary_*.csv', 'contact_urls_test_*.csv']
+
+
+def legacy_is_contact_url(url, text=''):
+    """旧実装（除外→問い合わせの順にキーワードごとに in で検索）"""
+    url_lower = url.lower()
+    text_lower = text.lower()
+
+    for keyword in EXCLUDE_KEYWORDS:
+        if keyword in url_lower or keyword in text_lower:
+            return False
+
+    for keyword in CONTACT_KEYWORDS:
+        if keyword in url_lower or keyword in text_lower:
+            return True
+
+    return False
+
+
+def legacy_contact_match(url, text=''):
+    """旧方式で重み付きスコアを出す場合（全キーワードを in で検索）"""
+    url_lower = url.lower()
+    text_lower = text.lower()
+    matched = [k for k in CONTACT_KEYWORDS if k in url_lower or k in text_lower]
+    excluded = any(k in url_lower or k in text_lower for k in EXCLUDE_KEYWORDS)
+    return KeywordMatch(sum(CONTACT_WEIGHTS[k] for k in matched), matched, excluded)
+
+
+def harvest_csv_anchors():
+    """保存済みCSVから (URL, リンクテキスト) を集める"""
+    anchors = []
+    for pattern in ANCHOR_CSVS:
+        for path in sorted(glob.glob(os.path.join(ROOT_DIR, pattern))):
+            with open(path, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    anchors.append((row['official_site_url'], row['company_name']))
+                    if row.get('contact_url'):
+                        anchors.append((row['contact_url'], ''))
+    return anchors
+
+
+def harvest_fixture_anchors():
+    """企業サイトのフィクスチャから (href, リンクテキスト) を集める"""
+    anchors = []
+    for path in sorted(glob.glob(os.path.join(HOME_FIXTURE_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            soup = make_soup(f.read(), parse_only=ANCHOR_STRAINER)
+        for link in soup.find_all('a', href=True):
+            anchors.append((link['href'], link.get_text(strip=True)))
+    return anchors
+
+
+def _best_of(func, repeat):
+    """repeat回実行した最短時間（ミリ秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_keywords(repeat=5):
+    """アンカー集合ごとに判定時間を計測"""
+    datasets = [
+        ('csv', harvest_csv_anchors()),
+        ('home', harvest_fixture_anchors()),
+    ]
+
+    print("="*80)
+    print("問い合わせキーワード判定ベンチマーク（マイクロ秒/アンカー, best of %d）" % repeat)
+    print("="*80)
+    print(f"{'anchors':<10}{'count':>10}{'hits':>8}{'legacy':>10}{'matcher':>10}{'speedup':>10}"
+          f"{'legacy+score':>14}{'score':>10}{'speedup':>10}")
+
+    results = []
+    for name, anchors in datasets:
+        if not anchors:
+            print(f"{name:<10}{'(なし)':>10}")
+            continue
+
+        legacy = [legacy_is_contact_url(url, text) for url, text in anchors]
+        compiled = [is_contact_url(url, text) for url, text in anchors]
+        assert legacy == compiled, f"判定結果が一致しません: {name}"
+        for url, text in anchors:
+            assert legacy_contact_match(url, text) == contact_match(url, text), f"スコアが一致しません: {url}"
+
+        legacy_ms = _best_of(lambda: [legacy_is_contact_url(u, t) for u, t in anchors], repeat)
+        matcher_ms = _best_of(lambda: [is_contact_url(u, t) for u, t in anchors], repeat)
+        legacy_score_ms = _best_of(lambda: [legacy_contact_match(u, t) for u, t in anchors], repeat)
+        score_ms = _best_of(lambda: [contact_match(u, t) for u, t in anchors], repeat)
+
+        per = 1000 / len(anchors)
+        print(f"{name:<10}{len(anchors):>10,}{sum(compiled):>8,}{legacy_ms * per:>10.2f}"
+              f"{matcher_ms * per:>10.2f}{legacy_ms / matcher_ms:>9.1f}x"
+              f"{legacy_score_ms * per:>14.2f}{score_ms * per:>10.2f}{legacy_score_ms / score_ms:>9.1f}x")
+        results.append({
+            'anchors': name,
+            'count': len(anchors),
+            'hits': sum(compiled),
+            'legacy_ms': legacy_ms,
+            'matcher_ms': matcher_ms,
+            'legacy_score_ms': legacy_score_ms,
+            'score_ms': score_ms,
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    bench_keywords()
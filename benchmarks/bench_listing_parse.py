@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+一覧ページ抽出のベンチマーク（旧実装 vs 抽出プラン）
+"""
+import glob
+import os
+import time
+import warnings
+
+from bs4 import BeautifulSoup
+
+from scraper.yuryoweb_scraper import YuryoWebScraper
+from scraper.listing_parser import parse_listing
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'listing')
+
+
+def _best_of(func, repeat):
+    """repeat回実行した最短時間（ミリ秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_listing_parse(repeat=20):
+    """フィクスチャごとに木構築と抽出の時間を計測"""
+    warnings.simplefilter('ignore')
+    scraper = YuryoWebScraper()
+    paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html')))
+    if not paths:
+        print("フィクスチャがありません: python -m benchmarks.make_fixtures を実行してください")
+        return []
+
+    print("="*80)
+    print("一覧ページ抽出ベンチマーク（ミリ秒/ページ, best of %d）" % repeat)
+    print("="*80)
+    print(f"{'fixture':<14}{'size':>10}{'tree':>10}{'legacy':>10}{'plan':>10}{'speedup':>10}")
+
+    results = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        soup = BeautifulSoup(content, 'html.parser')
+
+        legacy_items = scraper._parse_listing_page_legacy(content)
+        plan_items = scraper._parse_listing_page(content)
+        assert legacy_items == plan_items, f"抽出結果が一致しません: {path}"
+
+        tree_ms = _best_of(lambda: BeautifulSoup(content, 'html.parser'), repeat)
+
+        def legacy():
+            items = soup.find_all('div', class_='company-item')
+            if not items:
+                items = soup.find_all('article', class_='company')
+            if not items:
+                items = soup.find_all('li', class_='company-list-item')
+            for item in items:
+                scraper._extract_company_info(item)
+            scraper._has_next_page(soup)
+
+        legacy_ms = _best_of(legacy, repeat)
+        plan_ms = _best_of(lambda: parse_listing(soup, scraper.base_url), repeat)
+
+        name = os.path.basename(path)
+        print(f"{name:<14}{len(content):>10,}{tree_ms:>10.2f}{legacy_ms:>10.2f}{plan_ms:>10.2f}{legacy_ms / plan_ms:>9.1f}x")
+        results.append({
+            'fixture': name,
+            'bytes': len(content),
+            'tree_ms': tree_ms,
+            'legacy_extract_ms': legacy_ms,
+            'plan_extract_ms': plan_ms,
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    bench_listing_parse()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+bs4 の木のノードあたりメモリとパース時間（企業サイトのトップページ, html.parser）
+
+    python -m benchmarks.bench_node_memory            # 現在の bs4 のみ
+    python -m benchmarks.bench_node_memory <rev>      # git の <rev> 時点の bs4 と比較
+
+比較時は <rev> の bs4/ を一時ディレクトリに展開し、別プロセスで同じ計測を行う。
+"""
+import gc
+import glob
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOME_FIXTURE_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fixtures', 'home')
+# 別プロセスの結果を受け取るときの行頭マーカー
+RESULT_PREFIX = 'NODE_MEMORY'
+
+
+def _best_of(func, repeat):
+    """repeat回実行した最短時間（ミリ秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def load_documents():
+    documents = []
+    for path in sorted(glob.glob(os.path.join(HOME_FIXTURE_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            documents.append((os.path.basename(path), f.read()))
+    return documents
+
+
+def measure(documents, repeat):
+    """ページごとに (タグ数, 文字列数, 木が保持するバイト数, パース時間ms) を計測"""
+    from bs4 import BeautifulSoup, Tag
+
+    warnings.simplefilter('ignore')
+    rows = []
+    for _, document in documents:
+        gc.collect()
+        tracemalloc.start()
+        soup = BeautifulSoup(document, 'html.parser')
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        tags = strings = 0
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                tags += 1
+            else:
+                strings += 1
+        soup.decompose()
+        del soup
+        parse_ms = _best_of(lambda: BeautifulSoup(document, 'html.parser'), repeat)
+        rows.append((tags, strings, retained, parse_ms))
+    return rows
+
+
+def measure_revision(rev, documents, repeat):
+    """git の rev 時点の bs4 で measure() を別プロセス実行する"""
+    archive = subprocess.run(
+        ['git', 'archive', rev, 'bs4'], cwd=ROOT_DIR, capture_output=True, check=True
+    ).stdout
+    with tempfile.TemporaryDirectory() as tmp:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(tmp)
+        # cwd（一時ディレクトリ）の bs4 が ROOT_DIR の bs4 より先に見つかるよう、ROOT_DIR は末尾に足す
+        script = (
+            f"import sys; sys.path.append({ROOT_DIR!r}); "
+            f"from benchmarks.bench_node_memory import child_main; child_main({repeat})"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', script], cwd=tmp, capture_output=True, text=True, check=True
+        ).stdout
+    rows = []
+    for line in output.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            tags, strings, retained, parse_ms = line.split()[1:]
+            rows.append((int(tags), int(strings), int(retained), float(parse_ms)))
+    return rows
+
+
+def _print_rows(label, documents, rows):
+    print(f"\n{label}")
+    print(f"  {'page':<14}{'KB':>6}{'tags':>7}{'strs':>7}{'木KB':>8}{'B/node':>8}{'ms':>9}")
+    for (name, document), (tags, strings, retained, parse_ms) in zip(documents, rows):
+        print(
+            f"  {name:<14}{len(document) // 1024:>6}{tags:>7}{strings:>7}"
+            f"{retained // 1024:>8}{retained // (tags + strings):>8}{parse_ms:>9.1f}"
+        )
+
+
+def _totals(rows):
+    nodes = sum(tags + strings for tags, strings, _, _ in rows)
+    retained = sum(r for _, _, r, _ in rows)
+    parse_ms = sum(ms for _, _, _, ms in rows)
+    return retained / nodes, parse_ms
+
+
+def bench_node_memory(baseline=None, repeat=5):
+    """現在の bs4（と baseline 時点の bs4）のノードあたりメモリとパース時間を表示"""
+    documents = load_documents()
+    if not documents:
+        print("フィクスチャがありません（python -m benchmarks.make_fixtures）")
+        return None
+
+    print("="*80)
+    print(f"bs4 ノードあたりメモリ / パース時間（html.parser, best of {repeat}）")
+    print("="*80)
+
+    current = measure(documents, repeat)
+    _print_rows("現在の bs4", documents, current)
+    per_node, parse_ms = _totals(current)
+    result = {'bytes_per_node': per_node, 'parse_ms': parse_ms}
+
+    if baseline:
+        before = measure_revision(baseline, documents, repeat)
+        _print_rows(f"{baseline} 時点の bs4", documents, before)
+        before_per_node, before_ms = _totals(before)
+        print(f"\nノードあたり: {before_per_node:.0f}B → {per_node:.0f}B "
+              f"({(per_node / before_per_node - 1) * 100:+.1f}%)")
+        print(f"パース時間合計: {before_ms:.0f}ms → {parse_ms:.0f}ms "
+              f"({(parse_ms / before_ms - 1) * 100:+.1f}%)")
+        result.update({'baseline_bytes_per_node': before_per_node, 'baseline_parse_ms': before_ms})
+    return result
+
+
+def child_main(repeat):
+    """measure_revision() から別プロセスで呼ばれる"""
+    for row in measure(load_documents(), repeat):
+        print(RESULT_PREFIX, *row)
+
+
+if __name__ == "__main__":
+    bench_node_memory(sys.argv[1] if len(sys.argv) > 1 else None)
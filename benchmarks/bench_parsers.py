@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+パーサーバックエンド比較（html.parser / lxml / html5lib × 全体 / parse_only）
+"""
+import glob
+import os
+import time
+import warnings
+
+from scraper.parsing import (
+    ANCHOR_STRAINER,
+    LISTING_STRAINER,
+    available_parsers,
+    make_soup,
+)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# (フィクスチャ種別, parse_only で使うストレーナー)
+SUITES = [
+    ('listing', LISTING_STRAINER),
+    ('home', ANCHOR_STRAINER),
+]
+
+
+def _best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_parsers(repeat=5, parsers=None):
+    """フィクスチャ種別ごとに各バックエンドの平均パース時間（ミリ秒/ページ）を計測"""
+    warnings.simplefilter('ignore')
+    parsers = parsers or available_parsers()
+    results = []
+
+    print("="*80)
+    print(f"パーサーバックエンド比較（ミリ秒/ページ, best of {repeat}）")
+    print(f"利用可能: {', '.join(parsers)}")
+    print("="*80)
+
+    for kind, strainer in SUITES:
+        paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, kind, '*.html')))
+        if not paths:
+            print(f"\n{kind}: フィクスチャがありません（python -m benchmarks.make_fixtures）")
+            continue
+        documents = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                documents.append(f.read())
+        total_kb = sum(len(d) for d in documents) / 1024 / len(documents)
+
+        print(f"\n{kind}: {len(documents)}ページ（平均 {total_kb:.0f}KB）")
+        print(f"  {'parser':<14}{'full':>10}{'parse_only':>12}{'anchors':>10}")
+        for parser in parsers:
+            full_ms = sum(_best_of(lambda: make_soup(d, parser), repeat) for d in documents) / len(documents)
+            strained_ms = sum(
+                _best_of(lambda: make_soup(d, parser, parse_only=strainer), repeat) for d in documents
+            ) / len(documents)
+            anchors = len(make_soup(documents[0], parser, parse_only=strainer).find_all('a'))
+            label = parser if parser != 'html5lib' else 'html5lib*'
+            print(f"  {label:<14}{full_ms:>10.2f}{strained_ms:>12.2f}{anchors:>10}")
+            results.append({
+                'fixture': kind,
+                'parser': parser,
+                'full_ms': full_ms,
+                'parse_only_ms': strained_ms,
+            })
+
+    if 'html5lib' in parsers:
+        print("\n* html5lib は parse_only 非対応のため常に全体をパース")
+    return results
+
+
+if __name__ == "__main__":
+    bench_parsers()
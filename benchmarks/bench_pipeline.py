@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+スクレイピングパイプラインのベンチマーク（ローカルのフィクスチャサーバーに対して
+一覧取得 → 問い合わせURL抽出 → マージを計測）
+
+各段階は子プロセスで実行し、段階ごとのピークRSSを取る。
+"""
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import warnings
+
+from benchmarks.fixture_server import FixtureServer
+from scraper.company_store import CATEGORY_GROUPS, CompanyStore
+from scraper.contact_engine import ContactEngine
+from scraper.listing_parser import parse_listing
+from scraper.parsing import LISTING_STRAINER, make_soup
+from scraper.yuryoweb_scraper import YuryoWebScraper
+
+
+def _best_of(func, repeat):
+    """repeat回実行した最短時間（ミリ秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _peak_rss_mb() -> float:
+    """このプロセスのピークRSS（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux はKB、macOS はバイト単位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def stage_scrape(base_url, listing_pages, categories=20, concurrency=8):
+    """一覧ページの並行取得（crawl_categories）"""
+    warnings.simplefilter('ignore')
+    scraper = YuryoWebScraper(delay_seconds=0)
+    scraper.base_url = base_url
+
+    parse_ms = sum(
+        _best_of(lambda: scraper._parse_listing_page(content), 5) for content in listing_pages
+    ) / len(listing_pages)
+
+    targets = [
+        {'group': 'area', 'name': f'bench{i}', 'url': f'{base_url}/search?area=bench{i}'}
+        for i in range(categories)
+    ]
+    start = time.perf_counter()
+    records = list(scraper.crawl_categories(targets, concurrency=concurrency, rate_per_host=10000))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'items': len(records),
+        'seconds': elapsed,
+        'parse_ms': parse_ms,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def stage_contacts(base_url, home_pages, sites=200, concurrency=32):
+    """企業サイトからの問い合わせURL抽出（ContactEngine）"""
+    warnings.simplefilter('ignore')
+    with ContactEngine(
+        timeout=10, concurrency=concurrency, per_domain=concurrency, max_contacts=5, progress_every=0
+    ) as engine:
+        def parse(content):
+            soup = make_soup(content, parse_only=engine.strainer)
+            engine.find_contact_urls(soup, base_url + '/')
+
+        parse_ms = sum(_best_of(lambda: parse(content), 3) for content in home_pages) / len(home_pages)
+
+        companies = [
+            {'company_name': f'ベンチ{i}', 'official_site_url': f'{base_url}/site/{i}/'}
+            for i in range(sites)
+        ]
+        start = time.perf_counter()
+        results = list(engine.run(companies))
+        elapsed = time.perf_counter() - start
+
+    return {
+        'items': len(results),
+        'found': sum(1 for r in results if r['contact_count']),
+        'errors': sum(1 for r in results if r['status'] != 'success'),
+        'seconds': elapsed,
+        'parse_ms': parse_ms,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _merge_records(listing_pages, records):
+    """一覧フィクスチャの企業を元に、カテゴリ別JSONと同じ形のレコードを作る"""
+    base = []
+    for content in listing_pages:
+        items, _ = parse_listing(make_soup(content, parse_only=LISTING_STRAINER), 'https://yuryoweb.com')
+        base.extend(items)
+    # 1社が平均4カテゴリに現れる程度に企業を増やす
+    distinct = max(len(base), records // 4)
+    for i in range(records):
+        company = base[i % len(base)]
+        number = i % distinct
+        group = CATEGORY_GROUPS[i % len(CATEGORY_GROUPS)]
+        yield {
+            'company_name': company.get('company_name', ''),
+            'official_site_url': f'https://bench{number}.example.jp/',
+            'yuryoweb_url': company.get('yuryoweb_url', ''),
+            'address': company.get('address', ''),
+            'category_group': group,
+            'category_name': f'{group}{i % 17}',
+        }
+
+
+def stage_merge(listing_pages, records=50000):
+    """カテゴリ別レコードの企業ストアへのマージとCSV書き出し"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with CompanyStore(os.path.join(tmp, 'bench.sqlite3')) as store:
+            start = time.perf_counter()
+            result = store.upsert_records(_merge_records(listing_pages, records))
+            merge_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            written = store.write_csv(os.path.join(tmp, 'bench.csv'))
+            csv_seconds = time.perf_counter() - start
+
+    return {
+        'items': result['records'],
+        'companies': written,
+        'seconds': merge_seconds,
+        'csv_seconds': csv_seconds,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _run_isolated(func, *args):
+    """func を子プロセスで実行する（ピークRSSを段階ごとに分けるため）"""
+    method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+    with multiprocessing.get_context(method).Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def bench_pipeline(categories=20, sites=200, merge_records=50000, latency=0.0, isolate=True):
+    """各段階のスループット・パース時間・ピークRSSを計測"""
+    run = _run_isolated if isolate else (lambda func, *args: func(*args))
+
+    with FixtureServer(latency=latency) as server:
+        print("="*80)
+        print("スクレイピングパイプライン ベンチマーク")
+        print(f"フィクスチャサーバー: {server.base_url}（遅延 {latency * 1000:.0f}ms）")
+        print("="*80)
+        print(f"{'stage':<10}{'items':>10}{'pages':>8}{'sec':>8}{'pages/s':>10}{'items/s':>10}"
+              f"{'parse ms':>10}{'peak MB':>9}")
+
+        results = {}
+
+        server.reset()
+        scrape = run(stage_scrape, server.base_url, server.listing_pages, categories)
+        scrape['pages'] = server.hits['listing']
+        results['scrape'] = scrape
+
+        server.reset()
+        contacts = run(stage_contacts, server.base_url, server.home_pages, sites)
+        contacts['pages'] = sum(server.hits.values())
+        results['contacts'] = contacts
+
+        merge = run(stage_merge, server.listing_pages, merge_records)
+        merge['pages'] = 0
+        results['merge'] = merge
+
+    for name, result in results.items():
+        seconds = result['seconds'] or float('inf')
+        pages_rate = f"{result['pages'] / seconds:>10.1f}" if result['pages'] else f"{'-':>10}"
+        parse_ms = f"{result['parse_ms']:>10.2f}" if 'parse_ms' in result else f"{'-':>10}"
+        print(f"{name:<10}{result['items']:>10,}{result['pages']:>8,}{result['seconds']:>8.2f}{pages_rate}"
+              f"{result['items'] / seconds:>10.1f}{parse_ms}{result['peak_rss_mb']:>9.1f}")
+
+    print(f"\n問い合わせURL発見: {contacts['found']:,}/{contacts['items']:,}（エラー {contacts['errors']:,}）")
+    print(f"マージ後企業数: {merge['companies']:,}（CSV書き出し {merge['csv_seconds']:.2f}秒）")
+    return results
+
+
+if __name__ == "__main__":
+    bench_pipeline()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用のローカルフィクスチャサーバー（保存済みの一覧ページ・企業サイトを返す）
+"""
+import glob
+import os
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 企業サイト内の問い合わせページ・下層ページ（どのパスでも同じ小さなページを返す）
+SUBPAGE_HTML = '''<!DOCTYPE html>
+<html lang="ja"><head><meta charset="UTF-8"><title>お問い合わせ</title></head>
+<body><h1>お問い合わせ</h1>
+<form action="/send.php" method="post">
+<label>お名前<input type="text" name="name"></label>
+<label>お問い合わせ内容<textarea name="message"></textarea></label>
+<button type="submit">送信</button></form>
+<footer><a href="/">トップ</a></footer></body></html>
+'''.encode('utf-8')
+
+EMPTY_LISTING_HTML = '''<!DOCTYPE html>
+<html lang="ja"><head><meta charset="UTF-8"><title>ホームページ制作会社一覧</title></head>
+<body><main><div class="company-list"></div></main></body></html>
+'''.encode('utf-8')
+
+SITE_PATH_RE = re.compile(r'^/site/(\d+)/?$')
+
+
+def _load(kind: str, fixture_dir: str):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, kind, '*.html')),
+                       key=lambda p: int(re.sub(r'\D', '', os.path.basename(p)) or 0)):
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    return pages
+
+
+class FixtureServer:
+    """フィクスチャを返すHTTPサーバーを別スレッドで起動する
+
+    - /search?...&page=N      … 一覧ページ N（フィクスチャが尽きたら空の一覧）
+    - /site/<番号>/           … 企業サイトのトップページ（フィクスチャを順に割り当て）
+    - *.xml                   … 404（sitemap.xml 等は無い扱い）
+    - それ以外                … 問い合わせフォームのある小さなページ
+    latency（秒）を指定すると各レスポンスの前に待つ（回線遅延の模擬）。
+    """
+
+    def __init__(self, fixture_dir: str = FIXTURE_DIR, latency: float = 0.0):
+        self.listing_pages = _load('listing', fixture_dir)
+        self.home_pages = _load('home', fixture_dir)
+        if not self.listing_pages or not self.home_pages:
+            raise FileNotFoundError(
+                f"フィクスチャがありません: {fixture_dir}（python -m benchmarks.make_fixtures を実行してください）"
+            )
+        self.latency = latency
+        self.hits = Counter()
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def site_url(self, number: int) -> str:
+        return f'{self.base_url}/site/{number}/'
+
+    def reset(self):
+        with self.lock:
+            self.hits.clear()
+            self.bytes_sent = 0
+
+    def _route(self, path: str):
+        """(種別, ステータス, 本文) を返す"""
+        parsed = urlparse(path)
+        if parsed.path == '/search':
+            page = int(parse_qs(parsed.query).get('page', ['1'])[0])
+            if 1 <= page <= len(self.listing_pages):
+                return 'listing', 200, self.listing_pages[page - 1]
+            return 'listing', 200, EMPTY_LISTING_HTML
+        match = SITE_PATH_RE.match(parsed.path)
+        if match:
+            return 'home', 200, self.home_pages[int(match.group(1)) % len(self.home_pages)]
+        if parsed.path.endswith('.xml'):
+            return 'missing', 404, b''
+        return 'subpage', 200, SUBPAGE_HTML
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                kind, status, body = server._route(self.path)
+                if server.latency:
+                    time.sleep(server.latency)
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server.lock:
+                    server.hits[kind] += 1
+                    server.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
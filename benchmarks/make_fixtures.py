@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用の一覧ページフィクスチャを保存済みCSVから生成
+"""
+import csv
+import html
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SOURCE_CSV = 'yuryoweb_final_complete_20250814_001100.csv'
+ITEMS_PER_PAGE = 20
+LISTING_PAGES = 5
+HOME_PAGES = 5
+
+
+def load_companies(csv_path=SOURCE_CSV, limit=None):
+    companies = []
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            companies.append(row)
+            if limit and len(companies) >= limit:
+                break
+    return companies
+
+
+def _nav_links(rng):
+    areas = ['東京都', '大阪府', '愛知県', '福岡県', '北海道', '神奈川県', '埼玉県', '千葉県', '兵庫県', '京都府']
+    links = []
+    for i in range(120):
+        name = f'{rng.choice(areas)}のホームページ制作会社{i}'
+        links.append(f'<li><a href="/search?area={i}">{html.escape(name)}</a></li>')
+    return '\n'.join(links)
+
+
+def _item(company, rng):
+    name = html.escape(company['company_name'])
+    site = html.escape(company['official_site_url'])
+    detail = html.escape(company['yuryoweb_url'].replace('https://yuryoweb.com', '').replace('/company_info/', '/company/'))
+    address = html.escape(company['address'] or '東京都 渋谷区')
+    tags = ''.join(
+        f'<li class="tag">{html.escape(t)}</li>'
+        for t in (company['industry_categories'] or '').split('｜')[:6] if t
+    )
+    description = '弊社はWEBサイト制作を中心に、企画・デザイン・運用まで一貫して対応しています。' * rng.randint(2, 5)
+    return f'''
+<div class="company-item" data-id="{rng.randint(1000, 99999)}">
+  <div class="company-header">
+    <h3 class="company-title"><a href="{detail}">{name}</a></h3>
+    <span class="rating">★★★★☆ <small>({rng.randint(1, 40)}件)</small></span>
+  </div>
+  <div class="company-body">
+    <img src="/img/thumb/{rng.randint(1, 9999)}.jpg" alt="{name}" loading="lazy">
+    <p class="description">{description}</p>
+    <ul class="tags">{tags}</ul>
+    <dl class="company-meta">
+      <dt>所在地</dt><dd><span class="addr">{address}</span></dd>
+      <dt>制作実績</dt><dd>{rng.randint(10, 900)}件</dd>
+    </dl>
+  </div>
+  <div class="company-links">
+    <a class="btn" href="{site}" target="_blank" rel="noopener">公式サイト</a>
+    <a class="btn" href="{detail}">詳細を見る</a>
+  </div>
+  <!-- company-item end -->
+</div>'''
+
+
+def listing_page(companies, page, pages, rng):
+    items = '\n'.join(_item(company, rng) for company in companies)
+    pager = ''.join(
+        f'<span class="current">{p}</span>' if p == page else f'<a href="?page={p}">{p}</a>'
+        for p in range(1, pages + 1)
+    )
+    next_link = f'<a class="next" href="?page={page + 1}">次へ →</a>' if page < pages else ''
+    return f'''<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="UTF-8">
+<title>ホームページ制作会社一覧 | 優良WEB</title>
+<script>window.dataLayer = window.dataLayer || []; function gtag(){{dataLayer.push(arguments);}}</script>
+<style>.company-item {{ margin: 0 0 24px; }} .tag {{ display: inline-block; }}</style>
+</head>
+<body>
+<header class="site-header"><a href="/"><img src="/logo.png" alt="優良WEB"></a>
+<nav class="global-nav"><ul>{_nav_links(rng)}</ul></nav></header>
+<main>
+<h1>ホームページ制作会社一覧（{page}ページ目）</h1>
+<div class="company-list">
+{items}
+</div>
+<nav class="pagination">{pager}{next_link}</nav>
+</main>
+<footer><p>&copy; 優良WEB</p><ul>{_nav_links(rng)}</ul></footer>
+</body>
+</html>
+'''
+
+
+def make_listing_fixtures(companies, directory=None):
+    directory = directory or os.path.join(FIXTURE_DIR, 'listing')
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(0)
+    paths = []
+    for page in range(1, LISTING_PAGES + 1):
+        chunk = companies[(page - 1) * ITEMS_PER_PAGE:page * ITEMS_PER_PAGE]
+        path = os.path.join(directory, f'page_{page}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(listing_page(chunk, page, LISTING_PAGES, rng))
+        paths.append(path)
+    return paths
+
+
+MENU = [
+    ('会社概要', '/company/'), ('事業内容', '/service/'), ('制作実績', '/works/'),
+    ('お知らせ', '/news/'), ('採用情報', '/recruit/'), ('よくある質問', '/faq/'),
+    ('アクセス', '/access/'), ('ブログ', '/blog/'), ('プライバシーポリシー', '/privacy/'),
+]
+
+
+def home_page(company, size_kb, rng, with_form=False):
+    """企業サイトのトップページ風HTML（おおよそ size_kb キロバイト）"""
+    name = html.escape(company['company_name'])
+    menu = ''.join(
+        f'<li class="menu-item"><a href="{href}">{label}</a>'
+        f'<ul class="sub-menu">' + ''.join(
+            f'<li><a href="{href}{i}/">{label}{i}</a></li>' for i in range(1, 6)
+        ) + '</ul></li>'
+        for label, href in MENU
+    )
+    contact_href = rng.choice(['/contact/', '/inquiry/', '/otoiawase.html', '/form/contact.php'])
+    parts = [f'''<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="UTF-8">
+<title>{name} | 公式サイト</title>
+<meta name="description" content="{name}の公式サイトです。">
+<style>{"body{margin:0;font-family:sans-serif}.section{padding:40px 0}" * 40}</style>
+<script>{"var _conf={lazy:true,track:false,items:[1,2,3]};" * 60}</script>
+</head>
+<body class="home page-template-default">
+<header id="header"><div class="logo"><a href="/"><img src="/logo.svg" alt="{name}"></a></div>
+<nav id="global-nav"><ul class="menu">{menu}</ul></nav>
+<div class="header-contact"><a href="tel:0312345678">03-1234-5678</a>
+<a class="btn-contact" href="{contact_href}">お問い合わせ</a></div></header>
+<main>''']
+    section = 0
+    while sum(len(p.encode('utf-8')) for p in parts) < size_kb * 1024:
+        section += 1
+        news = ''.join(
+            f'<li class="news-item"><time datetime="2025-0{(i % 9) + 1}-1{i % 10}">2025.0{(i % 9) + 1}.1{i % 10}</time>'
+            f'<a href="/news/{section}-{i}/">{name}がWEBサイトをリニューアルしました（第{section}-{i}報）</a></li>'
+            for i in range(10)
+        )
+        cards = ''.join(
+            f'<div class="card"><img src="/img/{section}-{i}.jpg" alt=""><h3>サービス{section}-{i}</h3>'
+            f'<p>{"お客様の課題に寄り添い、最適なご提案をいたします。" * rng.randint(2, 6)}</p>'
+            f'<a class="more" href="/service/{section}-{i}/">詳しく見る</a></div>'
+            for i in range(6)
+        )
+        parts.append(
+            f'<section class="section section-{section}"><div class="inner">'
+            f'<h2 class="section-title">セクション{section}</h2><ul class="news">{news}</ul>'
+            f'<div class="cards">{cards}</div></div></section>'
+        )
+    if with_form:
+        parts.append('''<section id="form"><form action="/send.php" method="post">
+<label>お名前<input type="text" name="name"></label>
+<label>メールアドレス<input type="email" name="email"></label>
+<label>お問い合わせ内容<textarea name="message"></textarea></label>
+<button type="submit">送信</button></form></section>''')
+    footer_links = ''.join(f'<li><a href="{href}">{label}</a></li>' for label, href in MENU)
+    parts.append(f'''</main>
+<footer id="footer"><ul class="footer-menu">{footer_links}<li><a href="{contact_href}">お問い合わせ</a></li></ul>
+<p class="copyright">&copy; {name} All Rights Reserved.</p></footer>
+</body>
+</html>
+''')
+    return ''.join(parts)
+
+
+def make_home_fixtures(companies, directory=None):
+    directory = directory or os.path.join(FIXTURE_DIR, 'home')
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(1)
+    sizes = [200, 250, 300, 400, 500]
+    paths = []
+    for i, (company, size_kb) in enumerate(zip(companies, sizes), 1):
+        path = os.path.join(directory, f'home_{i}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(home_page(company, size_kb, rng, with_form=(i == HOME_PAGES)))
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    companies = load_companies(limit=ITEMS_PER_PAGE * LISTING_PAGES)
+    for path in make_listing_fixtures(companies) + make_home_fixtures(companies[:HOME_PAGES]):
+        print(f"✅ {path} ({os.path.getsize(path):,} bytes)")
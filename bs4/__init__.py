@@ -88,6 +88,7 @@ from .element import (
     TemplateString,
 )
 from .formatter import Formatter
+from ._index import TreeIndex
 from .filter import (
     ElementFilter,
     SoupStrainer,
@@ -215,6 +216,7 @@ class BeautifulSoup(Tag):
         from_encoding: Optional[_Encoding] = None,
         exclude_encodings: Optional[_Encodings] = None,
         element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+        build_index: bool = False,
         **kwargs: Any,
     ):
         """Constructor.
@@ -255,6 +257,12 @@ class BeautifulSoup(Tag):
          built. This is useful for subclassing Tag or NavigableString
          to modify default behavior.
 
+        :param build_index: If this is True, an index of tag names, class
+         tokens and id values is built once the document has been
+         parsed. Calls to `Tag.find_all` and `Tag.find` that filter on
+         one of those will use the index instead of walking the tree,
+         until the tree is modified. See `BeautifulSoup.reindex`.
+
         :param kwargs: For backwards compatibility purposes, the
          constructor accepts certain keyword arguments used in
          Beautiful Soup 3. None of these arguments do anything in
@@ -342,6 +350,7 @@ class BeautifulSoup(Tag):
             from_encoding = None
 
         self.element_classes = element_classes or dict()
+        self._build_index = build_index
 
         # We need this information to track whether or not the builder
         # was specified well enough that we can omit the 'you need to
@@ -507,8 +516,10 @@ class BeautifulSoup(Tag):
         d = dict(self.__dict__)
         if "builder" in d and d["builder"] is not None and not self.builder.picklable:
             d["builder"] = type(self.builder)
-        # Store the contents as a Unicode string.
-        d["contents"] = []
+        # Store the contents as a Unicode string. The tree itself,
+        # including the index (if any), lives in slots that aren't
+        # part of __dict__; it's rebuilt when the markup is parsed
+        # again.
         d["markup"] = self.decode()
 
         # If _most_recent_element is present, it's a Tag object left
@@ -663,6 +674,22 @@ class BeautifulSoup(Tag):
         ):
             self.popTag()
 
+        if self._build_index:
+            self.reindex()
+
+    def reindex(self) -> None:
+        """Build (or rebuild) the index used by `Tag.find_all`.
+
+        The index is built automatically if this object was created
+        with ``build_index=True``, and is dropped as soon as the tree is
+        modified through methods like `Tag.insert` and
+        `PageElement.extract`. Call this after modifying the tree to
+        start using an index again, or after changing `Tag.name` or
+        `Tag.attrs` directly, since those changes can't be detected.
+        """
+        self._invalidate_tree_index()
+        self._tree_index = TreeIndex(self)
+
     def reset(self) -> None:
         """Reset this object to a state as though it had never parsed any
         markup.
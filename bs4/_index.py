@@ -0,0 +1,233 @@
+"""An optional index over a parse tree, used to answer common
+find_all() queries without walking every descendant.
+
+The index is built by `BeautifulSoup` when it's constructed with
+``build_index=True``. It maps tag names, class tokens and id values to
+the `Tag` objects that use them, in document order, and records each
+`Tag`'s span of positions so that a search beneath any `Tag` becomes a
+lookup plus a range check.
+
+The index describes the tree as it was when the index was built. Any
+change made through the tree modification API (insert(), append(),
+extract(), replace_with(), tag[key] = value, and so on) invalidates it,
+and searches go back to walking the tree. Changes made by assigning to
+`Tag.name` or by modifying `Tag.attrs` directly can't be detected;
+call `BeautifulSoup.reindex` after making them.
+"""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+from bisect import bisect_right
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from bs4.element import Tag
+    from bs4.filter import MatchRule, SoupStrainer
+    from bs4._typing import _QueryResults
+
+
+class _Postings(object):
+    """The Tags that share one key, with their positions in the
+    document. Both lists are in document order.
+    """
+
+    __slots__ = ("positions", "tags")
+
+    def __init__(self) -> None:
+        self.positions: List[int] = []
+        self.tags: List[Tag] = []
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def within(self, start: int, end: int) -> Tuple[List[int], List[Tag]]:
+        """The postings strictly after ``start``, up to and including
+        ``end``.
+        """
+        low = bisect_right(self.positions, start)
+        high = bisect_right(self.positions, end)
+        return self.positions[low:high], self.tags[low:high]
+
+
+class TreeIndex(object):
+    """Maps tag names, class tokens and id values to the Tags that
+    use them.
+
+    :param root: The `Tag` (usually a `BeautifulSoup` object) whose
+        descendants should be indexed.
+    """
+
+    #: False once the tree has been modified since the index was built.
+    valid: bool
+
+    def __init__(self, root: Tag):
+        self.valid = True
+        self.names: Dict[str, _Postings] = {}
+        self.classes: Dict[str, _Postings] = {}
+        self.ids: Dict[str, _Postings] = {}
+        # Maps id(tag) to the (start, end) span of positions taken up
+        # by that tag's descendants: (start, end].
+        self.spans: Dict[int, Tuple[int, int]] = {}
+        self._build(root)
+
+    def _build(self, root: Tag) -> None:
+        from bs4.element import Tag
+
+        names = self.names
+        classes = self.classes
+        ids = self.ids
+        spans = self.spans
+
+        def post(index: Dict[str, _Postings], key: str) -> None:
+            postings = index.get(key)
+            if postings is None:
+                postings = index[key] = _Postings()
+            postings.positions.append(position)
+            postings.tags.append(child)
+
+        # Walk .contents depth-first, without recursive function
+        # calls, numbering each Tag in document order.
+        position = 0
+        root._tree_index = self
+        stack: List[Tuple[Tag, int, Any]] = [(root, position, iter(root.contents))]
+        while stack:
+            tag, start, children = stack[-1]
+            for child in children:
+                if not isinstance(child, Tag):
+                    continue
+                position += 1
+                child._tree_index = self
+                post(names, child.name)
+
+                attrs = child.attrs
+                if attrs:
+                    tokens = attrs.get("class")
+                    if tokens:
+                        if isinstance(tokens, str):
+                            tokens = tokens.split()
+                        for token in set(tokens) if len(tokens) > 1 else tokens:
+                            if isinstance(token, str):
+                                post(classes, token)
+                    tag_id = attrs.get("id")
+                    if isinstance(tag_id, str):
+                        post(ids, tag_id)
+
+                stack.append((child, position, iter(child.contents)))
+                break
+            else:
+                stack.pop()
+                spans[id(tag)] = (start, position)
+
+    def invalidate(self) -> None:
+        """Stop using this index, and let go of the data it holds."""
+        self.valid = False
+        self.names = {}
+        self.classes = {}
+        self.ids = {}
+        self.spans = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Spans are keyed by object identity, which doesn't survive
+        # pickling. An unpickled index is always invalid.
+        return dict(valid=False, names={}, classes={}, ids={}, spans={})
+
+    @staticmethod
+    def _rule_strings(rules: Sequence[MatchRule]) -> Optional[List[str]]:
+        """The strings required by a set of rules, if every rule is an
+        exact string match; otherwise None.
+        """
+        if not rules:
+            return None
+        strings = []
+        for rule in rules:
+            if rule.string is None:
+                return None
+            strings.append(rule.string)
+        return strings
+
+    def _candidates(self, matcher: SoupStrainer) -> Optional[List[_Postings]]:
+        """Find the smallest set of postings guaranteed to contain every
+        Tag that could match ``matcher``, or None if the index can't
+        narrow down the search.
+        """
+        dimensions: List[List[_Postings]] = []
+
+        names = self._rule_strings(matcher.name_rules)
+        if names is not None and not any(":" in name for name in names):
+            dimensions.append(self._lookup(self.names, names))
+
+        class_values = self._rule_strings(matcher.attribute_rules.get("class", []))
+        if class_values is not None:
+            # A class rule matches either one of the tag's class
+            # tokens, or all of them joined with spaces. Either way,
+            # the tag has the rule's first token.
+            tokens = [value.split() for value in class_values]
+            if all(tokens):
+                dimensions.append(self._lookup(self.classes, [t[0] for t in tokens]))
+
+        ids = self._rule_strings(matcher.attribute_rules.get("id", []))
+        if ids is not None:
+            dimensions.append(self._lookup(self.ids, ids))
+
+        if not dimensions:
+            return None
+        return min(dimensions, key=lambda postings: sum(len(p) for p in postings))
+
+    @staticmethod
+    def _lookup(index: Dict[str, _Postings], keys: Iterable[str]) -> List[_Postings]:
+        found = []
+        for key in set(keys):
+            postings = index.get(key)
+            if postings is not None:
+                found.append(postings)
+        return found
+
+    def find_all(
+        self, tag: Tag, matcher: SoupStrainer, limit: Optional[int]
+    ) -> Optional[_QueryResults]:
+        """Find the descendants of ``tag`` that match ``matcher``, in
+        document order.
+
+        :return: A `ResultSet`, or None if the index can't answer this
+            query and the tree needs to be searched the usual way.
+        """
+        from bs4.element import ResultSet
+
+        if not self.valid:
+            return None
+        span = self.spans.get(id(tag))
+        if span is None:
+            return None
+        candidates = self._candidates(matcher)
+        if candidates is None:
+            return None
+
+        start, end = span
+        tags: Sequence[Tag]
+        if len(candidates) == 1:
+            _, tags = candidates[0].within(start, end)
+        else:
+            merged: Dict[int, Tag] = {}
+            for postings in candidates:
+                merged.update(zip(*postings.within(start, end)))
+            tags = [merged[position] for position in sorted(merged)]
+
+        match = matcher.compile()
+        results: _QueryResults = ResultSet(matcher)
+        for candidate in tags:
+            if match(candidate):
+                results.append(candidate)
+                if limit and len(results) >= limit:
+                    break
+        return results
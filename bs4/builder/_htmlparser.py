@@ -6,6 +6,7 @@ from __future__ import annotations
 __license__ = "MIT"
 
 __all__ = [
+    "HTMLParserEvent",
     "HTMLParserTreeBuilder",
 ]
 
@@ -17,7 +18,9 @@ from typing import (
     cast,
     Dict,
     Iterable,
+    Iterator,
     List,
+    NamedTuple,
     Optional,
     TYPE_CHECKING,
     Tuple,
@@ -31,6 +34,7 @@ from bs4.element import (
     Comment,
     Declaration,
     Doctype,
+    NavigableString,
     ProcessingInstruction,
 )
 from bs4.dammit import EntitySubstitution, UnicodeDammit
@@ -46,7 +50,6 @@ from bs4.exceptions import ParserRejectedMarkup
 
 if TYPE_CHECKING:
     from bs4 import BeautifulSoup
-    from bs4.element import NavigableString
     from bs4._typing import (
         _Encoding,
         _Encodings,
@@ -327,6 +330,176 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
         self.soup.endData(ProcessingInstruction)
 
 
+class HTMLParserEvent(NamedTuple):
+    """One event in the stream produced by
+    `HTMLParserTreeBuilder.iter_events`.
+
+    ``type`` is one of the `HTMLParserEventStream` constants. ``name``
+    and ``attrs`` are set for START, END (``attrs`` is None) and ELEMENT
+    events. ``data`` is the text of a DATA event, or all the text
+    inside an ELEMENT. ``string_class`` is the `NavigableString`
+    subclass the text would have been given in a parse tree (e.g.
+    `Comment`).
+    """
+
+    type: str
+    name: Optional[str]
+    attrs: Optional[AttributeDict]
+    data: Optional[str]
+    string_class: Optional[Type[NavigableString]] = None
+
+
+class _StreamedTag(object):
+    """What `HTMLParserEventStream.handle_starttag` returns instead of
+    a `Tag`; BeautifulSoupHTMLParser only looks at is_empty_element.
+    """
+
+    __slots__ = ("is_empty_element",)
+
+    def __init__(self, is_empty_element: bool):
+        self.is_empty_element = is_empty_element
+
+
+class HTMLParserEventStream(object):
+    """Stands in for a `BeautifulSoup` object while
+    BeautifulSoupHTMLParser runs, turning the calls that would build a
+    parse tree into a stream of `HTMLParserEvent` objects.
+
+    Tags are opened and closed the same way they would be in a tree
+    built by `HTMLParserTreeBuilder`: an end tag closes the most recent
+    open tag with that name (and any tags opened inside it), an end
+    tag with no open tag is ignored, empty-element tags are closed
+    immediately, and whitespace-only strings are collapsed. Only the
+    names of the currently open tags are kept, so memory use doesn't
+    grow with the size of the document.
+
+    :param builder: The `HTMLParserTreeBuilder` whose settings apply.
+    :param handler: Called with each event.
+    :param collect: Tag names to gather up as a whole: when one of
+        these tags closes, an ELEMENT event carries its attributes and
+        all of the text inside it (as `Tag.get_text` would return it).
+    :param original_encoding: The encoding the markup was converted
+        from, if any.
+    """
+
+    #: A tag was opened.
+    START: str = "start"
+
+    #: A tag was closed.
+    END: str = "end"
+
+    #: A string was found. Check ``string_class`` to tell comments,
+    #: doctypes, etc. from ordinary text.
+    DATA: str = "data"
+
+    #: A tag named in ``collect`` was closed.
+    ELEMENT: str = "element"
+
+    ASCII_SPACES: str = "\x20\x0a\x09\x0c\x0d"
+
+    _EMPTY_ELEMENT = _StreamedTag(True)
+    _CONTAINER_ELEMENT = _StreamedTag(False)
+
+    def __init__(
+        self,
+        builder: HTMLParserTreeBuilder,
+        handler: Callable[[HTMLParserEvent], Any],
+        collect: Iterable[str] = (),
+        original_encoding: Optional[_Encoding] = None,
+    ):
+        self.builder = builder
+        self.handler = handler
+        self.collect = frozenset(collect)
+        self.original_encoding = original_encoding
+
+        self.open_tags: List[str] = []
+        self.current_data: List[str] = []
+        self.preserve_whitespace_depth = 0
+        self.string_container_stack: List[str] = []
+
+        # The tag being collected for an ELEMENT event: its depth in
+        # open_tags, name, attributes and text.
+        self._collecting: Optional[Tuple[int, str, AttributeDict, List[str]]] = None
+
+    def handle_starttag(
+        self,
+        name: str,
+        namespace: Optional[str],
+        nsprefix: Optional[str],
+        attrs: AttributeDict,
+        sourceline: Optional[int] = None,
+        sourcepos: Optional[int] = None,
+    ) -> _StreamedTag:
+        self.endData()
+        if self.builder.cdata_list_attributes:
+            # Split class="foo bar" into a list, as a Tag would.
+            attrs = cast(
+                AttributeDict, self.builder._replace_cdata_list_attribute_values(name, attrs)
+            )
+        self.open_tags.append(name)
+        if name in self.builder.preserve_whitespace_tags:
+            self.preserve_whitespace_depth += 1
+        if name in self.builder.string_containers:
+            self.string_container_stack.append(name)
+        if self._collecting is None and name in self.collect:
+            self._collecting = (len(self.open_tags), name, attrs, [])
+        self.handler(HTMLParserEvent(self.START, name, attrs, None))
+
+        if self.builder.can_be_empty_element(name):
+            return self._EMPTY_ELEMENT
+        return self._CONTAINER_ELEMENT
+
+    def handle_endtag(self, name: str, nsprefix: Optional[str] = None) -> None:
+        self.endData()
+        if name not in self.open_tags:
+            return
+        while self.open_tags:
+            closed = self._pop()
+            if closed == name:
+                break
+
+    def _pop(self) -> str:
+        depth = len(self.open_tags)
+        name = self.open_tags.pop()
+        if name in self.builder.preserve_whitespace_tags:
+            self.preserve_whitespace_depth -= 1
+        if self.string_container_stack and self.string_container_stack[-1] == name:
+            self.string_container_stack.pop()
+        self.handler(HTMLParserEvent(self.END, name, None, None))
+
+        if self._collecting is not None and self._collecting[0] == depth:
+            _, name, attrs, text = self._collecting
+            self._collecting = None
+            self.handler(HTMLParserEvent(self.ELEMENT, name, attrs, "".join(text)))
+        return name
+
+    def handle_data(self, data: str) -> None:
+        self.current_data.append(data)
+
+    def endData(self, containerClass: Optional[Type[NavigableString]] = None) -> None:
+        if not self.current_data:
+            return
+        data = "".join(self.current_data)
+        self.current_data = []
+        if not self.preserve_whitespace_depth and not data.strip(self.ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+
+        string_class = containerClass or NavigableString
+        if string_class is NavigableString and self.string_container_stack:
+            string_class = self.builder.string_containers.get(
+                self.string_container_stack[-1], NavigableString
+            )
+        if self._collecting is not None and string_class is NavigableString:
+            self._collecting[3].append(data)
+        self.handler(HTMLParserEvent(self.DATA, None, None, data, string_class))
+
+    def close(self) -> None:
+        """Close any tags that are still open at the end of the document."""
+        self.endData()
+        while self.open_tags:
+            self._pop()
+
+
 class HTMLParserTreeBuilder(HTMLTreeBuilder):
     """A Beautiful soup `bs4.builder.TreeBuilder` that uses the
     :py:class:`html.parser.HTMLParser` parser, found in the Python
@@ -472,3 +645,83 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
             # when there's an error in the doctype declaration.
             raise ParserRejectedMarkup(e)
         parser.already_closed_empty_element = []
+
+    def _event_parser(
+        self,
+        markup: _RawMarkup,
+        handler: Callable[[HTMLParserEvent], Any],
+        from_encoding: Optional[_Encoding],
+        exclude_encodings: Optional[_Encodings],
+        collect: Iterable[str],
+    ) -> Tuple[str, BeautifulSoupHTMLParser, HTMLParserEventStream]:
+        """Convert the markup to Unicode and set up a parser that sends
+        events to ``handler`` instead of building a tree.
+        """
+        markup, original_encoding, _, _ = next(
+            iter(self.prepare_markup(markup, from_encoding, exclude_encodings=exclude_encodings))
+        )
+        assert isinstance(markup, str)
+        stream = HTMLParserEventStream(self, handler, collect, original_encoding)
+        args, kwargs = self.parser_args
+        parser = BeautifulSoupHTMLParser(cast("BeautifulSoup", stream), *args, **kwargs)
+        return markup, parser, stream
+
+    def feed_events(
+        self,
+        markup: _RawMarkup,
+        handler: Callable[[HTMLParserEvent], Any],
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+        collect: Iterable[str] = (),
+    ) -> None:
+        """Parse a document without building a parse tree, calling
+        ``handler`` with an `HTMLParserEvent` for each tag, string and
+        collected element.
+
+        :param markup: A string or bytestring.
+        :param handler: Called with each event, in document order.
+        :param from_encoding: As with the `BeautifulSoup` constructor.
+        :param exclude_encodings: As with the `BeautifulSoup` constructor.
+        :param collect: Tag names to report as ELEMENT events; see
+            `HTMLParserEventStream`.
+        """
+        markup, parser, stream = self._event_parser(
+            markup, handler, from_encoding, exclude_encodings, collect
+        )
+        try:
+            parser.feed(markup)
+            parser.close()
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+        stream.close()
+
+    def iter_events(
+        self,
+        markup: _RawMarkup,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+        collect: Iterable[str] = (),
+        chunk_size: int = 65536,
+    ) -> Iterator[HTMLParserEvent]:
+        """Parse a document without building a parse tree, yielding an
+        `HTMLParserEvent` for each tag, string and collected element.
+
+        The markup is fed to the parser ``chunk_size`` characters at a
+        time, and only the events produced by one chunk are held at
+        once. See `HTMLParserTreeBuilder.feed_events` for the other
+        arguments.
+        """
+        events: List[HTMLParserEvent] = []
+        markup, parser, stream = self._event_parser(
+            markup, events.append, from_encoding, exclude_encodings, collect
+        )
+        try:
+            for start in range(0, len(markup), chunk_size):
+                parser.feed(markup[start : start + chunk_size])
+                yield from events
+                events.clear()
+            parser.close()
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+        stream.close()
+        yield from events
@@ -0,0 +1,240 @@
+"""Parse many independent documents across a pool of worker processes.
+
+Parsing with ``html.parser`` is pure Python, so threads can't parse
+more than one document at a time. `BulkParser` sends documents to a
+`concurrent.futures.ProcessPoolExecutor` instead. Each worker builds
+the `BeautifulSoup` object, runs your extractor function on it, and
+sends back only what the extractor returns::
+
+    def links(soup):
+        return [a["href"] for a in soup.find_all("a", href=True)]
+
+    with BulkParser(links, "html.parser") as parser:
+        for hrefs in parser.map(payloads):
+            ...
+
+Documents are sent to the workers in chunks, to cut down on the
+number of round trips between processes, and the same worker
+processes are used for every chunk and every call to `BulkParser.map`
+until the `BulkParser` is closed.
+
+The extractor (and anything it returns) has to be picklable, which
+usually means it should be a function defined at the top level of a
+module. Returning a `Tag` works, but it drags the whole parse tree
+back with it; return plain strings, lists and dicts instead.
+"""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+import os
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+from bs4 import BeautifulSoup
+from bs4._typing import _RawMarkup
+
+_ResultT = TypeVar("_ResultT")
+
+#: The function run on each parsed document.
+_Extractor = Callable[[BeautifulSoup], _ResultT]
+
+
+class _Worker(Generic[_ResultT]):
+    """Everything a worker process needs to turn markup into a
+    result. One of these is set up when each worker process starts,
+    and then used for every document sent to that process.
+    """
+
+    def __init__(
+        self,
+        extractor: _Extractor[_ResultT],
+        features: Optional[Union[str, List[str]]],
+        soup_kwargs: Dict[str, Any],
+        return_exceptions: bool,
+    ):
+        self.extractor = extractor
+        self.features = features
+        self.soup_kwargs = soup_kwargs
+        self.return_exceptions = return_exceptions
+
+    def parse(self, markup: _RawMarkup) -> Union[_ResultT, Exception]:
+        try:
+            soup = BeautifulSoup(markup, self.features, **self.soup_kwargs)
+            return self.extractor(soup)
+        except Exception as e:
+            if not self.return_exceptions:
+                raise
+            return e
+
+    def parse_chunk(
+        self, chunk: List[_RawMarkup]
+    ) -> List[Union[_ResultT, Exception]]:
+        return [self.parse(markup) for markup in chunk]
+
+
+#: The `_Worker` for the current worker process.
+_worker: Optional[_Worker[Any]] = None
+
+
+def _initialize_worker(
+    extractor: _Extractor[Any],
+    features: Optional[Union[str, List[str]]],
+    soup_kwargs: Dict[str, Any],
+    return_exceptions: bool,
+) -> None:
+    global _worker
+    _worker = _Worker(extractor, features, soup_kwargs, return_exceptions)
+
+
+def _parse_chunk(chunk: List[_RawMarkup]) -> List[Any]:
+    assert _worker is not None
+    return _worker.parse_chunk(chunk)
+
+
+class BulkParser(Generic[_ResultT]):
+    """Parses documents in a pool of worker processes and runs an
+    extractor function on each one.
+
+    :param extractor: A function that takes a `BeautifulSoup` object
+        and returns whatever you want to keep from it. It's run in a
+        worker process, so it, and its return value, must be
+        picklable.
+    :param features: Passed into the `BeautifulSoup` constructor,
+        along with ``soup_kwargs``.
+    :param max_workers: The number of worker processes. Defaults to
+        the number of CPUs. If this is 0, documents are parsed in the
+        current process, without a pool; this can be useful when
+        debugging an extractor.
+    :param chunksize: How many documents to send to a worker at once.
+    :param return_exceptions: If this is False (the default), an
+        exception raised while parsing or extracting a document is
+        raised again from `BulkParser.map`. If this is True, the
+        exception is returned in place of that document's result, and
+        the other documents are unaffected.
+    :param mp_context: A `multiprocessing` context, passed into
+        `concurrent.futures.ProcessPoolExecutor`.
+    :param soup_kwargs: Keyword arguments for the `BeautifulSoup`
+        constructor, such as ``parse_only`` or ``from_encoding``.
+    """
+
+    #: How many chunks may be waiting in the pool, per worker, before
+    #: `BulkParser.map` stops reading from its input. This keeps a
+    #: large (or endless) iterable of documents from being read into
+    #: memory all at once.
+    CHUNKS_PER_WORKER: int = 2
+
+    def __init__(
+        self,
+        extractor: _Extractor[_ResultT],
+        features: Optional[Union[str, List[str]]] = None,
+        max_workers: Optional[int] = None,
+        chunksize: int = 4,
+        return_exceptions: bool = False,
+        mp_context: Optional[Any] = None,
+        **soup_kwargs: Any,
+    ):
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1.")
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers < 0:
+            raise ValueError("max_workers must be 0 or more.")
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+        initargs = (extractor, features, soup_kwargs, return_exceptions)
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._local: Optional[_Worker[_ResultT]] = None
+        if max_workers == 0:
+            self._local = _Worker(*initargs)
+        else:
+            self._executor = ProcessPoolExecutor(
+                max_workers,
+                mp_context=mp_context,
+                initializer=_initialize_worker,
+                initargs=initargs,
+            )
+
+    def map(
+        self, documents: Iterable[_RawMarkup], chunksize: Optional[int] = None
+    ) -> Iterator[Union[_ResultT, Exception]]:
+        """Parse each document and yield the extractor's results, in
+        the same order as the documents.
+
+        :param documents: An iterable of bytestrings or strings. It's
+            read lazily, a few chunks ahead of the results.
+        :param chunksize: Overrides the ``chunksize`` passed into the
+            constructor, for this call only.
+        """
+        chunksize = chunksize or self.chunksize
+        iterator = iter(documents)
+        chunks = iter(lambda: list(islice(iterator, chunksize)), [])
+
+        if self._local is not None:
+            for chunk in chunks:
+                yield from self._local.parse_chunk(chunk)
+            return
+
+        if self._executor is None:
+            raise RuntimeError("This BulkParser has been closed.")
+        limit = self.max_workers * self.CHUNKS_PER_WORKER
+        pending: Deque[Future[List[Any]]] = deque()
+        try:
+            for chunk in chunks:
+                pending.append(self._executor.submit(_parse_chunk, chunk))
+                if len(pending) >= limit:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # If the caller stopped early, or a document raised an
+            # exception, don't parse the rest.
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> BulkParser[_ResultT]:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def parse_many(
+    documents: Iterable[_RawMarkup],
+    extractor: _Extractor[_ResultT],
+    features: Optional[Union[str, List[str]]] = None,
+    **kwargs: Any,
+) -> List[Union[_ResultT, Exception]]:
+    """Parse every document in a new `BulkParser`, and return a list of
+    the extractor's results.
+
+    :param documents: An iterable of bytestrings or strings.
+    :param extractor: A picklable function that takes a
+        `BeautifulSoup` object.
+    :param features: Passed into the `BeautifulSoup` constructor.
+    :param kwargs: Passed into the `BulkParser` constructor.
+    """
+    with BulkParser(extractor, features, **kwargs) as parser:
+        return list(parser.map(documents))
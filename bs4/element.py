@@ -45,6 +45,7 @@ from typing_extensions import (
 
 if TYPE_CHECKING:
     from bs4 import BeautifulSoup
+    from bs4._index import TreeIndex
     from bs4.builder import TreeBuilder
     from bs4.filter import ElementFilter
     from bs4.formatter import (
@@ -353,6 +354,11 @@ class PageElement(object):
     meaning "a `Tag` or a `NavigableString`."
     """
 
+    # Subclasses store their links to the rest of the tree in
+    # __slots__ rather than an instance __dict__; see `Tag` and
+    # `NavigableString`.
+    __slots__ = ()
+
     #: In general, we can't tell just by looking at an element whether
     #: it's contained in an XML document or an HTML document. But for
     #: `Tag` objects (q.v.) we can store this information at parse time.
@@ -373,6 +379,16 @@ class PageElement(object):
     #: Only the `BeautifulSoup` object itself is hidden.
     hidden: bool = False
 
+    #: The `TreeIndex` covering this element, if its `BeautifulSoup`
+    #: object was created with ``build_index=True``.
+    #: :meta private:
+    _tree_index: Optional[TreeIndex] = None
+
+    def _invalidate_tree_index(self) -> None:
+        """Called before this element's part of the tree is modified."""
+        if self._tree_index is not None:
+            self._tree_index.invalidate()
+
     def setup(
         self,
         parent: Optional[Tag] = None,
@@ -593,6 +609,7 @@ class PageElement(object):
 
         :return: this `PageElement`, no longer part of the tree.
         """
+        self._invalidate_tree_index()
         if self.parent is not None:
             if _self_index is None:
                 _self_index = self.parent.index(self)
@@ -648,6 +665,13 @@ class PageElement(object):
         next_up: _AtMostOneElement = None
         while e is not None:
             next_up = e.next_element
+            # Let go of everything the element refers to, whether
+            # it's kept in a slot or in the instance __dict__. Slots
+            # are set to None rather than deleted, so that looking
+            # one up doesn't fall through to Tag.__getattr__.
+            for attribute in e.__slots__:
+                if not attribute.startswith("__"):
+                    setattr(e, attribute, None)
             e.__dict__.clear()
             if isinstance(e, Tag):
                 e.contents = []
@@ -1084,9 +1108,15 @@ class PageElement(object):
         limit: Optional[int],
         generator: Iterator[PageElement],
         _stacklevel: int = 3,
+        _index_root: Optional[Tag] = None,
         **kwargs: _StrainableAttribute,
     ) -> _QueryResults:
-        """Iterates over a generator looking for things that match."""
+        """Iterates over a generator looking for things that match.
+
+        :param _index_root: If ``generator`` iterates over the descendants
+            of a `Tag`, that `Tag`. If it's covered by a `TreeIndex`, the
+            index may be able to answer the query without iterating.
+        """
 
         if string is None and "text" in kwargs:
             string = kwargs.pop("text")
@@ -1114,6 +1144,15 @@ class PageElement(object):
         else:
             matcher = SoupStrainer(name, attrs, string, **kwargs)
 
+        if (
+            _index_root is not None
+            and _index_root._tree_index is not None
+            and type(matcher) is SoupStrainer
+        ):
+            indexed = _index_root._tree_index.find_all(_index_root, matcher, limit)
+            if indexed is not None:
+                return indexed
+
         result: Iterable[_OneElement]
         if string is None and not limit and not attrs and not kwargs:
             if name is True or name is None:
@@ -1278,6 +1317,19 @@ class NavigableString(str, PageElement):
     create a `NavigableString` for the string "penguin".
     """
 
+    # A parse tree holds a great many strings, so their links to the
+    # rest of the tree are kept in slots. The instance __dict__ is
+    # only created if something else is stored on the string.
+    __slots__ = (
+        "parent",
+        "next_element",
+        "previous_element",
+        "next_sibling",
+        "previous_sibling",
+        "__dict__",
+        "__weakref__",
+    )
+
     #: A string prepended to the body of the 'real' string
     #: when formatting it as part of a document, such as the '<!--'
     #: in an HTML comment.
@@ -1300,7 +1352,6 @@ class NavigableString(str, PageElement):
             u = str.__new__(cls, value)
         else:
             u = str.__new__(cls, value, DEFAULT_OUTPUT_ENCODING)
-        u.hidden = False
         u.setup()
         return u
 
@@ -1623,6 +1674,42 @@ class Tag(PageElement):
 
     """
 
+    # Everything Tag.__init__ sets is kept in a slot, which is much
+    # smaller than an instance __dict__. The __dict__ is still
+    # available (and only created) for anything else stored on a
+    # Tag, including the attributes of `BeautifulSoup` itself.
+    __slots__ = (
+        "parent",
+        "next_element",
+        "previous_element",
+        "next_sibling",
+        "previous_sibling",
+        "parser_class",
+        "name",
+        "namespace",
+        "_namespaces",
+        "prefix",
+        "sourceline",
+        "sourcepos",
+        "attribute_value_list_class",
+        "attrs",
+        "known_xml",
+        "contents",
+        "hidden",
+        "can_be_empty_element",
+        "cdata_list_attributes",
+        "preserve_whitespace_tags",
+        "interesting_string_types",
+        "_tree_index",
+        "__dict__",
+        "__weakref__",
+    )
+
+    #: Shared by every Tag that's created without any namespace
+    #: prefixes in scope, rather than giving each one an empty dict.
+    #: :meta private:
+    _NO_NAMESPACES: Dict[str, str] = {}
+
     def __init__(
         self,
         parser: Optional[BeautifulSoup] = None,
@@ -1655,7 +1742,7 @@ class Tag(PageElement):
             raise ValueError("No value provided for new tag's name.")
         self.name = name
         self.namespace = namespace
-        self._namespaces = namespaces or {}
+        self._namespaces = namespaces or self._NO_NAMESPACES
         self.prefix = prefix
         if (not builder or builder.store_line_numbers) and (
             sourceline is not None or sourcepos is not None
@@ -1705,6 +1792,7 @@ class Tag(PageElement):
         self.contents: List[PageElement] = []
         self.setup(parent, previous)
         self.hidden = False
+        self._tree_index = None
 
         if builder is None:
             # In the absence of a TreeBuilder, use whatever values were
@@ -1947,6 +2035,9 @@ class Tag(PageElement):
             raise ValueError("Cannot insert a tag into itself.")
         if isinstance(new_child, str) and not isinstance(new_child, NavigableString):
             new_child = NavigableString(new_child)
+        if isinstance(new_child, Tag):
+            self._invalidate_tree_index()
+            new_child._invalidate_tree_index()
 
         from bs4 import BeautifulSoup
         if isinstance(new_child, BeautifulSoup):
@@ -2231,10 +2322,12 @@ class Tag(PageElement):
     def __setitem__(self, key: str, value: _AttributeValue) -> None:
         """Setting tag[key] sets the value of the 'key' attribute for the
         tag."""
+        self._invalidate_tree_index()
         self.attrs[key] = value
 
     def __delitem__(self, key: str) -> None:
         "Deleting tag[key] deletes all 'key' attributes for the tag."
+        self._invalidate_tree_index()
         self.attrs.pop(key, None)
 
     def __call__(
@@ -2746,10 +2839,19 @@ class Tag(PageElement):
         :kwargs: Additional filters on attribute values.
         """
         generator = self.descendants
+        index_root: Optional[Tag] = self
         if not recursive:
             generator = self.children
+            index_root = None
         return self._find_all(
-            name, attrs, string, limit, generator, _stacklevel=_stacklevel + 1, **kwargs
+            name,
+            attrs,
+            string,
+            limit,
+            generator,
+            _stacklevel=_stacklevel + 1,
+            _index_root=index_root,
+            **kwargs,
         )
 
     findAll = _deprecated_function_alias("findAll", "find_all", "4.0.0")
@@ -11,10 +11,13 @@ from typing import (
     List,
     Optional,
     Sequence,
+    Set,
+    Tuple,
     Type,
     Union,
 )
 import warnings
+from typing_extensions import Literal
 
 from bs4._deprecation import _deprecated
 from bs4.element import (
@@ -177,7 +180,7 @@ class ElementFilter(object):
         results: _QueryResults = ResultSet(self)
         for match in self.filter(generator):
             results.append(match)
-            if limit is not None and len(results) >= limit:
+            if limit and len(results) >= limit:
                 break
         return results
 
@@ -375,6 +378,10 @@ class SoupStrainer(ElementFilter):
     attribute_rules: Dict[str, List[AttributeValueMatchRule]]
     string_rules: List[StringMatchRule]
 
+    #: `SoupStrainer.filter` compiles the rules once it has looked at
+    #: this many elements.
+    COMPILE_AFTER: int = 32
+
     def __init__(
         self,
         name: Optional[_StrainableElement] = None,
@@ -613,6 +620,263 @@ class SoupStrainer(ElementFilter):
                 return False
         return True
 
+    def compile(self) -> _PageElementMatchFunction:
+        """Turn the rules of this `SoupStrainer` into a single function
+        that gives the same answers as `SoupStrainer.match`, without
+        interpreting the list of `MatchRule` objects for every element.
+
+        Names and attribute values given as strings are collected into
+        sets, so a `Tag` is checked against all of them with one
+        lookup, and all the tokens of a multi-valued attribute like
+        'class' are checked with one set intersection. Rules that call
+        a function are still run one at a time, in order, so the
+        function is called exactly when `SoupStrainer.match` would
+        call it.
+
+        The function reflects the rules as they were when it was
+        compiled. If you change the rules, compile them again.
+
+        :return: A function that takes a `PageElement` and returns
+            True if it matches this `SoupStrainer`.
+        """
+        if self.includes_everything:
+            return lambda element: True
+
+        if not self.name_rules and not self.attribute_rules:
+            # Only a NavigableString can match.
+            match_string = self._compile_value_match(self.string_rules)
+            if match_string is False:
+                return lambda element: False
+
+            def match(element: PageElement) -> bool:
+                return not isinstance(element, Tag) and match_string(
+                    cast(str, element)
+                )
+
+            return match
+
+        match_tag = self._compile_tag_match()
+
+        def match(element: PageElement) -> bool:
+            return isinstance(element, Tag) and match_tag(element)
+
+        return match
+
+    def _compile_tag_match(self) -> _TagMatchFunction:
+        """Compile the equivalent of `SoupStrainer.matches_tag`, for
+        a `SoupStrainer` that has name or attribute rules.
+        """
+        match_name = self._compile_name_match(self.name_rules)
+        if match_name is False:
+            return lambda tag: False
+        attribute_matches = []
+        for attr, rules in self.attribute_rules.items():
+            match_value = self._compile_attribute_match(rules)
+            if match_value is False:
+                return lambda tag: False
+            attribute_matches.append((attr, match_value))
+        match_string = None
+        if self.string_rules:
+            match_string = self._compile_value_match(self.string_rules)
+            if match_string is False:
+                return lambda tag: False
+
+        def match_tag(tag: Tag) -> bool:
+            if match_name is not None and not match_name(tag):
+                return False
+            if attribute_matches:
+                attrs = tag.attrs
+                for attr, match_value in attribute_matches:
+                    if not match_value(attrs.get(attr, None)):
+                        return False
+            if match_string is not None:
+                string = tag.string
+                if string is None or not match_string(string):
+                    return False
+            return True
+
+        return match_tag
+
+    @staticmethod
+    def _compile_name_match(
+        rules: Sequence[TagNameMatchRule],
+    ) -> Union[_TagMatchFunction, None, Literal[False]]:
+        """Compile a list of `TagNameMatchRule`.
+
+        :return: A function that checks whether any of the rules match
+            a `Tag`; None if every `Tag` matches; or False if no `Tag`
+            can match.
+        """
+        if not rules:
+            return None
+
+        if any(rule.function is not None for rule in rules):
+
+            def match_in_order(tag: Tag) -> bool:
+                prefixed_name = None
+                if tag.prefix:
+                    prefixed_name = f"{tag.prefix}:{tag.name}"
+                for rule in rules:
+                    if rule.matches_tag(tag) or (
+                        not rule.function
+                        and prefixed_name is not None
+                        and rule.matches_string(prefixed_name)
+                    ):
+                        return True
+                return False
+
+            return match_in_order
+
+        names = set()
+        searches = []
+        for rule in rules:
+            if rule.present:
+                # Every Tag has a name.
+                return None
+            if rule.string is not None:
+                names.add(rule.string)
+            elif rule.pattern is not None:
+                searches.append(rule.pattern.search)
+            # present=False and exclude_everything rules can never
+            # match a Tag.
+        if not names and not searches:
+            return False
+
+        def match_name(tag: Tag) -> bool:
+            name = tag.name
+            if name in names:
+                return True
+            prefixed_name = None
+            if tag.prefix:
+                prefixed_name = f"{tag.prefix}:{name}"
+                if prefixed_name in names:
+                    return True
+            for search in searches:
+                if search(name) is not None or (
+                    prefixed_name is not None and search(prefixed_name) is not None
+                ):
+                    return True
+            return False
+
+        return match_name
+
+    def _compile_attribute_match(
+        self, rules: Sequence[AttributeValueMatchRule]
+    ) -> Union[Callable[[Optional[_AttributeValue]], bool], Literal[False]]:
+        """Compile the equivalent of `SoupStrainer._attribute_match`
+        for one attribute's rules.
+
+        :return: A function that takes the attribute's value (None if
+            the attribute isn't present), or False if no value can
+            match.
+        """
+        if any(rule.function is not None for rule in rules):
+            return lambda value: self._attribute_match(value, rules)
+
+        match_single = self._compile_value_match(rules)
+        if match_single is False:
+            return False
+        strings, searches, match_present, _ = self._split_rules(rules)
+
+        # A multi-valued attribute's tokens are tried one at a time, and
+        # then joined with spaces. The joined value always contains a
+        # space, so it can only equal a string that does too.
+        multi_token_strings = {x for x in strings if " " in x}
+        try_joined = bool(multi_token_strings or searches)
+
+        def match_value(value: Optional[_AttributeValue]) -> bool:
+            if not isinstance(value, list):
+                return match_single(value)
+            if not value:
+                return False
+            if match_present or not strings.isdisjoint(value):
+                return True
+            for search in searches:
+                for token in value:
+                    if search(token) is not None:
+                        return True
+            if try_joined and len(value) > 1:
+                joined = " ".join(value)
+                if joined in multi_token_strings:
+                    return True
+                for search in searches:
+                    if search(joined) is not None:
+                        return True
+            return False
+
+        return match_value
+
+    @staticmethod
+    def _split_rules(
+        rules: Iterable[MatchRule],
+    ) -> Tuple[Set[str], List[Callable[[str], Any]], bool, bool]:
+        """Sort rules that don't call functions into exact strings,
+        regular expression searches and present=True/False.
+
+        :return: A 4-tuple (strings, searches, match_present,
+            match_missing). ``match_present`` is True if some rule
+            matches any value that's not None; ``match_missing`` is True
+            if some rule matches None.
+        """
+        strings = set()
+        searches = []
+        match_present = match_missing = False
+        for rule in rules:
+            if rule.exclude_everything:
+                continue
+            if rule.present is True:
+                match_present = True
+            elif rule.present is False:
+                match_missing = True
+            elif rule.string is not None:
+                strings.add(rule.string)
+            elif rule.pattern is not None:
+                searches.append(rule.pattern.search)
+        return strings, searches, match_present, match_missing
+
+    @classmethod
+    def _compile_value_match(
+        cls, rules: Sequence[MatchRule]
+    ) -> Union[Callable[[Optional[str]], bool], Literal[False]]:
+        """Compile the equivalent of calling `MatchRule.matches_string`
+        on each of ``rules`` until one of them matches.
+
+        :return: A function that takes one string (or None), or False
+            if no string can match.
+        """
+        if any(rule.function is not None for rule in rules):
+
+            def match_in_order(value: Optional[str]) -> bool:
+                for rule in rules:
+                    if rule.matches_string(value):
+                        return True
+                return False
+
+            return match_in_order
+
+        strings, searches, match_present, match_missing = cls._split_rules(rules)
+        if not (strings or searches or match_present or match_missing):
+            return False
+
+        def match_value(value: Optional[str]) -> bool:
+            if value is None:
+                return match_missing
+            if match_present:
+                return True
+            try:
+                if value in strings:
+                    return True
+            except TypeError:
+                # An unhashable value can't be equal to any of the
+                # strings.
+                pass
+            for search in searches:
+                if search(value) is not None:
+                    return True
+            return False
+
+        return match_value
+
     def _attribute_match(
         self,
         attr_value: Optional[_AttributeValue],
@@ -744,6 +1008,40 @@ class SoupStrainer(ElementFilter):
             return self.matches_any_string_rule(element)
         return False
 
+    def filter(self, generator: Iterator[PageElement]) -> Iterator[_OneElement]:
+        """Acts like `ElementFilter.filter`, but compiles the rules
+        once (see `SoupStrainer.compile`) rather than interpreting
+        them for every element.
+        """
+        cls = type(self)
+        if (
+            self.includes_everything
+            or cls.match is not SoupStrainer.match
+            or cls.matches_tag is not SoupStrainer.matches_tag
+        ):
+            # Either there's nothing to compile, or a subclass has
+            # its own idea of what matches.
+            yield from super().filter(generator)
+            return
+        # Compiling costs about as much as matching a few dozen
+        # elements the slow way, so short searches (like a find()
+        # that succeeds right away) don't bother.
+        generator = iter(generator)
+        remaining = self.COMPILE_AFTER
+        for i in generator:
+            if i and self.match(i, _known_rules=True):
+                yield cast("_OneElement", i)
+            remaining -= 1
+            if remaining <= 0:
+                break
+        else:
+            return
+
+        match = self.compile()
+        for i in generator:
+            if i and match(i):
+                yield cast("_OneElement", i)
+
     @_deprecated("allow_tag_creation", "4.13.0")
     def search_tag(self, name: str, attrs: Optional[_RawAttributeValues]) -> bool:
         """A less elegant version of `allow_tag_creation`. Deprecated as of 4.13.0"""
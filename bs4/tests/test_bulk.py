@@ -0,0 +1,104 @@
+"""Tests for bs4.bulk, which parses documents in worker processes."""
+
+import itertools
+import os
+
+import pytest
+
+from bs4.bulk import BulkParser, parse_many
+from bs4.filter import SoupStrainer
+from . import SoupTest
+
+
+def title(soup):
+    return soup.title.string if soup.title else None
+
+
+def title_and_pid(soup):
+    return title(soup), os.getpid()
+
+
+def markup(soup):
+    return soup.decode()
+
+
+def fail_on_boom(soup):
+    if soup.find("boom"):
+        raise ValueError("boom")
+    return title(soup)
+
+
+def document(i):
+    return ("<html><head><title>Page %d</title></head><body></body></html>" % i).encode("utf8")
+
+
+class TestBulkParser(SoupTest):
+    def test_results_in_order(self):
+        documents = [document(i) for i in range(11)]
+        with BulkParser(title, "html.parser", max_workers=2, chunksize=3) as parser:
+            assert ["Page %d" % i for i in range(11)] == list(parser.map(documents))
+
+            # The chunk size can be overridden for one call.
+            assert ["Page 0", "Page 1"] == list(parser.map(documents[:2], chunksize=1))
+
+    def test_workers_are_reused(self):
+        with BulkParser(title_and_pid, "html.parser", max_workers=2, chunksize=2) as parser:
+            first = {pid for _, pid in parser.map(document(i) for i in range(20))}
+            second = {pid for _, pid in parser.map(document(i) for i in range(20))}
+        assert os.getpid() not in first
+        assert len(first | second) <= 2
+
+    def test_soup_kwargs(self):
+        documents = [b"<p>skip</p><a>keep</a>", "<a>unicode</a>"]
+        results = parse_many(
+            documents, markup, "html.parser", max_workers=1, parse_only=SoupStrainer("a")
+        )
+        assert ["<a>keep</a>", "<a>unicode</a>"] == results
+
+    def test_exceptions(self):
+        documents = [document(0), b"<boom></boom>", document(2)]
+        with BulkParser(fail_on_boom, "html.parser", max_workers=1, chunksize=1) as parser:
+            with pytest.raises(ValueError):
+                list(parser.map(documents))
+
+        results = parse_many(
+            documents, fail_on_boom, "html.parser", max_workers=1, return_exceptions=True
+        )
+        assert "Page 0" == results[0]
+        assert isinstance(results[1], ValueError)
+        assert "Page 2" == results[2]
+
+    def test_in_process(self):
+        results = parse_many(
+            [document(1), document(2)], title_and_pid, "html.parser", max_workers=0
+        )
+        assert [("Page 1", os.getpid()), ("Page 2", os.getpid())] == results
+
+    def test_documents_read_lazily(self):
+        read = []
+
+        def documents():
+            for i in itertools.count():
+                read.append(i)
+                yield document(i)
+
+        with BulkParser(title, "html.parser", max_workers=1, chunksize=2) as parser:
+            results = parser.map(documents())
+            assert ["Page 0", "Page 1", "Page 2"] == list(itertools.islice(results, 3))
+            results.close()
+
+        # One chunk is being collected and at most
+        # CHUNKS_PER_WORKER more are waiting in the pool.
+        assert len(read) <= (BulkParser.CHUNKS_PER_WORKER + 1) * 2
+
+    def test_closed(self):
+        parser = BulkParser(title, "html.parser", max_workers=1)
+        parser.close()
+        with pytest.raises(RuntimeError):
+            list(parser.map([document(0)]))
+
+    def test_bad_arguments(self):
+        with pytest.raises(ValueError):
+            BulkParser(title, chunksize=0)
+        with pytest.raises(ValueError):
+            BulkParser(title, max_workers=-1)
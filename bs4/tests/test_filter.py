@@ -681,3 +681,91 @@ and they lived at the bottom of a well.</p>
         )
         string_soup = self.soup(html_doc, parse_only=only_short_strings)
         assert "\n\n\nElsie,\nLacie and\nTillie\n...\n" == string_soup.decode()
+
+
+class TestSoupStrainerCompile(SoupTest):
+    MARKUP = (
+        '<div id="main" class="company-item featured"><p class="">Empty class</p>'
+        '<a href="/c/1" class="name title">One</a><a>No href</a>'
+        '<h2 class="company">Two</h2><h3 data-x="1">Three</h3>'
+        '<ns:tag>Prefixed</ns:tag><span class="a b c">x</span></div>'
+    )
+
+    STRAINERS = [
+        dict(name="a"),
+        dict(name=["h2", "h3", "nosuch"]),
+        dict(name=re.compile("^h[0-9]")),
+        dict(name=True),
+        dict(name=[]),
+        dict(name="ns:tag"),
+        dict(name="a", href=True),
+        dict(name="a", href=False),
+        dict(href=None),
+        dict(class_="company-item"),
+        dict(class_="company-item featured"),
+        dict(class_="featured company-item"),
+        dict(class_="b c"),
+        dict(class_=re.compile("title$")),
+        dict(class_=re.compile("name title")),
+        dict(class_=["nosuch", "company"]),
+        dict(class_=True),
+        dict(class_=[True, False]),
+        dict(class_=[]),
+        dict(id="main", class_="featured"),
+        dict(attrs={"data-x": "1"}),
+        dict(name="a", string="One"),
+        dict(name=["a", "h2"], string=re.compile("^T")),
+        dict(string="One"),
+        dict(string=re.compile("e")),
+        dict(string=[]),
+        dict(name="a", class_=lambda value: value is not None and "name" in value),
+        dict(name=lambda tag: tag.name == "span"),
+        dict(string=lambda s: s.startswith("N")),
+    ]
+
+    @pytest.mark.parametrize("kwargs", STRAINERS)
+    def test_compiled_match_agrees_with_match(self, kwargs):
+        soup = self.soup(self.MARKUP)
+        strainer = SoupStrainer(**kwargs)
+        match = strainer.compile()
+        for element in [soup] + list(soup.descendants):
+            assert strainer.match(element) == match(element), element
+
+        # find_all() compiles long searches, so compare against the
+        # uncompiled filter.
+        elements = list(soup.descendants) * 20
+        expect = list(super(SoupStrainer, strainer).filter(iter(elements)))
+        assert expect == list(strainer.filter(iter(elements)))
+
+    def test_functions_called_in_order(self):
+        calls = []
+
+        def first(tag):
+            calls.append(("first", tag.name))
+            return False
+
+        def second(tag):
+            calls.append(("second", tag.name))
+            return tag.name == "b"
+
+        soup = self.soup("<a></a><b></b>")
+        match = SoupStrainer(name=[first, "b", second]).compile()
+        assert not match(soup.a)
+        assert match(soup.b)
+        assert [("first", "a"), ("second", "a"), ("first", "b")] == calls
+
+    def test_subclass_matches_tag_is_respected(self):
+        class OnlyB(SoupStrainer):
+            def matches_tag(self, tag):
+                return tag.name == "b"
+
+        soup = self.soup("<a>1</a>" + "<b>2</b>" * 50)
+        assert 50 == len(soup.find_all(OnlyB(name="a")))
+
+    def test_compiled_rules_are_a_snapshot(self):
+        soup = self.soup("<a></a><b></b>")
+        strainer = SoupStrainer(name="a")
+        match = strainer.compile()
+        strainer.name_rules.append(TagNameMatchRule(string="b"))
+        assert not match(soup.b)
+        assert strainer.compile()(soup.b)
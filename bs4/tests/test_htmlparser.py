@@ -6,10 +6,13 @@ import pytest
 from bs4.builder._htmlparser import (
     _DuplicateAttributeHandler,
     BeautifulSoupHTMLParser,
+    HTMLParserEventStream,
     HTMLParserTreeBuilder,
 )
+from bs4.element import Comment, NavigableString, Script, Tag
 from bs4.exceptions import ParserRejectedMarkup
 from typing import Any
+from bs4 import BeautifulSoup
 from . import HTMLTreeBuilderSmokeTest
 
 
@@ -159,3 +162,88 @@ class TestHTMLParserTreeBuilder(HTMLTreeBuilderSmokeTest):
         markup = "<p>a &nosuchentity; b</p>"
         soup = self.soup(markup)
         assert "<p>a &amp;nosuchentity b</p>" == soup.p.decode()
+
+
+class TestHTMLParserEvents(object):
+    """Tests of parsing into a stream of events instead of a tree."""
+
+    def events(self, markup, **kwargs):
+        return list(HTMLParserTreeBuilder().iter_events(markup, **kwargs))
+
+    def tree_events(self, markup):
+        """The events that describe the tree html.parser builds."""
+        soup = BeautifulSoup(markup, "html.parser")
+        events = []
+        for event, element in soup._event_stream(soup.descendants):
+            if event in (Tag.START_ELEMENT_EVENT, Tag.EMPTY_ELEMENT_EVENT):
+                events.append(("start", element.name, dict(element.attrs)))
+            if event in (Tag.END_ELEMENT_EVENT, Tag.EMPTY_ELEMENT_EVENT):
+                events.append(("end", element.name))
+            if event is Tag.STRING_ELEMENT_EVENT:
+                events.append(("data", str(element), type(element)))
+        return events
+
+    def simplify(self, events):
+        simple = []
+        for event in events:
+            if event.type == HTMLParserEventStream.START:
+                simple.append(("start", event.name, dict(event.attrs)))
+            elif event.type == HTMLParserEventStream.END:
+                simple.append(("end", event.name))
+            elif event.type == HTMLParserEventStream.DATA:
+                simple.append(("data", event.data, event.string_class))
+        return simple
+
+    @pytest.mark.parametrize(
+        "markup",
+        [
+            "<p class='a b'>text<br>more</p>",
+            "<p>a<b>b<i>c</p>d</i>e</b>",
+            "<br></br><img src='x'/><a>unclosed",
+            "<!DOCTYPE html><!--comment--><pre>  </pre><div>  \n </div>",
+            "<script>if (a < b) {}</script><p>&amp; &#147; &nosuchentity;</p>",
+        ],
+    )
+    def test_events_match_tree(self, markup):
+        expect = self.tree_events(markup)
+        assert expect == self.simplify(self.events(markup))
+        # Feeding the markup a few characters at a time makes no difference.
+        assert expect == self.simplify(self.events(markup, chunk_size=3))
+
+    def test_string_classes(self):
+        events = self.events("<!--c--><script>x</script><p>y</p>")
+        classes = [e.string_class for e in events if e.type == HTMLParserEventStream.DATA]
+        assert [Comment, Script, NavigableString] == classes
+
+    def test_collect_elements(self):
+        markup = (
+            '<a href="/1">One</a><div><a href="/2" class="x y">T<b>w</b>o'
+            "<!--not text--></a><a>three</div>"
+        )
+        elements = [
+            (e.name, dict(e.attrs), e.data)
+            for e in self.events(markup, collect=["a"])
+            if e.type == HTMLParserEventStream.ELEMENT
+        ]
+        assert [
+            ("a", {"href": "/1"}, "One"),
+            ("a", {"href": "/2", "class": ["x", "y"]}, "Two"),
+            ("a", {}, "three"),
+        ] == elements
+
+    def test_feed_events_calls_handler(self):
+        seen = []
+        HTMLParserTreeBuilder().feed_events(
+            "<p>caf\xe9</p>".encode("latin-1"), seen.append, from_encoding="latin-1"
+        )
+        assert ["start", "data", "end"] == [e.type for e in seen]
+        assert "caf\xe9" == seen[1].data
+
+    def test_builder_settings_apply(self):
+        builder = HTMLParserTreeBuilder(multi_valued_attributes=None)
+        (start, _, _) = list(builder.iter_events("<p class='a b'>x</p>"))
+        assert {"class": "a b"} == start.attrs
+
+    def test_rejected_input(self):
+        with pytest.raises(ParserRejectedMarkup):
+            self.events(b"<![UNKNOWN[]]>")
@@ -0,0 +1,118 @@
+"""Tests for the optional tag index (BeautifulSoup(build_index=True))."""
+
+import pickle
+import re
+
+import pytest
+
+from bs4._index import TreeIndex
+from bs4.filter import SoupStrainer
+from . import SoupTest
+
+MARKUP = """<html><head><title>Company</title></head>
+<body>
+<div id="header" class="nav top"><a href="/">Home</a><a>No link</a></div>
+<div class="company-list">
+ <div class="company-item"><a href="/c/1" class="name">One</a><p class="addr">Tokyo</p></div>
+ <div class="company-item featured"><a href="/c/2" class="name">Two</a><p>Osaka</p></div>
+ <div class="company-item"><span><a href="/c/3">Three</a></span></div>
+</div>
+<footer><a href="/contact/" class="nav">Contact</a></footer>
+</body></html>"""
+
+QUERIES = [
+    dict(name="a"),
+    dict(name="a", href=True),
+    dict(name="div", class_="company-item"),
+    dict(class_="nav"),
+    dict(class_="company-item featured"),
+    dict(name=["a", "p"]),
+    dict(id="header"),
+    dict(name="a", limit=2),
+    dict(name="a", limit=0),
+    dict(class_="company-item", limit=0),
+    dict(name="a", string="Two"),
+    dict(name="a", href=re.compile("^/c/")),
+    dict(href=True),
+    dict(name="nosuchtag"),
+]
+
+
+class TestTreeIndex(SoupTest):
+    def test_index_is_opt_in(self):
+        assert self.soup(MARKUP)._tree_index is None
+        soup = self.soup(MARKUP, build_index=True)
+        assert isinstance(soup._tree_index, TreeIndex)
+        assert soup._tree_index.valid
+        assert soup.find("a")._tree_index is soup._tree_index
+
+    @pytest.mark.parametrize("query", QUERIES)
+    def test_results_match_unindexed_search(self, query):
+        plain = self.soup(MARKUP)
+        indexed = self.soup(MARKUP, build_index=True)
+        for plain_tag, indexed_tag in zip(
+            plain.find_all(True) + [plain], indexed.find_all(True) + [indexed]
+        ):
+            expect = [str(x) for x in plain_tag.find_all(**query)]
+            assert expect == [str(x) for x in indexed_tag.find_all(**query)]
+
+    def test_lookup_is_limited_to_subtree(self):
+        soup = self.soup(MARKUP, build_index=True)
+        item = soup.find("div", class_="featured")
+        assert ["/c/2"] == [a["href"] for a in item.find_all("a", href=True)]
+        assert item.find("p").string == "Osaka"
+        assert soup.find("footer").find("div") is None
+
+    def test_index_answers_query(self):
+        soup = self.soup(MARKUP, build_index=True)
+        matcher = SoupStrainer("div", class_="company-item")
+        results = soup._tree_index.find_all(soup, matcher, None)
+        assert 3 == len(results)
+        assert results.source is matcher
+
+        # Queries the index can't narrow down are left to the usual search.
+        assert soup._tree_index.find_all(soup, SoupStrainer(href=True), None) is None
+        assert soup._tree_index.find_all(soup, SoupStrainer(re.compile("a")), None) is None
+
+    def test_modification_invalidates_index(self):
+        soup = self.soup(MARKUP, build_index=True)
+        index = soup._tree_index
+        soup.find("div", class_="featured").extract()
+        assert not index.valid
+        assert 2 == len(soup.find_all("div", class_="company-item"))
+
+        soup.reindex()
+        assert soup._tree_index.valid
+        new = soup.new_tag("a", href="/c/4")
+        soup.find("footer").append(new)
+        assert not soup._tree_index.valid
+        assert new in soup.find_all("a", href=True)
+
+    def test_attribute_assignment_invalidates_index(self):
+        soup = self.soup(MARKUP, build_index=True)
+        soup.find("p")["class"] = "company-item"
+        assert 4 == len(soup.find_all(class_="company-item"))
+        del soup.find("div", id="header")["id"]
+        assert soup.find(id="header") is None
+
+    def test_inserting_a_string_keeps_index(self):
+        soup = self.soup(MARKUP, build_index=True)
+        soup.find("p").append(" (HQ)")
+        assert soup._tree_index.valid
+        assert "Tokyo (HQ)" == soup.find("p", class_="addr").get_text()
+
+    def test_reindex_after_direct_change(self):
+        soup = self.soup(MARKUP, build_index=True)
+        soup.find("p").name = "section"
+        soup.reindex()
+        assert ["section"] == [x.name for x in soup.find_all("section")]
+
+    def test_pickle(self):
+        soup = self.soup(MARKUP, build_index=True)
+        copy = pickle.loads(pickle.dumps(soup))
+        assert copy._tree_index.valid
+        assert 3 == len(copy.find_all("div", class_="company-item"))
+
+        tag = pickle.loads(pickle.dumps(soup.find("div", class_="company-list")))
+        assert not tag._tree_index.valid
+        assert 3 == len(tag.find_all("a", href=True))
@@ -5,6 +5,7 @@ import pickle
 import pytest
 import sys
 import warnings
+import weakref
 
 from bs4 import BeautifulSoup
 from bs4.element import (
@@ -435,3 +436,57 @@ class TestEquality(SoupTest):
         # NavigableStrings with the same contents hash to the value of
         # the contents.
         assert hash(first_string) == hash(second_string) == hash("string")
+
+
+class TestNodeStorage(SoupTest):
+    "Tags and strings keep their state in slots, not a __dict__."
+
+    def test_parsing_creates_no_instance_dicts(self):
+        soup = self.soup('<div class="a"><p>one<b>two</b></p><!--three--></div>')
+        for element in soup.descendants:
+            assert {} == element.__dict__
+
+    def test_other_attributes_can_still_be_set(self):
+        soup = self.soup("<p>text</p>")
+        soup.p.custom = "value"
+        soup.p.string.custom = "value"
+        assert "value" == soup.p.custom == soup.p.string.custom
+
+        copy = pickle.loads(pickle.dumps(soup.p))
+        assert "value" == copy.custom
+        assert "<p>text</p>" == copy.decode()
+
+    def test_weak_references(self):
+        soup = self.soup("<p>text</p>")
+        assert weakref.ref(soup.p)() is soup.p
+        assert weakref.ref(soup.p.string)() is soup.p.string
+
+    def test_tags_share_empty_namespaces(self):
+        soup = self.soup("<p><b>text</b></p>")
+        assert {} == soup.p._namespaces
+        assert soup.p._namespaces is soup.b._namespaces
+        assert soup.p._namespaces is soup.new_tag("i")._namespaces
+
+    def test_decompose_releases_references(self):
+        soup = self.soup("<div><p>one<b>two</b></p></div><span>three</span>")
+        b = soup.b
+        ref = weakref.ref(b)
+        soup.div.decompose()
+        assert b.decomposed
+        del b
+        assert ref() is None
+        assert "<span>three</span>" == soup.decode()
+
+    def test_decomposed_tag_can_still_be_inspected(self):
+        soup = self.soup("<div><p>one<b>two</b></p></div>")
+        b = soup.b
+        text = b.string
+        soup.div.decompose()
+        assert b.decomposed
+        assert b.parent is None
+        assert b.name is None
+        assert b.next_element is None
+        assert "" == b.get_text()
+        assert [] == b.contents
+        assert text.decomposed
+        assert text.parent is None
@@ -8,6 +8,8 @@ import os
 from datetime import datetime
 from collections import defaultdict
 
+from scraper.dedup import dedup_key
+
 def create_area_csv():
     """JSONファイルから地域企業データを抽出"""
     
@@ -72,31 +74,31 @@ def create_area_csv():
         unique_companies = {}
         
         for record in all_data:
-            url = record.get('official_site_url', '').strip()
-            if not url:
+            key = dedup_key(record)
+            if not key:
                 continue
             
-            if url not in unique_companies:
-                unique_companies[url] = record
+            if key not in unique_companies:
+                unique_companies[key] = record
     else:
         # 地域データからユニーク企業を抽出
         unique_companies = {}
         area_distribution = defaultdict(list)
         
         for record in area_records:
-            url = record.get('official_site_url', '').strip()
-            if not url:
+            key = dedup_key(record)
+            if not key:
                 continue
             
             area_name = record.get('category_name', '')
-            if url not in unique_companies:
-                unique_companies[url] = record
-                unique_companies[url]['areas'] = [area_name]
+            if key not in unique_companies:
+                unique_companies[key] = record
+                unique_companies[key]['areas'] = [area_name]
             else:
-                if area_name not in unique_companies[url]['areas']:
-                    unique_companies[url]['areas'].append(area_name)
+                if area_name not in unique_companies[key]['areas']:
+                    unique_companies[key]['areas'].append(area_name)
             
-            area_distribution[area_name].append(url)
+            area_distribution[area_name].append(key)
         
         # 地域別分布を表示
         print("\n地域別企業数（上位15）:")
@@ -7,6 +7,8 @@ import csv
 import os
 from datetime import datetime
 
+from scraper.dedup import dedup_key
+
 def create_area_unique_csv():
     """地域データからユニークな企業CSVを作成"""
     
@@ -45,12 +47,12 @@ def create_area_unique_csv():
     print(f"\n使用ファイル: {used_file}")
     print(f"総レコード数: {len(area_data)}件")
     
-    # ユニークな企業を抽出（official_site_urlをキーとして使用）
+    # ユニークな企業を抽出（official_site_urlの正規化キーを使用）
     unique_companies = {}
     area_distribution = {}
     
     for record in area_data:
-        key = record.get('official_site_url', '')
+        key = dedup_key(record)
         if not key:
             key = record.get('company_name', '')
         
@@ -2,11 +2,14 @@
 """
 全データから重複を排除し、カテゴリ情報を集約したCSVを作成
 """
-import json
 import csv
 import os
 from datetime import datetime
-from collections import defaultdict
+
+from scraper.company_store import CompanyStore
+
+# このスクリプト専用の企業ストア（他のマージスクリプトの取り込み分を混ぜない）
+STORE_PATH = 'yuryoweb_store_final_unique.sqlite3'
 
 def create_final_csv():
     """最終的なユニーク企業CSVを作成"""
@@ -30,62 +33,19 @@ def create_final_csv():
     
     print(f"\nデータファイル読み込み: {all_data_file}")
     
+    # 企業ストアへ差分マージ（前回から変わっていなければ読み直さない）
+    store = CompanyStore(STORE_PATH)
     try:
-        with open(all_data_file, 'r', encoding='utf-8') as f:
-            all_data = json.load(f)
-        print(f"  総レコード数: {len(all_data):,}件")
+        result = store.merge_file(all_data_file)
+        print(f"  総レコード数: {result['records']:,}件" + ("（変更なし）" if result['skipped'] else ""))
     except Exception as e:
         print(f"エラー: {e}")
+        store.close()
         return 0
     
-    # 企業ごとにカテゴリ情報を集約
-    companies = defaultdict(lambda: {
-        'company_name': '',
-        'official_site_url': '',
-        'yuryoweb_url': '',
-        'addresses': set(),
-        'area_categories': set(),
-        'price_categories': set(),
-        'feature_categories': set(),
-        'industry_categories': set()
-    })
-    
-    # カテゴリ別の統計
-    category_stats = defaultdict(int)
-    
-    print("\nデータ処理中...")
-    for record in all_data:
-        # ユニークキーとして公式サイトURLを使用
-        url = record.get('official_site_url', '').strip()
-        if not url:
-            continue
-        
-        company = companies[url]
-        company['company_name'] = record.get('company_name', '')
-        company['official_site_url'] = url
-        company['yuryoweb_url'] = record.get('yuryoweb_url', '')
-        
-        # 住所を追加
-        address = record.get('address', '').strip()
-        if address:
-            company['addresses'].add(address)
-        
-        # カテゴリグループごとに分類
-        category_group = record.get('category_group', '')
-        category_name = record.get('category_name', '')
-        
-        if category_group == 'area':
-            company['area_categories'].add(category_name)
-        elif category_group == 'price':
-            company['price_categories'].add(category_name)
-        elif category_group == 'feature':
-            company['feature_categories'].add(category_name)
-        elif category_group == 'industry':
-            company['industry_categories'].add(category_name)
-        
-        category_stats[category_group] += 1
+    category_stats = result['groups']
     
-    print(f"\nユニーク企業数: {len(companies):,}社")
+    print(f"\nユニーク企業数: {len(store):,}社")
     
     # カテゴリ統計を表示
     print("\nカテゴリ別レコード数:")
@@ -93,8 +53,11 @@ def create_final_csv():
         print(f"  {group}: {count:,}件")
     
     # 複数カテゴリに属する企業の統計
-    multi_industry = sum(1 for c in companies.values() if len(c['industry_categories']) > 1)
-    multi_area = sum(1 for c in companies.values() if len(c['area_categories']) > 1)
+    multi_industry = 0
+    multi_area = 0
+    for company in store.iter_companies():
+        multi_industry += len(company['industry_categories']) > 1
+        multi_area += len(company['area_categories']) > 1
     
     print(f"\n複数カテゴリに属する企業:")
     print(f"  複数業種: {multi_industry:,}社")
@@ -103,37 +66,11 @@ def create_final_csv():
     # CSVファイルに出力
     output_file = f"yuryoweb_all_companies_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        
-        # ヘッダー
-        writer.writerow([
-            'company_name',
-            'official_site_url',
-            'yuryoweb_url',
-            'address',
-            'area_categories',
-            'price_categories',
-            'feature_categories',
-            'industry_categories'
-        ])
-        
-        # データ書き込み
-        for company in sorted(companies.values(), key=lambda x: x['company_name']):
-            writer.writerow([
-                company['company_name'],
-                company['official_site_url'],
-                company['yuryoweb_url'],
-                '｜'.join(sorted(company['addresses'])),
-                '｜'.join(sorted(company['area_categories'])),
-                '｜'.join(sorted(company['price_categories'])),
-                '｜'.join(sorted(company['feature_categories'])),
-                '｜'.join(sorted(company['industry_categories']))
-            ])
+    store.write_csv(output_file)
     
     print(f"\n✅ CSVファイル作成完了")
     print(f"   ファイル名: {output_file}")
-    print(f"   企業数: {len(companies):,}社")
+    print(f"   企業数: {len(store):,}社")
     
     # 簡易版も作成（基本情報のみ）
     simple_output = f"yuryoweb_companies_simple_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
@@ -150,16 +87,16 @@ def create_final_csv():
         ])
         
         # データ書き込み
-        for company in sorted(companies.values(), key=lambda x: x['company_name']):
+        for company in store.iter_companies():
             # メイン業種を1つ選択
             main_industry = ''
             if company['industry_categories']:
-                main_industry = sorted(company['industry_categories'])[0]
+                main_industry = company['industry_categories'][0]
             
             writer.writerow([
                 company['company_name'],
                 company['official_site_url'],
-                '｜'.join(sorted(company['addresses'])),
+                '｜'.join(company['addresses']),
                 main_industry
             ])
     
@@ -169,7 +106,9 @@ def create_final_csv():
     print(f"\n処理完了: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*80)
     
-    return len(companies)
+    count = len(store)
+    store.close()
+    return count
 
 if __name__ == "__main__":
     count = create_final_csv()
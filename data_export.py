@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+絞り込み結果のストリーミング書き出し（CSV / JSONL / XLSX を一定件数ずつバイト列で返す）
+"""
+import csv
+import io
+import json
+import re
+import zipfile
+from typing import Dict, Iterable, Iterator, List, Sequence
+from xml.sax.saxutils import escape
+
+# 1回に書き出す行数
+EXPORT_BATCH_ROWS = 500
+
+# 形式ごとの (Content-Type, 拡張子)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson; charset=utf-8', 'jsonl'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+# XMLに書けない制御文字
+XML_ILLEGAL_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """書き込まれたバイト列を溜めておき、take() で取り出す（シーク不可の出力先）"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _batches(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_csv(rows: Iterable[Dict], columns: Sequence[str], batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[bytes]:
+    """CSV（ヘッダー付き）"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    for batch in _batches(rows, batch_rows):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_jsonl(rows: Iterable[Dict], columns: Sequence[str], batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[bytes]:
+    """1行1レコードのJSON"""
+    for batch in _batches(rows, batch_rows):
+        lines = [
+            json.dumps({column: row.get(column) or '' for column in columns}, ensure_ascii=False)
+            for row in batch
+        ]
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _column_name(index: int) -> str:
+    """0始まりの列番号をExcelの列名（A, B, ..., AA）にする"""
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+
+def _xlsx_row(number: int, values: Iterable[str], letters: Sequence[str]) -> str:
+    cells = ''.join(
+        f'<c r="{letter}{number}" t="inlineStr"><is><t xml:space="preserve">'
+        f'{escape(XML_ILLEGAL_RE.sub("", value or ""))}</t></is></c>'
+        for letter, value in zip(letters, values)
+    )
+    return f'<row r="{number}">{cells}</row>'
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="companies" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def iter_xlsx(rows: Iterable[Dict], columns: Sequence[str], batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[bytes]:
+    """1シートのXLSX（文字列はインライン、ZIPはデータ記述子付きで先頭から順に書く）"""
+    buffer = _ChunkBuffer()
+    letters = [_column_name(i) for i in range(len(columns))]
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        yield buffer.take()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                '<sheetData>' + _xlsx_row(1, columns, letters)
+            ).encode('utf-8'))
+            number = 1
+            for batch in _batches(rows, batch_rows):
+                parts = []
+                for row in batch:
+                    number += 1
+                    parts.append(_xlsx_row(number, (row.get(column) for column in columns), letters))
+                sheet.write(''.join(parts).encode('utf-8'))
+                yield buffer.take()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.take()
+
+
+EXPORT_WRITERS = {
+    'csv': iter_csv,
+    'jsonl': iter_jsonl,
+    'xlsx': iter_xlsx,
+}
+
+
+def iter_export(rows: Iterable[Dict], columns: Sequence[str], export_format: str = 'csv') -> Iterator[bytes]:
+    """rows を export_format で書き出したバイト列を少しずつ返す"""
+    if export_format not in EXPORT_WRITERS:
+        raise ValueError(f"未対応の形式: {export_format}")
+    for chunk in EXPORT_WRITERS[export_format](rows, columns):
+        if chunk:
+            yield chunk
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+データビューア共通のインメモリ索引（CSVは一度だけ読み、更新時刻が変わったら読み直す）
+"""
+import csv
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional
+
+# 問い合わせURL付きのCSVを優先し、無ければマージ済みCSVを使う
+DATA_FILES = [
+    'yuryoweb_complete_with_contact_20250814_005638.csv',
+    'yuryoweb_final_complete_20250814_001100.csv',
+]
+
+# 検索対象の列
+SEARCH_COLUMNS = ('company_name', 'official_site_url', 'address')
+
+# カテゴリ（ファセット）列と、セル内の区切り文字
+FACET_COLUMNS = ('area_categories', 'price_categories', 'feature_categories', 'industry_categories')
+CATEGORY_SEPARATOR = '｜'
+
+# 件数を事前計算しておく列
+COUNT_COLUMNS = ('contact_url',) + FACET_COLUMNS
+
+
+def resolve_data_file() -> str:
+    """存在する最初のデータファイル（どれも無ければ先頭の名前）"""
+    for path in DATA_FILES:
+        if os.path.exists(path):
+            return path
+    return DATA_FILES[0]
+
+
+def split_categories(value: str) -> List[str]:
+    """「｜」区切りのカテゴリ列を名前のリストにする"""
+    return [name for name in (value or '').split(CATEGORY_SEPARATOR) if name]
+
+
+def parse_filters(params: Mapping[str, List[str]]) -> Dict[str, List[str]]:
+    """parse_qs の結果からカテゴリ条件を取り出す（同じ列の指定は繰り返しか「｜」区切り）"""
+    filters = {}
+    for column in FACET_COLUMNS:
+        values = [name for value in params.get(column, []) for name in split_categories(value)]
+        if values:
+            filters[column] = values
+    return filters
+
+
+# 1バイトの値 → 立っているビット位置
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def to_bitmap(ids: Iterable[int], size: int) -> int:
+    """行番号の集合を、行番号のビットを立てた整数にする"""
+    bits = bytearray((size + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def from_bitmap(mask: int) -> List[int]:
+    """ビットの立っている行番号を昇順に返す"""
+    ids = []
+    for offset, byte in enumerate(mask.to_bytes((mask.bit_length() + 7) // 8, 'little')):
+        if byte:
+            base = offset << 3
+            ids.extend(base + bit for bit in _BYTE_BITS[byte])
+    return ids
+
+
+class DataIndex:
+    """CSVの全行と検索用のn-gram転置索引
+
+    - 検索対象列を小文字化し、1〜3文字のn-gramごとに行番号の集合を持つ
+      （列をまたぐn-gramは作らないので「どれかの列に部分一致」と同じ意味になる）
+    - 1〜2文字の検索は索引だけで確定し、3文字以上はトライグラムの積集合で
+      候補を絞ってから部分一致を確認する
+    - カテゴリ (列, カテゴリ名) と問い合わせURLの有無は、行番号のビットを立てた整数
+      （ビットマップ）で持つ。同じ列の指定は OR、列どうし・検索語とは AND で絞り込み、
+      件数は bit_count() で数える
+    - 問い合わせURLの有無などの件数は読み込み時に数えておく
+    """
+
+    def __init__(self, path: str, cache_size: int = 256):
+        self.path = path
+        stat = os.stat(path)
+        self.mtime = stat.st_mtime
+        self.size = stat.st_size
+        # 読み込んだ版を表すETag（ビューアのキャッシュ検証用）
+        self.etag = '"%x-%x"' % (stat.st_size, stat.st_mtime_ns)
+        self.cache_size = cache_size
+        self.cache: OrderedDict = OrderedDict()
+        self.cache_lock = threading.Lock()
+
+        with open(path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            self.columns: List[str] = list(reader.fieldnames or [])
+            self.rows: List[Dict[str, str]] = list(reader)
+
+        self.texts: List[tuple] = []
+        grams = defaultdict(set)
+        for row_id, row in enumerate(self.rows):
+            fields = tuple((row.get(column) or '').lower() for column in SEARCH_COLUMNS)
+            self.texts.append(fields)
+            for text in fields:
+                length = len(text)
+                for n in (1, 2, 3):
+                    for i in range(length - n + 1):
+                        grams[text[i:i + n]].add(row_id)
+        self.grams: Dict[str, frozenset] = {gram: frozenset(ids) for gram, ids in grams.items()}
+
+        facets = {column: defaultdict(set) for column in FACET_COLUMNS}
+        for row_id, row in enumerate(self.rows):
+            for column in FACET_COLUMNS:
+                for name in split_categories(row.get(column)):
+                    facets[column][name].add(row_id)
+        size = len(self.rows)
+        self.facets: Dict[str, Dict[str, int]] = {
+            column: {name: to_bitmap(ids, size) for name, ids in sorted(names.items())}
+            for column, names in facets.items()
+        }
+
+        self.all_bits = (1 << size) - 1
+        self.contact_bits = to_bitmap((i for i, row in enumerate(self.rows) if row.get('contact_url')), size)
+        self.counts = {
+            column: sum(1 for row in self.rows if row.get(column))
+            for column in COUNT_COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def is_stale(self) -> bool:
+        """ファイルが読み込み後に更新されたか"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_mtime != self.mtime or stat.st_size != self.size
+
+    def _search(self, search: str) -> Optional[frozenset]:
+        """検索語に部分一致する行番号の集合（検索語が空なら None = 全件）"""
+        term = search.strip().lower()
+        if not term:
+            return None
+        if len(term) <= 3:
+            return self.grams.get(term, frozenset())
+
+        # トライグラムの積集合（件数の少ない順）で候補を絞る
+        postings = sorted(
+            (self.grams.get(term[i:i + 3], frozenset()) for i in range(len(term) - 2)),
+            key=len
+        )
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates = candidates & posting
+        return frozenset(
+            row_id for row_id in candidates
+            if any(term in text for text in self.texts[row_id])
+        )
+
+    def _cached(self, key, compute):
+        with self.cache_lock:
+            value = self.cache.get(key)
+            if value is not None:
+                self.cache.move_to_end(key)
+                return value
+        value = compute()
+        with self.cache_lock:
+            self.cache[key] = value
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return value
+
+    def _search_bits(self, search: str) -> int:
+        """検索語に部分一致する行のビットマップ（検索語が空なら全行）"""
+        term = search.strip().lower()
+        if not term:
+            return self.all_bits
+
+        def compute():
+            return to_bitmap(self._search(term), len(self.rows))
+        return self._cached(('search', term), compute)
+
+    def _filter_bits(self, column: str, names: Iterable[str]) -> int:
+        """1列分のカテゴリ指定（いずれかに属する行）のビットマップ"""
+        postings = self.facets.get(column, {})
+        mask = 0
+        for name in names:
+            mask |= postings.get(name, 0)
+        return mask
+
+    @staticmethod
+    def _normalize_filters(filters: Optional[Mapping[str, Iterable[str]]]) -> Dict[str, frozenset]:
+        return {column: frozenset(names) for column, names in (filters or {}).items() if names}
+
+    def mask(
+        self,
+        search: str = '',
+        contact_only: bool = False,
+        filters: Optional[Mapping[str, Iterable[str]]] = None,
+        skip_column: Optional[str] = None
+    ) -> int:
+        """条件に合う行のビットマップ（skip_column の列のカテゴリ指定は無視する）"""
+        mask = self._search_bits(search)
+        if contact_only:
+            mask &= self.contact_bits
+        for column, names in self._normalize_filters(filters).items():
+            if column != skip_column:
+                mask &= self._filter_bits(column, names)
+        return mask
+
+    def query(
+        self,
+        search: str = '',
+        contact_only: bool = False,
+        filters: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> List[int]:
+        """条件に合う行番号をCSVの順で返す（直近の結果はキャッシュする）"""
+        filters = self._normalize_filters(filters)
+        key = (search.strip().lower(), contact_only, frozenset(filters.items()))
+        return self._cached(key, lambda: from_bitmap(self.mask(search, contact_only, filters)))
+
+    def facet_counts(
+        self,
+        search: str = '',
+        contact_only: bool = False,
+        filters: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> Dict:
+        """現在の条件でのカテゴリ別件数
+
+        各列の件数はその列自身の指定を外した条件で数える（同じ列で別のカテゴリを
+        追加したときの件数が分かるように）。件数0のカテゴリも返す。
+        """
+        filters = self._normalize_filters(filters)
+        mask = self.mask(search, contact_only, filters)
+        facets = {}
+        for column, postings in self.facets.items():
+            base = self.mask(search, contact_only, filters, skip_column=column) if column in filters else mask
+            facets[column] = {name: (base & bits).bit_count() for name, bits in postings.items()}
+        return {
+            'total': mask.bit_count(),
+            'with_contact': (mask & self.contact_bits).bit_count(),
+            'facets': facets
+        }
+
+    def page(
+        self,
+        page: int = 1,
+        per_page: Optional[int] = 100,
+        search: str = '',
+        contact_only: bool = False,
+        filters: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> Dict:
+        """/api/data のレスポンス（per_page が None なら全件）"""
+        ids = self.query(search, contact_only, filters)
+        total = len(ids)
+        if not per_page:
+            per_page = max(total, 1)
+        total_pages = (total + per_page - 1) // per_page if per_page < total else 1
+
+        start_idx = (page - 1) * per_page
+        end_idx = min(start_idx + per_page, total)
+        items = [self.rows[i] for i in ids[start_idx:end_idx]]
+
+        if contact_only:
+            with_contact = total
+        else:
+            with_contact = (self.mask(search, contact_only, filters) & self.contact_bits).bit_count()
+
+        return {
+            'items': items,
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'total_pages': total_pages,
+            'with_contact': with_contact
+        }
+
+
+_indexes: Dict[str, DataIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(path: Optional[str] = None) -> DataIndex:
+    """共有の索引を返す（初回と、ファイル更新後の最初の呼び出しでだけ読み込む）"""
+    path = path or resolve_data_file()
+    index = _indexes.get(path)
+    if index is not None and not index.is_stale():
+        return index
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None or index.is_stale():
+            index = DataIndex(path)
+            _indexes[path] = index
+    return index
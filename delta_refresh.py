@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+差分更新 - 前回のマージ済みCSVにない企業だけを取得（夜間更新用）
+"""
+from scraper.yuryoweb_scraper import YuryoWebScraper
+from scraper.delta import delta_crawl, load_known_urls
+from scraper.sink import JsonlSink
+import time
+from datetime import datetime
+
+def delta_refresh(base_csv='yuryoweb_final_complete_20250814_001100.csv'):
+    """既知企業に到達したカテゴリから順に打ち切る差分クロール"""
+
+    print("="*80)
+    print("差分更新")
+    print(f"開始時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*80)
+
+    # 既知の企業を読み込み
+    print(f"\n既知企業を読み込み中: {base_csv}")
+    known = load_known_urls(base_csv)
+    known_total = len(set().union(*known.values())) if known else 0
+    print(f"  ✅ {known_total:,}社 / {len(known)}カテゴリ")
+
+    # スクレイパー初期化（一覧ページはキャッシュで再検証する）
+    scraper = YuryoWebScraper(delay_seconds=1.5, cache_dir='.yuryoweb_cache', listing_max_age=3600)
+
+    print("\nカテゴリ情報を取得中...")
+    categories = scraper.fetch_categories()
+
+    start_time = time.time()
+    changes = delta_crawl(scraper, categories, known)
+    elapsed = time.time() - start_time
+
+    summary = changes.summary()
+    print(f"\n{'='*60}")
+    print("差分結果:")
+    print(f"  追加: {summary['added']:,}件")
+    print(f"  削除: {summary['removed']:,}件")
+    print(f"  既知ページで停止: {summary['stopped_at_known']}カテゴリ")
+    print(f"  最終ページまで取得: {summary['walked_to_end']}カテゴリ")
+    print(f"  0件のページで停止（削除判定なし）: {summary['stopped_at_empty']}カテゴリ")
+    print(f"  取得エラー: {summary['errors']}カテゴリ")
+    print(f"  処理時間: {elapsed:.1f}秒 ({elapsed/60:.1f}分)")
+    print(f"{'='*60}")
+
+    # 変更セットを保存
+    output_file = f"delta_changes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    with JsonlSink(output_file, append=False) as sink:
+        sink.consume(changes.to_records())
+    print(f"\n✅ 変更セット保存: {output_file}")
+
+    return summary
+
+if __name__ == "__main__":
+    delta_refresh()
@@ -2,14 +2,15 @@
 """
 拡張版データビューア（全企業表示・ページネーション対応）
 """
-import http.server
-import socketserver
 import json
-import csv
-import os
+from datetime import datetime
 from urllib.parse import parse_qs, urlparse
 
-class DataHandler(http.server.SimpleHTTPRequestHandler):
+from data_export import EXPORT_FORMATS, iter_export
+from data_index import get_index, parse_filters, resolve_data_file
+from viewer_http import ViewerRequestHandler, derived_etag, serve
+
+class DataHandler(ViewerRequestHandler):
     def do_GET(self):
         parsed = urlparse(self.path)
         
@@ -21,9 +22,11 @@ class DataHandler(http.server.SimpleHTTPRequestHandler):
             per_page = int(params.get('per_page', ['100'])[0])
             search = params.get('search', [''])[0]
             contact_only = params.get('contact_only', ['false'])[0] == 'true'
-            self.serve_data(page, per_page, search, contact_only)
+            self.serve_data(page, per_page, search, contact_only, parse_filters(params))
+        elif parsed.path == '/api/facets':
+            self.serve_facets(parse_qs(parsed.query))
         elif parsed.path.startswith('/download'):
-            self.serve_download()
+            self.serve_download(parse_qs(parsed.query))
         else:
             super().do_GET()
     
@@ -342,8 +345,13 @@ class DataHandler(http.server.SimpleHTTPRequestHandler):
                     <option value="all">全て表示</option>
                 </select>
             </div>
-            <a href="/download" class="btn download-btn">
-                📥 CSVダウンロード
+            <select class="per-page-select" id="exportFormat" onchange="updateDownloadLink()">
+                <option value="csv" selected>CSV</option>
+                <option value="xlsx">Excel</option>
+                <option value="jsonl">JSONL</option>
+            </select>
+            <a href="/download" class="btn download-btn" id="downloadLink">
+                📥 ダウンロード
             </a>
         </div>
         
@@ -512,6 +520,15 @@ class DataHandler(http.server.SimpleHTTPRequestHandler):
             
             document.getElementById('filterInfo').textContent = 
                 filterText.length > 0 ? `フィルター: ${filterText.join(', ')}` : 'フィルター: なし';
+            
+            updateDownloadLink();
+        }
+        
+        function updateDownloadLink() {
+            // 表示中の条件で絞り込んだ結果をダウンロード
+            const format = document.getElementById('exportFormat').value;
+            document.getElementById('downloadLink').href =
+                `/download?format=${format}&search=${encodeURIComponent(searchTerm)}&contact_only=${contactOnly}`;
         }
         
         function changePage(action) {
@@ -573,82 +590,68 @@ class DataHandler(http.server.SimpleHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(html.encode('utf-8'))
     
-    def serve_data(self, page=1, per_page=100, search='', contact_only=False):
-        """JSONデータを提供（ページネーション対応）"""
-        csv_file = 'yuryoweb_complete_with_contact_20250814_005638.csv'
-        
-        if not os.path.exists(csv_file):
-            csv_file = 'yuryoweb_final_complete_20250814_001100.csv'
-        
+    def serve_data(self, page=1, per_page=100, search='', contact_only=False, filters=None):
+        """JSONデータを提供（ページネーション対応、共有の索引から検索）"""
         try:
-            # 全データ読み込み
-            all_data = []
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # フィルタリング
-                    if search:
-                        search_lower = search.lower()
-                        if not any([
-                            search_lower in (row.get('company_name', '') or '').lower(),
-                            search_lower in (row.get('official_site_url', '') or '').lower(),
-                            search_lower in (row.get('address', '') or '').lower()
-                        ]):
-                            continue
-                    
-                    if contact_only and not row.get('contact_url'):
-                        continue
-                    
-                    all_data.append(row)
+            index = get_index()
             
-            # ページネーション計算
-            total = len(all_data)
-            total_pages = (total + per_page - 1) // per_page if per_page < total else 1
+            # データと条件が前回と同じならページを組み立てずに 304
+            etag = derived_etag(
+                index.etag, str(page), str(per_page), search, str(contact_only),
+                json.dumps(filters or {}, ensure_ascii=False, sort_keys=True)
+            )
+            if self.not_modified(etag):
+                return
             
-            # 該当ページのデータ取得
-            start_idx = (page - 1) * per_page
-            end_idx = min(start_idx + per_page, total)
-            page_data = all_data[start_idx:end_idx]
+            response = index.page(page, per_page, search, contact_only, filters)
+            self.send_json(response, etag=etag, cors=True)
             
-            # 統計計算
-            with_contact = sum(1 for d in all_data if d.get('contact_url'))
+        except Exception as e:
+            self.send_error(500, str(e))
+    
+    def serve_facets(self, params):
+        """カテゴリ別件数を提供（/api/data と同じ絞り込み条件）"""
+        try:
+            index = get_index()
+            search = params.get('search', [''])[0]
+            contact_only = params.get('contact_only', ['false'])[0] == 'true'
+            filters = parse_filters(params)
             
-            response = {
-                'items': page_data,
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'total_pages': total_pages,
-                'with_contact': with_contact
-            }
+            etag = derived_etag(
+                index.etag, 'facets', search, str(contact_only),
+                json.dumps(filters, ensure_ascii=False, sort_keys=True)
+            )
+            if self.not_modified(etag):
+                return
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+            self.send_json(index.facet_counts(search, contact_only, filters), etag=etag, cors=True)
             
         except Exception as e:
             self.send_error(500, str(e))
     
-    def serve_download(self):
-        """CSVダウンロード"""
-        csv_file = 'yuryoweb_complete_with_contact_20250814_005638.csv'
+    def serve_download(self, params=None):
+        """ダウンロード（条件なしのCSVはファイルをそのまま流し、
+        条件か形式の指定があれば該当行だけを書き出しながら流す）"""
+        params = params or {}
+        export_format = params.get('format', ['csv'])[0]
+        search = params.get('search', [''])[0]
+        contact_only = params.get('contact_only', ['false'])[0] == 'true'
+        filters = parse_filters(params)
         
-        if not os.path.exists(csv_file):
-            csv_file = 'yuryoweb_final_complete_20250814_001100.csv'
+        if export_format not in EXPORT_FORMATS:
+            self.send_error(400, f"Unsupported format: {export_format}")
+            return
         
-        if os.path.exists(csv_file):
-            with open(csv_file, 'rb') as f:
-                content = f.read()
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'text/csv; charset=utf-8')
-            self.send_header('Content-Disposition', 'attachment; filename="yuryoweb_data.csv"')
-            self.end_headers()
-            self.wfile.write(content)
-        else:
-            self.send_error(404, "File not found")
+        if export_format == 'csv' and not (search.strip() or contact_only or filters):
+            self.send_download(resolve_data_file(), 'yuryoweb_data.csv')
+            return
+        
+        index = get_index()
+        ids = index.query(search, contact_only, filters)
+        content_type, extension = EXPORT_FORMATS[export_format]
+        filename = f"yuryoweb_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+        rows = (index.rows[i] for i in ids)
+        self.send_stream(iter_export(rows, index.columns, export_format), filename, content_type)
 
 def main():
     PORT = 3000  # ポート3000に変更
@@ -664,15 +667,13 @@ def main():
     print("  • ページネーション")
     print("  • リアルタイム検索")
     print("  • 問い合わせURLフィルター")
-    print("  • CSVダウンロード")
+    print("  • 絞り込み結果のダウンロード（CSV / Excel / JSONL）")
+    print("  • 同時アクセス対応（gzip / ETag）")
     print(f"\nCtrl+C で終了")
     print("="*60)
     
-    # ポート使用中のエラー対策
-    socketserver.TCPServer.allow_reuse_address = True
-    
-    with socketserver.TCPServer(("", PORT), DataHandler) as httpd:
-        httpd.serve_forever()
+    # リクエストごとにスレッドで処理（ポート再利用も有効）
+    serve(PORT, DataHandler)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -3,165 +3,15 @@
 全企業の問い合わせURL抽出して最終CSVに追加
 """
 import csv
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
 import time
 from datetime import datetime
-import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
 
-# 問い合わせ関連のキーワード
-CONTACT_KEYWORDS = [
-    'contact', 'inquiry', 'form', '問い合わせ', 'お問い合わせ', '問合せ', '問合わせ',
-    'toiawase', 'otoiawase', 'mail', 'メール', 'フォーム', '相談', 'soudan',
-    '見積', 'estimate', 'mitsumori', '資料請求', 'request', '申し込み', 'apply',
-    'support', 'サポート', 'ご相談', 'ご質問', 'question'
-]
+from scraper.adaptive import AdaptiveConcurrency
+from scraper.contact_engine import ContactEngine
+from scraper.metrics import CrawlMetrics, MetricsDashboard, MetricsServer
 
-# 除外するキーワード
-EXCLUDE_KEYWORDS = [
-    'privacy', 'policy', 'terms', 'プライバシー', '規約', '利用規約',
-    'sitemap', 'サイトマップ', 'recruit', '採用', 'career', 'login', 'ログイン'
-]
-
-class ContactExtractor:
-    def __init__(self, timeout=7, max_workers=15):
-        self.timeout = timeout
-        self.max_workers = max_workers
-        self.lock = threading.Lock()
-        self.results = {}
-        self.processed = 0
-        self.success = 0
-        self.found = 0
-        self.start_time = time.time()
-        
-    def create_session(self):
-        """新しいセッションを作成"""
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
-        return session
-        
-    def is_contact_url(self, url, text=''):
-        """URLや付随テキストが問い合わせ関連か判定"""
-        url_lower = url.lower()
-        text_lower = text.lower()
-        
-        # 除外キーワードチェック
-        for keyword in EXCLUDE_KEYWORDS:
-            if keyword in url_lower or keyword in text_lower:
-                return False
-        
-        # 問い合わせキーワードチェック
-        for keyword in CONTACT_KEYWORDS:
-            if keyword in url_lower or keyword in text_lower:
-                return True
-        
-        return False
-    
-    def extract_from_site(self, company):
-        """1つのサイトから問い合わせURLを抽出"""
-        session = self.create_session()
-        site_url = company['official_site_url']
-        
-        try:
-            # URLの正規化
-            if not site_url.startswith(('http://', 'https://')):
-                site_url = 'https://' + site_url
-            
-            # サイトにアクセス
-            response = session.get(site_url, timeout=self.timeout, allow_redirects=True)
-            response.raise_for_status()
-            
-            # HTMLをパース
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 問い合わせ関連のリンクを収集
-            contact_urls = set()
-            
-            # 全てのリンクを確認
-            for link in soup.find_all('a', href=True):
-                href = link.get('href', '')
-                if not href or href.startswith('#'):
-                    continue
-                    
-                text = link.get_text(strip=True)
-                
-                # 相対URLを絶対URLに変換
-                full_url = urljoin(response.url, href)
-                
-                # 同じドメイン内のみ
-                if urlparse(full_url).netloc == urlparse(response.url).netloc:
-                    if self.is_contact_url(full_url, text):
-                        contact_urls.add(full_url)
-                        # 最初の1つだけで十分
-                        if contact_urls:
-                            break
-            
-            # トップページ自体が問い合わせフォームの場合をチェック
-            if not contact_urls:
-                page_text = soup.get_text().lower()
-                if any(keyword in page_text for keyword in ['お名前', '会社名', 'メールアドレス', 'お問い合わせ内容', 'name', 'email', 'message']):
-                    # フォーム要素があるか確認
-                    if soup.find('form'):
-                        contact_urls.add(response.url)
-            
-            # 結果を保存
-            contact_url = list(contact_urls)[0] if contact_urls else ''
-            
-            with self.lock:
-                self.results[company['official_site_url']] = contact_url
-                self.processed += 1
-                self.success += 1
-                if contact_url:
-                    self.found += 1
-                
-                # 進捗表示（100件ごと）
-                if self.processed % 100 == 0:
-                    elapsed = time.time() - self.start_time
-                    rate = self.processed / elapsed
-                    remaining = (10021 - self.processed) / rate
-                    print(f"  進捗: {self.processed:,}/10,021件 | 成功: {self.success:,} | 発見: {self.found:,} | 残り時間: {remaining/60:.1f}分")
-            
-            return contact_url
-            
-        except:
-            with self.lock:
-                self.results[company['official_site_url']] = ''
-                self.processed += 1
-                
-                if self.processed % 100 == 0:
-                    elapsed = time.time() - self.start_time
-                    rate = self.processed / elapsed
-                    remaining = (10021 - self.processed) / rate
-                    print(f"  進捗: {self.processed:,}/10,021件 | 成功: {self.success:,} | 発見: {self.found:,} | 残り時間: {remaining/60:.1f}分")
-            
-            return ''
-        finally:
-            session.close()
-    
-    def process_all_companies(self, companies):
-        """全企業を並列処理"""
-        
-        total = len(companies)
-        print(f"処理開始: {total:,}社")
-        print(f"並列数: {self.max_workers}")
-        print(f"推定時間: 20-30分")
-        print("-" * 60)
-        
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {
-                executor.submit(self.extract_from_site, company): company
-                for company in companies
-            }
-            
-            for future in as_completed(futures):
-                future.result()
-        
-        return self.results
+# Prometheus形式の計測値を公開するポート（http://127.0.0.1:9108/metrics）
+METRICS_PORT = 9108
 
 def main():
     """メイン処理"""
@@ -198,8 +48,40 @@ def main():
     print(f"\n問い合わせURL抽出を開始します...")
     start_time = time.time()
     
-    extractor = ContactExtractor(timeout=7, max_workers=15)
-    contact_results = extractor.process_all_companies(companies)
+    # 最初の1件だけで十分、見つからなければトップページのフォームも判定
+    # トップページに無いサイトは会社概要・sitemap.xml 等を最大3ページまで追加で辿る
+    # （追加リクエストは全体で企業数の2倍まで）
+    # 段階別の時間・エラー分類・ドメイン別集計を取り、ライブ表示する
+    # 並列数は16〜64、期限は3〜7秒の範囲で完了状況に応じて自動調整
+    metrics = CrawlMetrics(name='contact_extract', total=len(companies))
+    dashboard = MetricsDashboard(metrics)
+    adaptive = AdaptiveConcurrency(initial=16, maximum=64, max_timeout=7)
+    engine = ContactEngine(
+        adaptive=adaptive, per_domain=2, max_contacts=1, detect_form=True,
+        max_pages_per_site=4, request_budget=len(companies) * 2, metrics=metrics,
+        progress_every=0 if dashboard.available else 100
+    )
+    print(f"処理開始: {len(companies):,}社")
+    print(f"並列数: {adaptive.limit}〜{adaptive.maximum} 自動調整 (同一ドメイン: {engine.per_domain})")
+    
+    metrics_server = MetricsServer(metrics, port=METRICS_PORT)
+    try:
+        metrics_server.start()
+        print(f"計測値: {metrics_server.url}")
+    except OSError as e:
+        metrics_server = None
+        print(f"計測値の公開を省略: {e}")
+    print("-" * 60)
+
+    contact_results = {}
+    try:
+        with engine, dashboard:
+            for result in engine.run(companies):
+                contact_urls = result['contact_urls']
+                contact_results[result['official_site_url']] = contact_urls[0] if contact_urls else ''
+    finally:
+        if metrics_server:
+            metrics_server.stop()
     
     elapsed = time.time() - start_time
     
@@ -210,9 +92,22 @@ def main():
     print("抽出完了:")
     print(f"  処理企業数: {len(contact_results):,}社")
     print(f"  問い合わせURL発見: {found_count:,}社 ({found_count/len(contact_results)*100:.1f}%)")
+    print(f"  追加取得ページ数: {engine.extra_requests:,}")
     print(f"  処理時間: {elapsed:.1f}秒 ({elapsed/60:.1f}分)")
     print(f"{'='*60}")
     
+    print("\n段階別の処理時間:")
+    for line in metrics.summary_lines():
+        print(f"  {line}")
+    
+    print("\n並列数の推移:")
+    for line in adaptive.summary_lines():
+        print(f"  {line}")
+    
+    print("\n接続の再利用:")
+    for line in engine.connection_lines():
+        print(f"  {line}")
+    
     # 最終CSVを作成（問い合わせURL付き）
     output_file = f"yuryoweb_complete_with_contact_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     
@@ -274,8 +169,21 @@ def main():
         f.write(f"処理企業数: {len(contact_results):,}社\n")
         f.write(f"問い合わせURL発見: {found_count:,}社 ({found_count/len(contact_results)*100:.1f}%)\n")
         f.write(f"問い合わせURL未発見: {len(contact_results)-found_count:,}社\n")
+        f.write(f"追加取得ページ数: {engine.extra_requests:,}\n")
         f.write(f"処理時間: {elapsed:.1f}秒 ({elapsed/60:.1f}分)\n")
         f.write(f"平均処理速度: {len(contact_results)/elapsed:.1f}社/秒\n")
+        f.write("\n段階別の処理時間:\n")
+        for line in metrics.summary_lines():
+            f.write(f"  {line}\n")
+        f.write("\n並列数の推移:\n")
+        for line in adaptive.summary_lines(limit=100):
+            f.write(f"  {line}\n")
+        f.write("\n接続の再利用:\n")
+        for line in engine.connection_lines():
+            f.write(f"  {line}\n")
+        f.write("\n時間の長いドメイン:\n")
+        for host, stats in metrics.top_domains(20):
+            f.write(f"  {host}: {stats.requests}件 / エラー{stats.errors}件 / {stats.seconds:.1f}秒\n")
     
     print(f"✅ 統計レポート保存: {stats_file}")
     
@@ -7,6 +7,8 @@ import os
 from datetime import datetime
 from collections import defaultdict
 
+from scraper.dedup import dedup_key
+
 def extract_area_companies():
     """CSVファイルから地域企業を抽出"""
     
@@ -46,26 +48,26 @@ def extract_area_companies():
     area_records = [r for r in all_records if r.get('category_group') == 'area']
     print(f"\n地域カテゴリのレコード: {len(area_records)}件")
     
-    # ユニークな企業を抽出（official_site_urlをキー）
+    # ユニークな企業を抽出（official_site_urlの正規化キー）
     unique_companies = {}
     area_distribution = defaultdict(list)
     
     for record in area_records:
-        url = record.get('official_site_url', '').strip()
-        if not url:
+        key = dedup_key(record)
+        if not key:
             continue
         
         # 各企業が属する地域を記録
         area_name = record.get('category_name', '')
-        if url not in unique_companies:
-            unique_companies[url] = record
-            unique_companies[url]['areas'] = [area_name]
+        if key not in unique_companies:
+            unique_companies[key] = record
+            unique_companies[key]['areas'] = [area_name]
         else:
             # 同じ企業が複数の地域に属する場合
-            if area_name not in unique_companies[url]['areas']:
-                unique_companies[url]['areas'].append(area_name)
+            if area_name not in unique_companies[key]['areas']:
+                unique_companies[key]['areas'].append(area_name)
         
-        area_distribution[area_name].append(url)
+        area_distribution[area_name].append(key)
     
     print(f"\nユニーク企業数: {len(unique_companies)}件")
     
@@ -3,178 +3,12 @@
 全企業の問い合わせフォームURL抽出（高速版）
 """
 import csv
-import requests
-from bs4 import BeautifulSoup
-import re
-from urllib.parse import urljoin, urlparse
 import time
 from datetime import datetime
-import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
 
-# 問い合わせ関連のキーワード
-CONTACT_KEYWORDS = [
-    'contact', 'inquiry', 'form', '問い合わせ', 'お問い合わせ', '問合せ', '問合わせ',
-    'toiawase', 'otoiawase', 'mail', 'メール', 'フォーム', '相談', 'soudan',
-    '見積', 'estimate', 'mitsumori', '資料請求', 'request', '申し込み', 'apply',
-    'support', 'サポート', 'ご相談', 'ご質問', 'question'
-]
-
-# 除外するキーワード
-EXCLUDE_KEYWORDS = [
-    'privacy', 'policy', 'terms', 'プライバシー', '規約', '利用規約',
-    'sitemap', 'サイトマップ', 'recruit', '採用', 'career', 'login', 'ログイン'
-]
-
-class ContactExtractor:
-    def __init__(self, timeout=8, max_workers=10):
-        self.timeout = timeout
-        self.max_workers = max_workers
-        self.lock = threading.Lock()
-        self.results = []
-        self.processed = 0
-        self.success = 0
-        self.found = 0
-        
-    def create_session(self):
-        """新しいセッションを作成"""
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
-        return session
-        
-    def is_contact_url(self, url, text=''):
-        """URLや付随テキストが問い合わせ関連か判定"""
-        url_lower = url.lower()
-        text_lower = text.lower()
-        
-        # 除外キーワードチェック
-        for keyword in EXCLUDE_KEYWORDS:
-            if keyword in url_lower or keyword in text_lower:
-                return False
-        
-        # 問い合わせキーワードチェック
-        for keyword in CONTACT_KEYWORDS:
-            if keyword in url_lower or keyword in text_lower:
-                return True
-        
-        return False
-    
-    def extract_from_site(self, company_name, site_url):
-        """1つのサイトから問い合わせURLを抽出"""
-        session = self.create_session()
-        
-        try:
-            # URLの正規化
-            if not site_url.startswith(('http://', 'https://')):
-                site_url = 'https://' + site_url
-            
-            # サイトにアクセス
-            response = session.get(site_url, timeout=self.timeout, allow_redirects=True)
-            response.raise_for_status()
-            
-            # HTMLをパース
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 問い合わせ関連のリンクを収集
-            contact_urls = set()
-            
-            # 全てのリンクを確認（最適化版）
-            for link in soup.find_all('a', href=True):
-                href = link.get('href', '')
-                if not href or href.startswith('#'):
-                    continue
-                    
-                text = link.get_text(strip=True)
-                
-                # 相対URLを絶対URLに変換
-                full_url = urljoin(response.url, href)
-                
-                # 同じドメイン内のみ
-                if urlparse(full_url).netloc == urlparse(response.url).netloc:
-                    if self.is_contact_url(full_url, text):
-                        contact_urls.add(full_url)
-            
-            # 結果を保存
-            result = {
-                'company_name': company_name,
-                'official_site_url': site_url,
-                'contact_urls': list(contact_urls)[:5],  # 最大5個まで
-                'contact_count': len(contact_urls),
-                'status': 'success'
-            }
-            
-            return result
-            
-        except requests.exceptions.Timeout:
-            return {
-                'company_name': company_name,
-                'official_site_url': site_url,
-                'contact_urls': [],
-                'contact_count': 0,
-                'status': 'timeout'
-            }
-        except Exception as e:
-            return {
-                'company_name': company_name,
-                'official_site_url': site_url,
-                'contact_urls': [],
-                'contact_count': 0,
-                'status': f'error'
-            }
-        finally:
-            session.close()
-    
-    def process_batch(self, companies, batch_num):
-        """バッチ処理"""
-        batch_results = []
-        
-        for company in companies:
-            result = self.extract_from_site(
-                company['company_name'],
-                company['official_site_url']
-            )
-            batch_results.append(result)
-            
-            with self.lock:
-                self.processed += 1
-                if result['status'] == 'success':
-                    self.success += 1
-                if result['contact_count'] > 0:
-                    self.found += 1
-                
-                # 進捗表示（100件ごと）
-                if self.processed % 100 == 0:
-                    print(f"  進捗: {self.processed:,}件完了 | 成功: {self.success:,} | 発見: {self.found:,}")
-        
-        return batch_results
-    
-    def process_all_companies(self, companies):
-        """全企業を並列処理"""
-        
-        total = len(companies)
-        print(f"処理開始: {total:,}社")
-        print(f"並列数: {self.max_workers}")
-        
-        # バッチに分割
-        batch_size = max(1, total // (self.max_workers * 10))
-        batches = [companies[i:i+batch_size] for i in range(0, total, batch_size)]
-        
-        all_results = []
-        
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {
-                executor.submit(self.process_batch, batch, i): i
-                for i, batch in enumerate(batches)
-            }
-            
-            for future in as_completed(futures):
-                batch_results = future.result()
-                all_results.extend(batch_results)
-        
-        return all_results
+from scraper.adaptive import AdaptiveConcurrency
+from scraper.contact_engine import ContactEngine
+from scraper.sink import JsonlSink, read_jsonl
 
 def main():
     """メイン処理"""
@@ -208,34 +42,44 @@ def main():
     
     # 実行確認
     print(f"\n{len(companies):,}社の処理を開始します。")
-    print("推定処理時間: 約20-30分")
+    
+    # 結果はJSONLへ逐次保存（詳細版）
+    output_file = f"contact_urls_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
     
     # 処理実行
     start_time = time.time()
-    extractor = ContactExtractor(timeout=8, max_workers=10)
-    results = extractor.process_all_companies(companies)
+    # 並列数は16から始めて64まで自動調整、期限は3〜8秒で応答時間の分布から決める
+    adaptive = AdaptiveConcurrency(initial=16, maximum=64, max_timeout=8)
+    extractor = ContactEngine(per_domain=2, max_contacts=5, adaptive=adaptive)
+    print(f"並列数: {adaptive.limit}〜{adaptive.maximum} 自動調整 (同一ドメイン: {extractor.per_domain})")
+    with extractor, JsonlSink(output_file, append=False) as sink:
+        extractor.process_all(companies, sink=sink)
     elapsed = time.time() - start_time
     
     # 結果の集計
-    success_count = sum(1 for r in results if r['status'] == 'success')
-    found_count = sum(1 for r in results if r['contact_count'] > 0)
-    timeout_count = sum(1 for r in results if r['status'] == 'timeout')
-    error_count = sum(1 for r in results if r['status'] == 'error')
+    total_count = extractor.processed
+    success_count = extractor.success
+    found_count = extractor.found
+    timeout_count = extractor.timeouts
+    error_count = extractor.errors
     
     print(f"\n{'='*60}")
     print("最終結果:")
-    print(f"  処理企業数: {len(results):,}社")
-    print(f"  成功: {success_count:,}社 ({success_count/len(results)*100:.1f}%)")
-    print(f"  問い合わせURL発見: {found_count:,}社 ({found_count/len(results)*100:.1f}%)")
+    print(f"  処理企業数: {total_count:,}社")
+    print(f"  成功: {success_count:,}社 ({success_count/total_count*100:.1f}%)")
+    print(f"  問い合わせURL発見: {found_count:,}社 ({found_count/total_count*100:.1f}%)")
     print(f"  タイムアウト: {timeout_count:,}社")
     print(f"  エラー: {error_count:,}社")
     print(f"  処理時間: {elapsed:.1f}秒 ({elapsed/60:.1f}分)")
     print(f"{'='*60}")
     
-    # 結果をJSONに保存（詳細版）
-    output_file = f"contact_urls_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    print("\n並列数の推移:")
+    for line in adaptive.summary_lines():
+        print(f"  {line}")
+    
+    print("\n接続の再利用:")
+    for line in extractor.connection_lines():
+        print(f"  {line}")
     
     print(f"\n✅ 詳細結果を保存: {output_file}")
     
@@ -252,7 +96,7 @@ def main():
             'status'
         ])
         
-        for result in results:
+        for result in read_jsonl(output_file):
             main_contact = result['contact_urls'][0] if result['contact_urls'] else ''
             other_contacts = '｜'.join(result['contact_urls'][1:]) if len(result['contact_urls']) > 1 else ''
             
@@ -273,13 +117,19 @@ def main():
         f.write("問い合わせURL抽出 統計レポート\n")
         f.write("="*60 + "\n")
         f.write(f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"処理企業数: {len(results):,}社\n")
-        f.write(f"成功: {success_count:,}社 ({success_count/len(results)*100:.1f}%)\n")
-        f.write(f"問い合わせURL発見: {found_count:,}社 ({found_count/len(results)*100:.1f}%)\n")
+        f.write(f"処理企業数: {total_count:,}社\n")
+        f.write(f"成功: {success_count:,}社 ({success_count/total_count*100:.1f}%)\n")
+        f.write(f"問い合わせURL発見: {found_count:,}社 ({found_count/total_count*100:.1f}%)\n")
         f.write(f"タイムアウト: {timeout_count:,}社\n")
         f.write(f"エラー: {error_count:,}社\n")
         f.write(f"処理時間: {elapsed:.1f}秒 ({elapsed/60:.1f}分)\n")
-        f.write(f"平均処理速度: {len(results)/elapsed:.1f}社/秒\n")
+        f.write(f"平均処理速度: {total_count/elapsed:.1f}社/秒\n")
+        f.write("\n並列数の推移:\n")
+        for line in adaptive.summary_lines(limit=100):
+            f.write(f"  {line}\n")
+        f.write("\n接続の再利用:\n")
+        for line in extractor.connection_lines():
+            f.write(f"  {line}\n")
     
     print(f"✅ 統計レポート保存: {stats_file}")
     
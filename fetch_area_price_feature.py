@@ -1,14 +1,25 @@
 #!/usr/bin/env python3
 """
 地域・価格・特徴カテゴリのデータを取得
+
+    python fetch_area_price_feature.py            # 最初から取得
+    python fetch_area_price_feature.py --resume   # 中断した前回の続きから取得
 """
 from scraper.yuryoweb_scraper import YuryoWebScraper
-import json
+from scraper.crawl_state import CrawlState
+from scraper.sink import JsonlSink
+import sys
 import time
 from datetime import datetime
 
-def fetch_area_price_feature():
-    """地域・価格・特徴カテゴリを取得"""
+STATE_PATH = 'area_price_feature_state.sqlite3'
+
+def fetch_area_price_feature(resume=False):
+    """地域・価格・特徴カテゴリを取得
+
+    resume=True なら前回の中断時点から再開する（取得済みの分は状態ファイルから書き出す）。
+    全カテゴリを最後まで取得し終えたら状態ファイルは空にする。
+    """
     
     print("="*80)
     print("地域・価格・特徴カテゴリの取得")
@@ -18,11 +29,22 @@ def fetch_area_price_feature():
     # スクレイパー初期化
     scraper = YuryoWebScraper(delay_seconds=1.5)
     
+    # クロール状態（中断しても --resume で取得済みページから再開できる）
+    state = CrawlState(STATE_PATH)
+    if resume:
+        print(f"\n前回の続きから再開: {STATE_PATH}")
+    else:
+        state.reset()
+    
     # カテゴリ情報取得
     print("\nカテゴリ情報を取得中...")
     categories = scraper.fetch_categories()
     
-    all_data = []
+    total_count = 0
+    
+    # 全データは取得しながらJSONLへ逐次書き出す（tail -f で進捗を追える）
+    output_file = f"area_price_feature_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    all_sink = JsonlSink(output_file, append=False)
     
     # 地域、価格、特徴カテゴリのデータを取得
     for group_name in ['area', 'price', 'feature']:
@@ -32,14 +54,19 @@ def fetch_area_price_feature():
         print(f"{group_name.upper()}グループ: {len(category_list)}カテゴリ")
         print(f"{'='*60}")
         
-        group_data = []
+        group_file = f"{group_name}_complete_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        group_sink = JsonlSink(group_file, append=False)
+        
+        # 再開時は前回実行で取得済みの分を先に書き出す（新規実行では空）
+        for data in state.iter_records(category_group=group_name):
+            group_sink.write(data)
+            all_sink.write(data)
         
         for idx, category in enumerate(category_list, 1):
             print(f"\n[{idx}/{len(category_list)}] {category['name']}")
             print(f"  URL: {category['url']}")
             
             count = 0
-            category_data = []
             
             try:
                 start_time = time.time()
@@ -48,11 +75,11 @@ def fetch_area_price_feature():
                     category_url=category['url'],
                     limit=None,  # 全件取得
                     category_group=group_name,
-                    category_name=category['name']
+                    category_name=category['name'],
+                    state=state
                 ):
-                    category_data.append(data)
-                    all_data.append(data)
-                    group_data.append(data)
+                    group_sink.write(data)
+                    all_sink.write(data)
                     count += 1
                     
                     if count % 100 == 0:
@@ -61,38 +88,39 @@ def fetch_area_price_feature():
                 elapsed = time.time() - start_time
                 print(f"  ✅ {count}件取得完了 ({elapsed:.1f}秒)")
                 
-                # 5カテゴリごとに中間保存
-                if idx % 5 == 0:
-                    temp_file = f"{group_name}_temp_{idx}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                    with open(temp_file, 'w', encoding='utf-8') as f:
-                        json.dump(group_data, f, ensure_ascii=False, indent=2)
-                    print(f"  💾 中間保存: {temp_file} ({len(group_data)}件)")
-                
             except Exception as e:
                 print(f"  ❌ エラー: {e}")
                 continue
         
-        # グループ全体を保存
-        group_file = f"{group_name}_complete_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(group_file, 'w', encoding='utf-8') as f:
-            json.dump(group_data, f, ensure_ascii=False, indent=2)
+        group_sink.close()
+        total_count += group_sink.count
         print(f"\n✅ {group_name.upper()}グループ保存: {group_file}")
-        print(f"   取得件数: {len(group_data)}件")
+        print(f"   取得件数: {group_sink.count}件")
+    
+    all_sink.close()
     
-    # 全データを保存
-    output_file = f"area_price_feature_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_data, f, ensure_ascii=False, indent=2)
+    # 取得エラーや0件ページで止まったカテゴリは最後まで取得済みになっていない
+    unfinished = [
+        category for group_name in ['area', 'price', 'feature']
+        for category in categories.get(group_name, [])
+        if not state.is_category_done(category['url'])
+    ]
+    if unfinished:
+        print(f"\n⚠️ 未完了のカテゴリ: {len(unfinished)}個。--resume で続きから再取得できます")
+    else:
+        # 完了した実行の記録は次回に持ち越さない
+        state.reset()
+    state.close()
     
     print(f"\n{'='*80}")
     print(f"✅ 全データ保存完了")
     print(f"   ファイル名: {output_file}")
-    print(f"   総件数: {len(all_data)}件")
+    print(f"   総件数: {total_count}件")
     print(f"完了時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*80}")
     
-    return len(all_data)
+    return total_count
 
 if __name__ == "__main__":
-    count = fetch_area_price_feature()
+    count = fetch_area_price_feature(resume='--resume' in sys.argv[1:])
     print(f"\n最終取得件数: {count:,}件")
\ No newline at end of file
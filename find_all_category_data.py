@@ -2,13 +2,17 @@
 """
 全カテゴリ（地域・価格・特徴・業種）のデータを探して統合
 """
-import json
 import csv
 import os
 from datetime import datetime
 from collections import defaultdict
 import glob
 
+from scraper.company_store import CompanyStore
+
+# このスクリプト専用の企業ストア（他のマージスクリプトの取り込み分を混ぜない）
+STORE_PATH = 'yuryoweb_store_all_category_data.sqlite3'
+
 def find_and_merge_all_data():
     """全カテゴリのデータを探して統合"""
     
@@ -17,8 +21,8 @@ def find_and_merge_all_data():
     print(f"処理開始: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*80)
     
-    # すべてのデータを格納
-    all_data = []
+    # 企業ストアへ差分マージ（前回から変わっていないファイルは読み直さない）
+    store = CompanyStore(STORE_PATH)
     category_counts = defaultdict(int)
     file_info = []
     
@@ -28,24 +32,13 @@ def find_and_merge_all_data():
     
     for file in json_files:
         try:
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list) and len(data) > 0:
-                    # カテゴリグループを判定
-                    groups = defaultdict(int)
-                    for record in data:
-                        if isinstance(record, dict):
-                            group = record.get('category_group', 'unknown')
-                            groups[group] += 1
-                    
-                    # 主要なグループを特定
-                    main_group = max(groups.items(), key=lambda x: x[1])[0] if groups else 'unknown'
-                    
-                    if main_group != 'unknown':
-                        all_data.extend(data)
-                        file_info.append(f"  {file}: {main_group}グループ, {len(data)}件")
-                        for group, count in groups.items():
-                            category_counts[group] += count
+            # カテゴリグループの付いたレコードだけを取り込む
+            result = store.merge_file(file, require_group=True)
+            if result['records'] > 0:
+                main_group = max(result['groups'].items(), key=lambda x: x[1])[0]
+                file_info.append(f"  {file}: {main_group}グループ, {result['records']}件")
+                for group, count in result['groups'].items():
+                    category_counts[group] += count
                         
         except Exception as e:
             pass
@@ -81,34 +74,29 @@ def find_and_merge_all_data():
         try:
             with open(file, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
-                records = list(reader)
+                if 'category_group' not in (reader.fieldnames or []):
+                    continue
                 
-                if records and 'category_group' in records[0]:
-                    # カテゴリグループ別に集計
-                    groups = defaultdict(int)
-                    for record in records:
-                        group = record.get('category_group', '')
-                        if group:
-                            groups[group] += 1
-                            
-                            # JSONと同じ形式に変換
-                            json_record = {
-                                'company_name': record.get('company_name', ''),
-                                'official_site_url': record.get('official_site_url', ''),
-                                'address': record.get('address', ''),
-                                'yuryoweb_url': record.get('yuryoweb_url', ''),
-                                'category_group': group,
-                                'category_name': record.get('category_name', '')
-                            }
-                            all_data.append(json_record)
-                    
-                    if groups:
-                        csv_data_found = True
-                        print(f"\n  {file}:")
-                        for group, count in groups.items():
-                            print(f"    {group}: {count}件")
-                            category_counts[group] += count
-                            
+                # JSONと同じ形式に変換して取り込む
+                result = store.upsert_records((
+                    {
+                        'company_name': record.get('company_name', ''),
+                        'official_site_url': record.get('official_site_url', ''),
+                        'address': record.get('address', ''),
+                        'yuryoweb_url': record.get('yuryoweb_url', ''),
+                        'category_group': record.get('category_group', ''),
+                        'category_name': record.get('category_name', '')
+                    }
+                    for record in reader
+                ), require_group=True)
+                
+                if result['groups']:
+                    csv_data_found = True
+                    print(f"\n  {file}:")
+                    for group, count in result['groups'].items():
+                        print(f"    {group}: {count}件")
+                        category_counts[group] += count
+                        
         except Exception as e:
             pass
     
@@ -117,96 +105,36 @@ def find_and_merge_all_data():
     
     # 3. データの統合と重複排除
     print(f"\n3. データ統合中...")
-    print(f"  総レコード数: {len(all_data):,}件")
+    print(f"  総レコード数: {sum(category_counts.values()):,}件")
     
     print("\nカテゴリグループ別レコード数:")
     for group, count in sorted(category_counts.items()):
         print(f"  {group}: {count:,}件")
     
-    # 企業ごとにカテゴリ情報を集約
-    companies = defaultdict(lambda: {
-        'company_name': '',
-        'official_site_url': '',
-        'yuryoweb_url': '',
-        'addresses': set(),
-        'area_categories': set(),
-        'price_categories': set(),
-        'feature_categories': set(),
-        'industry_categories': set()
-    })
-    
-    for record in all_data:
-        url = record.get('official_site_url', '').strip()
-        if not url:
-            continue
-        
-        company = companies[url]
-        company['company_name'] = record.get('company_name', '')
-        company['official_site_url'] = url
-        company['yuryoweb_url'] = record.get('yuryoweb_url', '')
-        
-        address = record.get('address', '').strip()
-        if address:
-            company['addresses'].add(address)
-        
-        category_group = record.get('category_group', '')
-        category_name = record.get('category_name', '')
-        
-        if category_group == 'area':
-            company['area_categories'].add(category_name)
-        elif category_group == 'price':
-            company['price_categories'].add(category_name)
-        elif category_group == 'feature':
-            company['feature_categories'].add(category_name)
-        elif category_group == 'industry':
-            company['industry_categories'].add(category_name)
-    
-    print(f"\n✅ ユニーク企業数: {len(companies):,}社")
+    print(f"\n✅ ユニーク企業数: {len(store):,}社")
     
     # 目標との比較
     target = 11341
-    diff = len(companies) - target
+    diff = len(store) - target
     print(f"\n目標企業数: {target:,}社")
     print(f"差分: {diff:+,}社")
     
-    if len(companies) > 0:
+    if len(store) > 0:
         # 完全版CSVを作成
         output_file = f"yuryoweb_complete_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
-        with open(output_file, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            
-            writer.writerow([
-                'company_name',
-                'official_site_url',
-                'yuryoweb_url',
-                'address',
-                'area_categories',
-                'price_categories',
-                'feature_categories',
-                'industry_categories'
-            ])
-            
-            for company in sorted(companies.values(), key=lambda x: x['company_name']):
-                writer.writerow([
-                    company['company_name'],
-                    company['official_site_url'],
-                    company['yuryoweb_url'],
-                    '｜'.join(sorted(company['addresses'])),
-                    '｜'.join(sorted(company['area_categories'])),
-                    '｜'.join(sorted(company['price_categories'])),
-                    '｜'.join(sorted(company['feature_categories'])),
-                    '｜'.join(sorted(company['industry_categories']))
-                ])
+        store.write_csv(output_file)
         
         print(f"\n✅ 完全版CSVファイル作成")
         print(f"   ファイル名: {output_file}")
-        print(f"   企業数: {len(companies):,}社")
+        print(f"   企業数: {len(store):,}社")
     
     print(f"\n処理完了: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*80)
     
-    return len(companies)
+    count = len(store)
+    store.close()
+    return count
 
 if __name__ == "__main__":
     count = find_and_merge_all_data()
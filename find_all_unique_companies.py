@@ -2,12 +2,16 @@
 """
 全てのJSONファイルから全ユニーク企業を抽出
 """
-import json
 import csv
 import os
 from datetime import datetime
 from collections import defaultdict
 
+from scraper.company_store import CATEGORY_GROUPS, CompanyStore
+
+# このスクリプト専用の企業ストア（他のマージスクリプトの取り込み分を混ぜない）
+STORE_PATH = 'yuryoweb_store_all_unique.sqlite3'
+
 def find_all_companies():
     """全JSONファイルから全ユニーク企業を抽出"""
     
@@ -16,9 +20,9 @@ def find_all_companies():
     print(f"検索時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*80)
     
-    # 全てのJSONファイルを検索
-    all_unique_companies = {}
-    category_stats = defaultdict(lambda: {'files': [], 'records': 0, 'unique': set()})
+    # 全てのJSONファイルを企業ストアへ差分マージ
+    store = CompanyStore(STORE_PATH)
+    group_files = defaultdict(list)
     
     json_files = []
     for file in os.listdir('.'):
@@ -29,39 +33,23 @@ def find_all_companies():
     
     for file in sorted(json_files):
         try:
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # カテゴリの付いたレコードだけを取り込む
+            result = store.merge_file(file, require_group=True)
+            if result['records'] > 0:
+                group = max(result['groups'].items(), key=lambda x: x[1])[0]
                 
-                if isinstance(data, list) and len(data) > 0:
-                    # カテゴリグループを判定
-                    sample = data[0] if isinstance(data[0], dict) else {}
-                    group = sample.get('category_group', 'unknown')
-                    
-                    print(f"\n{file}:")
-                    print(f"  レコード数: {len(data)}")
-                    print(f"  カテゴリグループ: {group}")
-                    
-                    # ユニーク企業を抽出
-                    file_unique = set()
-                    for record in data:
-                        if isinstance(record, dict):
-                            url = record.get('official_site_url', '').strip()
-                            if url:
-                                file_unique.add(url)
-                                if url not in all_unique_companies:
-                                    all_unique_companies[url] = record
-                                
-                                # カテゴリ別の統計
-                                cat_group = record.get('category_group', 'unknown')
-                                category_stats[cat_group]['records'] += 1
-                                category_stats[cat_group]['unique'].add(url)
-                    
-                    print(f"  ユニーク企業: {len(file_unique)}社")
+                print(f"\n{file}:")
+                print(f"  レコード数: {result['records']}")
+                print(f"  カテゴリグループ: {group}")
+                if result['skipped']:
+                    print(f"  前回から変更なし（スキップ）")
+                else:
+                    print(f"  ユニーク企業: {result['companies']}社")
+                
+                # ファイル別統計を保存
+                if group != 'unknown':
+                    group_files[group].append(file)
                     
-                    # ファイル別統計を保存
-                    if group != 'unknown':
-                        category_stats[group]['files'].append(file)
-                        
         except Exception as e:
             print(f"\n{file}: エラー - {e}")
     
@@ -70,20 +58,22 @@ def find_all_companies():
     print(f"{'='*80}")
     
     # カテゴリグループ別の統計
-    for group, stats in sorted(category_stats.items()):
+    group_records = store.source_groups(json_files)
+    group_companies = store.group_company_counts()
+    for group, records in sorted(group_records.items()):
         print(f"\n{group}グループ:")
-        print(f"  ファイル数: {len(set(stats['files']))}個")
-        print(f"  総レコード数: {stats['records']:,}件")
-        print(f"  ユニーク企業数: {len(stats['unique']):,}社")
+        print(f"  ファイル数: {len(set(group_files[group]))}個")
+        print(f"  総レコード数: {records:,}件")
+        print(f"  ユニーク企業数: {group_companies.get(group, 0):,}社")
     
     print(f"\n{'='*80}")
     print(f"全体統計:")
-    print(f"  総ユニーク企業数: {len(all_unique_companies):,}社")
-    print(f"  目標数(11,341社)との差: {11341 - len(all_unique_companies):+,}社")
+    print(f"  総ユニーク企業数: {len(store):,}社")
+    print(f"  目標数(11,341社)との差: {11341 - len(store):+,}社")
     print(f"{'='*80}")
     
     # CSVファイルに保存
-    if all_unique_companies:
+    if len(store):
         output_file = f"all_unique_companies_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
         with open(output_file, 'w', encoding='utf-8', newline='') as f:
@@ -99,22 +89,31 @@ def find_all_companies():
                 'category_name'
             ])
             
-            # データ
-            for company in all_unique_companies.values():
+            # データ（地域・価格・特徴・業種の順で最初に見つかったカテゴリを代表として出す）
+            for company in store.iter_companies():
+                category_group = ''
+                category_name = ''
+                for group in CATEGORY_GROUPS:
+                    if company[f'{group}_categories']:
+                        category_group = group
+                        category_name = company[f'{group}_categories'][0]
+                        break
                 writer.writerow([
-                    company.get('company_name', ''),
-                    company.get('official_site_url', ''),
-                    company.get('address', ''),
-                    company.get('yuryoweb_url', ''),
-                    company.get('category_group', ''),
-                    company.get('category_name', '')
+                    company['company_name'],
+                    company['official_site_url'],
+                    company['addresses'][0] if company['addresses'] else '',
+                    company['yuryoweb_url'],
+                    category_group,
+                    category_name
                 ])
         
         print(f"\n✅ CSVファイル作成完了")
         print(f"   ファイル名: {output_file}")
-        print(f"   企業数: {len(all_unique_companies):,}社")
+        print(f"   企業数: {len(store):,}社")
     
-    return len(all_unique_companies)
+    count = len(store)
+    store.close()
+    return count
 
 if __name__ == "__main__":
     find_all_companies()
\ No newline at end of file
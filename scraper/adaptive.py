@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+並列数の自動調整（AIMD: スループットが伸びる間は一定数ずつ増やし、タイムアウト・エラーが
+増えたら一定割合で減らす）とテール遅延に応じたリクエスト期限
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class AdaptiveConcurrency:
+    """完了したリクエストの結果から並列数とリクエスト期限を決める
+
+    - window 件完了するごとに、その区間のスループット（件/秒）とエラー率を見る
+    - エラー率（タイムアウト含む）が error_threshold を超えたら並列数を decrease 倍に
+    - そうでなく、スループットが前の区間より tolerance を超えて改善していれば
+      並列数を increase だけ増やす。直前に増やして tolerance を超えて悪化したら
+      元に戻し、どちらでもなければ据え置く（CPU・帯域が頭打ちなら増やさない）
+    - 期限は直近の成功リクエストの p95 の multiplier 倍（min_timeout〜max_timeout）。
+      タイムアウトが多い区間ごとに上限を decrease 倍に縮め、遅いホストに枠を取られ
+      続けないようにする（落ち着けば徐々に戻す）
+    """
+
+    def __init__(
+        self,
+        initial: int = 16,
+        minimum: int = 4,
+        maximum: int = 64,
+        window: int = 50,
+        increase: int = 2,
+        decrease: float = 0.7,
+        error_threshold: float = 0.2,
+        tolerance: float = 0.1,
+        min_timeout: float = 3.0,
+        max_timeout: float = 10.0,
+        multiplier: float = 3.0,
+        samples: int = 500
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.window = window
+        self.increase = increase
+        self.decrease = decrease
+        self.error_threshold = error_threshold
+        self.tolerance = tolerance
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.multiplier = multiplier
+        self.deadline_scale = 1.0
+
+        self.lock = threading.Lock()
+        self.durations = deque(maxlen=samples)
+        self.start_time = time.time()
+        self.window_start = time.time()
+        self.window_count = 0
+        self.window_errors = 0
+        self.window_timeouts = 0
+        self.last_throughput: Optional[float] = None
+        self.last_change = 0
+        self.history: List[Dict] = []
+
+    def deadline(self) -> float:
+        """次のリクエストに使う期限（秒）"""
+        with self.lock:
+            ceiling = max(self.min_timeout, self.max_timeout * self.deadline_scale)
+            if len(self.durations) < 20:
+                return ceiling
+            ordered = sorted(self.durations)
+            p95 = ordered[int(len(ordered) * 0.95) - 1]
+            return max(self.min_timeout, min(ceiling, p95 * self.multiplier))
+
+    def record(self, seconds: float, status: str):
+        """1件の完了を記録する（status は 'success' / 'timeout' / 'error'）"""
+        with self.lock:
+            if status == 'success':
+                self.durations.append(seconds)
+            elif status == 'timeout':
+                self.window_timeouts += 1
+                self.window_errors += 1
+            else:
+                self.window_errors += 1
+            self.window_count += 1
+            if self.window_count >= self.window:
+                self._adjust()
+
+    def _adjust(self):
+        now = time.time()
+        elapsed = now - self.window_start
+        throughput = self.window_count / elapsed if elapsed > 0 else 0.0
+        error_rate = self.window_errors / self.window_count
+        timeout_rate = self.window_timeouts / self.window_count
+        previous = self.limit
+
+        if error_rate > self.error_threshold:
+            self.limit = max(self.minimum, int(self.limit * self.decrease))
+        elif self.last_throughput is None or throughput > self.last_throughput * (1 + self.tolerance):
+            self.limit = min(self.maximum, self.limit + self.increase)
+        elif self.last_change > 0 and throughput < self.last_throughput * (1 - self.tolerance):
+            self.limit = max(self.minimum, self.limit - self.last_change)
+        self.last_change = self.limit - previous
+
+        if timeout_rate > self.error_threshold / 2:
+            self.deadline_scale = max(self.min_timeout / self.max_timeout, self.deadline_scale * self.decrease)
+        else:
+            self.deadline_scale = min(1.0, self.deadline_scale * 1.1)
+
+        self.history.append({
+            'elapsed': now - self.start_time,
+            'concurrency': previous,
+            'next_concurrency': self.limit,
+            'throughput': throughput,
+            'error_rate': error_rate,
+            'timeout_rate': timeout_rate,
+        })
+        self.last_throughput = throughput
+        self.window_start = now
+        self.window_count = 0
+        self.window_errors = 0
+        self.window_timeouts = 0
+
+    def summary_lines(self, limit: int = 20) -> List[str]:
+        """並列数の推移（区間が多い場合は等間隔に間引く）"""
+        with self.lock:
+            history = list(self.history)
+        if len(history) > limit:
+            step = len(history) / limit
+            history = [history[int(i * step)] for i in range(limit)] + [history[-1]]
+        lines = [f"{'経過秒':>8}{'並列数':>8}{'→':>4}{'件/秒':>10}{'エラー率':>10}{'TO率':>8}"]
+        for entry in history:
+            lines.append(
+                f"{entry['elapsed']:>8.0f}{entry['concurrency']:>8}{entry['next_concurrency']:>6}"
+                f"{entry['throughput']:>10.1f}{entry['error_rate'] * 100:>9.1f}%{entry['timeout_rate'] * 100:>7.1f}%"
+            )
+        return lines
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+企業ストア（公式サイトURLの正規化キー単位の企業と、整数IDで持つカテゴリ所属を保持するSQLiteストア）
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from scraper.dedup import dedup_key
+from scraper.sink import load_records
+
+CATEGORY_GROUPS = ('area', 'price', 'feature', 'industry')
+
+COMPANY_COLUMNS = [
+    'company_name',
+    'official_site_url',
+    'yuryoweb_url',
+    'address',
+    'area_categories',
+    'price_categories',
+    'feature_categories',
+    'industry_categories'
+]
+
+
+class CompanyStore:
+    """カテゴリ別JSONを差分マージしていく企業ストア
+
+    - 企業は official_site_url の正規化キー（dedup_key）ごとに1行
+      （http/https・www.・末尾スラッシュ等の違いは同一企業。表示用のURL・名前・yuryoweb_url は後勝ち）
+    - 住所とカテゴリ所属は別テーブルに (企業ID, 値) で持ち、重複は主キーで弾く
+    - カテゴリは (グループ, 名前) ごとに整数IDを振る
+    - 取り込んだファイルは更新時刻とサイズを記録し、変わっていなければ読み直さない
+    - write_csv や件数はストア全体が対象なので、ストアのファイルはスクリプトごとに分ける
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(companies)')]
+        if columns and 'company_key' not in columns:
+            # 生のURLをキーにしていた旧形式。取り込み記録ごと作り直し、次回のマージで全ファイルを読み直す
+            self.conn.executescript('''
+                DROP TABLE companies;
+                DROP TABLE IF EXISTS addresses;
+                DROP TABLE IF EXISTS memberships;
+                DROP TABLE IF EXISTS sources;
+            ''')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS categories (
+                id INTEGER PRIMARY KEY,
+                category_group TEXT NOT NULL,
+                category_name TEXT NOT NULL,
+                UNIQUE (category_group, category_name)
+            );
+            CREATE TABLE IF NOT EXISTS companies (
+                id INTEGER PRIMARY KEY,
+                company_key TEXT NOT NULL UNIQUE,
+                official_site_url TEXT NOT NULL,
+                company_name TEXT NOT NULL,
+                yuryoweb_url TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS addresses (
+                company_id INTEGER NOT NULL,
+                address TEXT NOT NULL,
+                PRIMARY KEY (company_id, address)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS memberships (
+                company_id INTEGER NOT NULL,
+                category_id INTEGER NOT NULL,
+                PRIMARY KEY (company_id, category_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS memberships_category ON memberships (category_id, company_id);
+            CREATE TABLE IF NOT EXISTS sources (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                records INTEGER NOT NULL,
+                groups TEXT NOT NULL,
+                merged_at REAL NOT NULL
+            );
+        ''')
+        self.conn.commit()
+        self._load_ids()
+
+    def _load_ids(self):
+        # URLキー→企業ID と (グループ, 名前)→カテゴリID はメモリにも持つ（数万件程度）
+        self.company_ids: Dict[str, int] = dict(
+            self.conn.execute('SELECT company_key, id FROM companies')
+        )
+        self.category_ids: Dict[Tuple[str, str], int] = {
+            (group, name): category_id
+            for category_id, group, name in self.conn.execute('SELECT id, category_group, category_name FROM categories')
+        }
+        self.categories: Dict[int, Tuple[str, str]] = {v: k for k, v in self.category_ids.items()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def __len__(self) -> int:
+        return len(self.company_ids)
+
+    def _category_id(self, group: str, name: str) -> int:
+        key = (group, name)
+        category_id = self.category_ids.get(key)
+        if category_id is None:
+            category_id = self.conn.execute(
+                'INSERT INTO categories (category_group, category_name) VALUES (?, ?)', key
+            ).lastrowid
+            self.category_ids[key] = category_id
+            self.categories[category_id] = key
+        return category_id
+
+    def _upsert(self, record: Dict, now: float) -> Optional[int]:
+        key = dedup_key(record)
+        if key is None:
+            return None
+
+        url = record['official_site_url'].strip()
+        name = record.get('company_name', '') or ''
+        yuryoweb_url = record.get('yuryoweb_url', '') or ''
+        company_id = self.company_ids.get(key)
+        if company_id is None:
+            company_id = self.conn.execute(
+                'INSERT INTO companies (company_key, official_site_url, company_name, yuryoweb_url, updated_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, url, name, yuryoweb_url, now)
+            ).lastrowid
+            self.company_ids[key] = company_id
+        else:
+            self.conn.execute(
+                'UPDATE companies SET official_site_url = ?, company_name = ?, yuryoweb_url = ?, updated_at = ? '
+                'WHERE id = ?',
+                (url, name, yuryoweb_url, now, company_id)
+            )
+
+        address = (record.get('address', '') or '').strip()
+        if address:
+            self.conn.execute('INSERT OR IGNORE INTO addresses VALUES (?, ?)', (company_id, address))
+
+        group = record.get('category_group', '')
+        if group in CATEGORY_GROUPS:
+            category_id = self._category_id(group, record.get('category_name', '') or '')
+            self.conn.execute('INSERT OR IGNORE INTO memberships VALUES (?, ?)', (company_id, category_id))
+
+        return company_id
+
+    def upsert_records(self, records: Iterable[Dict], batch_size: int = 5000, require_group: bool = False) -> Dict:
+        """レコードを企業ストアへ取り込む（batch_size件ごとにコミット）
+
+        戻り値は {'records': 取り込んだ件数, 'companies': 登場した企業数, 'groups': グループ別件数}。
+        require_group=True ならカテゴリグループの無いレコードは取り込まない。
+        """
+        groups = Counter()
+        seen = set()
+        count = 0
+        now = time.time()
+        with self.lock:
+            try:
+                for record in records:
+                    if not isinstance(record, dict):
+                        continue
+                    group = record.get('category_group', '')
+                    if require_group and not group:
+                        continue
+                    company_id = self._upsert(record, now)
+                    if company_id is None:
+                        continue
+                    seen.add(company_id)
+                    groups[group or 'unknown'] += 1
+                    count += 1
+                    if count % batch_size == 0:
+                        self.conn.commit()
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                # ロールバックした分のIDキャッシュを作り直す
+                self._load_ids()
+                raise
+        return {'records': count, 'companies': len(seen), 'groups': dict(groups)}
+
+    def merge_file(self, path: str, force: bool = False, require_group: bool = False) -> Dict:
+        """JSON/JSONLファイルを差分マージ（前回から変わっていなければ読まない）
+
+        戻り値は upsert_records と同じ形式に 'skipped' を加えたもの。
+        スキップ時の件数は前回取り込み時の記録。
+        """
+        stat = os.stat(path)
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT mtime, size, records, groups FROM sources WHERE path = ?', (path,)
+            ).fetchone()
+        if row and not force and row[0] == stat.st_mtime and row[1] == stat.st_size:
+            return {'records': row[2], 'companies': None, 'groups': json.loads(row[3]), 'skipped': True}
+
+        result = self.upsert_records(load_records(path), require_group=require_group)
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?)',
+                (path, stat.st_mtime, stat.st_size, result['records'],
+                 json.dumps(result['groups'], ensure_ascii=False), time.time())
+            )
+        result['skipped'] = False
+        return result
+
+    def source_groups(self, paths: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """取り込み済みファイルのグループ別レコード数（paths を渡せばそのファイルだけ）"""
+        totals = Counter()
+        with self.lock:
+            rows = self.conn.execute('SELECT path, groups FROM sources').fetchall()
+        wanted = None if paths is None else set(paths)
+        for path, groups in rows:
+            if wanted is None or path in wanted:
+                totals.update(json.loads(groups))
+        return dict(totals)
+
+    def group_company_counts(self) -> Dict[str, int]:
+        """カテゴリグループごとの所属企業数"""
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT c.category_group, COUNT(DISTINCT m.company_id)
+                FROM memberships m JOIN categories c ON c.id = m.category_id
+                GROUP BY c.category_group
+            ''').fetchall()
+        return dict(rows)
+
+    def group_presence(self) -> Iterator[Tuple[int, ...]]:
+        """企業ごとに各カテゴリグループへの所属有無 (area, price, feature, industry) を返す"""
+        group_bit = {group: 1 << i for i, group in enumerate(CATEGORY_GROUPS)}
+        masks = dict.fromkeys(self.company_ids.values(), 0)
+        with self.lock:
+            for company_id, category_id in self.conn.execute('SELECT company_id, category_id FROM memberships'):
+                masks[company_id] |= group_bit[self.categories[category_id][0]]
+        for mask in masks.values():
+            yield tuple(bool(mask & group_bit[group]) for group in CATEGORY_GROUPS)
+
+    def iter_companies(self) -> Iterator[Dict]:
+        """企業を名前順に返す（住所・カテゴリはソート済みリスト）"""
+        query = '''
+            SELECT c.id, c.company_name, c.official_site_url, c.yuryoweb_url,
+                (SELECT group_concat(address, char(10)) FROM addresses WHERE company_id = c.id),
+                (SELECT group_concat(category_id) FROM memberships WHERE company_id = c.id)
+            FROM companies c
+            ORDER BY c.company_name, c.id
+        '''
+        # 読み出し専用の接続でカーソルを逐次読みする（全件をメモリに載せない）
+        reader = sqlite3.connect(self.path)
+        try:
+            for company_id, name, url, yuryoweb_url, addresses, category_ids in reader.execute(query):
+                company = {
+                    'id': company_id,
+                    'company_name': name,
+                    'official_site_url': url,
+                    'yuryoweb_url': yuryoweb_url,
+                    'addresses': sorted(addresses.split('\n')) if addresses else [],
+                }
+                for group in CATEGORY_GROUPS:
+                    company[f'{group}_categories'] = []
+                if category_ids:
+                    for category_id in category_ids.split(','):
+                        group, category_name = self.categories[int(category_id)]
+                        company[f'{group}_categories'].append(category_name)
+                    for group in CATEGORY_GROUPS:
+                        company[f'{group}_categories'].sort()
+                yield company
+        finally:
+            reader.close()
+
+    def write_csv(self, path: str) -> int:
+        """マージ済みCSV（住所・カテゴリは「｜」区切り）を書き出す"""
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COMPANY_COLUMNS)
+            for company in self.iter_companies():
+                writer.writerow(company_row(company))
+                count += 1
+        return count
+
+
+def company_row(company: Dict) -> List[str]:
+    """iter_companies() の1件をマージ済みCSVの1行にする"""
+    return [
+        company['company_name'],
+        company['official_site_url'],
+        company['yuryoweb_url'],
+        '｜'.join(company['addresses']),
+        '｜'.join(company['area_categories']),
+        '｜'.join(company['price_categories']),
+        '｜'.join(company['feature_categories']),
+        '｜'.join(company['industry_categories'])
+    ]
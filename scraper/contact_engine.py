@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+問い合わせURL抽出エンジン（共有コネクションプール・並列数・ドメイン単位の流量制御）
+"""
+import heapq
+import itertools
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from scraper.adaptive import AdaptiveConcurrency
+from scraper.dns_cache import DnsCache
+from scraper.http_timing import ConnectionStats, TimedHTTPAdapter
+from scraper.keyword_matcher import KeywordMatch, KeywordMatcher
+from scraper.metrics import CrawlMetrics, timed_get
+from scraper.parsing import ANCHOR_STRAINER, CONTACT_STRAINER, make_soup
+from scraper.ratelimit import HostRateLimiter
+
+# 問い合わせ関連のキーワード（重み: 問い合わせそのものを指す語ほど高い）
+CONTACT_WEIGHTS = {
+    'contact': 10, 'inquiry': 10, '問い合わせ': 10, 'お問い合わせ': 10, '問合せ': 10, '問合わせ': 10,
+    'toiawase': 10, 'otoiawase': 10, 'フォーム': 6, 'form': 4, 'mail': 4, 'メール': 4,
+    '相談': 6, 'ご相談': 6, 'soudan': 6, '見積': 8, 'estimate': 8, 'mitsumori': 8, '資料請求': 8,
+    'request': 4, '申し込み': 6, 'apply': 4, 'support': 3, 'サポート': 3, 'ご質問': 6, 'question': 4,
+}
+CONTACT_KEYWORDS = list(CONTACT_WEIGHTS)
+
+# 除外するキーワード
+EXCLUDE_KEYWORDS = [
+    'privacy', 'policy', 'terms', 'プライバシー', '規約', '利用規約',
+    'sitemap', 'サイトマップ', 'recruit', '採用', 'career', 'login', 'ログイン'
+]
+
+# トップページ自体が問い合わせフォームかを判定するキーワード
+FORM_KEYWORDS = ['お名前', '会社名', 'メールアドレス', 'お問い合わせ内容', 'name', 'email', 'message']
+
+# 2ホップ目で辿る候補（会社概要・サイトマップなど、問い合わせリンクが置かれやすいページ）
+HUB_WEIGHTS = {
+    'company': 3, 'about': 3, 'corporate': 3, 'profile': 2, 'outline': 2, 'access': 2, 'info': 1,
+    '会社概要': 3, '会社案内': 3, '会社情報': 3, '企業情報': 3, 'アクセス': 2, 'sitemap': 2, 'サイトマップ': 2
+}
+HUB_KEYWORDS = list(HUB_WEIGHTS)
+
+# 2ホップ目でも辿らないページ（sitemap は候補として残す）
+HOP_EXCLUDE_KEYWORDS = [k for k in EXCLUDE_KEYWORDS if k not in ('sitemap', 'サイトマップ')]
+
+CONTACT_MATCHER = KeywordMatcher(CONTACT_WEIGHTS, EXCLUDE_KEYWORDS)
+HOP_MATCHER = KeywordMatcher({**CONTACT_WEIGHTS, **HUB_WEIGHTS}, HOP_EXCLUDE_KEYWORDS)
+
+SITEMAP_LOC_RE = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>', re.I)
+SITEMAP_MAX_URLS = 2000
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+
+def contact_match(url: str, text: str = '') -> KeywordMatch:
+    """URLと付随テキストの重み付きスコアと一致したキーワード"""
+    return CONTACT_MATCHER.scan(url, text)
+
+
+def is_contact_url(url: str, text: str = '') -> bool:
+    """URLや付随テキストが問い合わせ関連か判定（除外キーワードが優先）"""
+    return CONTACT_MATCHER.matches(url, text)
+
+
+def hop_score(url: str, text: str = '') -> float:
+    """2ホップ目の候補としての優先度（0 は辿らない）"""
+    return HOP_MATCHER.score(url, text)
+
+
+def _is_sitemap(url: str) -> bool:
+    return urlparse(url).path.lower().endswith('.xml')
+
+
+def normalize_site_url(site_url: str) -> str:
+    """スキームの無いURLに https:// を補う"""
+    site_url = site_url.strip()
+    if not site_url.startswith(('http://', 'https://')):
+        site_url = 'https://' + site_url
+    return site_url
+
+
+class ContactEngine:
+    """企業サイトのトップページから問い合わせURLを抽出するエンジン
+
+    - 全ワーカーで1つの requests.Session（コネクションプール）とDNSキャッシュを
+      共有する（同一ホストへのリダイレクト・追加ページは接続を再利用し、
+      http→https のリダイレクトでも名前解決はやり直さない）
+    - concurrency で全体の並列数、per_domain で同一ホストへの同時接続数を制限
+    - per_domain_rate（毎秒リクエスト数）を指定するとホスト単位でレート制限
+    - run() は結果を完了順に逐次返し、sink を渡せばそのまま書き出す
+    - max_pages_per_site > 1 でトップページに無い場合に会社概要・sitemap.xml 等を
+      優先度順に辿る（request_budget は全サイト合計の追加リクエスト上限）
+    - metrics（CrawlMetrics）を渡すとリクエストの段階別時間・エラー分類・
+      ドメイン別集計と、パース・抽出の時間を記録する
+    - adaptive（AdaptiveConcurrency）を渡すと同時処理数とリクエストの期限を
+      完了状況に応じて調整する（concurrency は使わず adaptive.maximum が上限）
+    """
+
+    def __init__(
+        self,
+        timeout: float = 7,
+        concurrency: int = 32,
+        per_domain: int = 2,
+        per_domain_rate: Optional[float] = None,
+        max_contacts: Optional[int] = 5,
+        detect_form: bool = False,
+        progress_every: int = 100,
+        max_pages_per_site: int = 1,
+        request_budget: Optional[int] = None,
+        metrics: Optional[CrawlMetrics] = None,
+        adaptive: Optional[AdaptiveConcurrency] = None,
+        dns_cache: Optional[DnsCache] = None
+    ):
+        if adaptive:
+            concurrency = adaptive.maximum
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.per_domain = per_domain
+        self.max_contacts = max_contacts
+        self.detect_form = detect_form
+        # フォーム判定をしない場合はリンクだけを木にする
+        self.strainer = CONTACT_STRAINER if detect_form else ANCHOR_STRAINER
+        self.progress_every = progress_every
+        self.max_pages_per_site = max_pages_per_site
+        self.request_budget = request_budget
+        self.limiter = HostRateLimiter(per_domain_rate) if per_domain_rate else None
+        self.metrics = metrics
+        self.adaptive = adaptive
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        # 名前解決はDNSキャッシュ経由、新規接続と再利用の件数を数える
+        # （metrics 指定時は名前解決・接続・TLSの時間も記録される）
+        self.dns_cache = dns_cache or DnsCache()
+        self.connection_stats = ConnectionStats()
+        adapter = TimedHTTPAdapter(
+            pool_connections=concurrency * 4,
+            pool_maxsize=max(per_domain, 1),
+            dns_cache=self.dns_cache,
+            stats=self.connection_stats
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.lock = threading.Lock()
+        self.domain_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self.processed = 0
+        self.success = 0
+        self.found = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.extra_requests = 0
+        self.start_time = None
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def connection_lines(self) -> List[str]:
+        """接続の再利用・DNSキャッシュの集計"""
+        return self.connection_stats.summary_lines(self.dns_cache)
+
+    def _domain_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            slot = self.domain_slots.get(host)
+            if slot is None:
+                slot = self.domain_slots[host] = threading.BoundedSemaphore(self.per_domain)
+            return slot
+
+    def _timer(self, stage: str):
+        return self.metrics.timer(stage) if self.metrics else nullcontext()
+
+    def request_timeout(self) -> float:
+        return self.adaptive.deadline() if self.adaptive else self.timeout
+
+    def fetch(self, url: str) -> requests.Response:
+        """ドメイン単位の制限を守って1ページ取得"""
+        with self._domain_slot(url):
+            if self.limiter:
+                self.limiter.acquire(url)
+            response = timed_get(
+                self.session, url, self.metrics, timeout=self.request_timeout(), allow_redirects=True
+            )
+        response.raise_for_status()
+        return response
+
+    def find_contact_urls(self, soup, base_url: str) -> List[str]:
+        """同一ドメイン内の問い合わせリンクを文書順に返す"""
+        contact_urls = []
+        base_netloc = urlparse(base_url).netloc
+
+        for link in soup.find_all('a', href=True):
+            href = link.get('href', '')
+            if not href or href.startswith('#'):
+                continue
+
+            full_url = urljoin(base_url, href)
+            if urlparse(full_url).netloc != base_netloc or full_url in contact_urls:
+                continue
+
+            if is_contact_url(full_url, link.get_text(strip=True)):
+                contact_urls.append(full_url)
+                if self.max_contacts and len(contact_urls) >= self.max_contacts:
+                    break
+
+        # トップページ自体が問い合わせフォームの場合
+        if not contact_urls and self.detect_form:
+            for form in soup.find_all('form'):
+                form_text = str(form).lower()
+                if any(keyword in form_text for keyword in FORM_KEYWORDS):
+                    contact_urls.append(base_url)
+                    break
+
+        return contact_urls
+
+    def _take_budget(self) -> bool:
+        """追加リクエストの予算を1つ消費（使い切っていれば False）"""
+        with self.lock:
+            if self.request_budget is not None and self.extra_requests >= self.request_budget:
+                return False
+            self.extra_requests += 1
+            return True
+
+    def _push_candidates(self, heap, seen, order, soup, base_url: str):
+        base_netloc = urlparse(base_url).netloc
+        for link in soup.find_all('a', href=True):
+            href = link.get('href', '')
+            if not href or href.startswith('#'):
+                continue
+            full_url = urljoin(base_url, href).split('#')[0]
+            if full_url in seen or urlparse(full_url).netloc != base_netloc:
+                continue
+            score = hop_score(full_url, link.get_text(strip=True))
+            if score:
+                seen.add(full_url)
+                heapq.heappush(heap, (-score, next(order), full_url))
+
+    def _push_sitemap(self, heap, seen, order, text: str, base_url: str) -> Optional[str]:
+        """sitemap.xml の <loc> を候補に追加（問い合わせURLそのものがあれば返す）"""
+        base_netloc = urlparse(base_url).netloc
+        for loc in SITEMAP_LOC_RE.findall(text)[:SITEMAP_MAX_URLS]:
+            if loc in seen or urlparse(loc).netloc != base_netloc:
+                continue
+            if not _is_sitemap(loc) and is_contact_url(loc):
+                return loc
+            score = hop_score(loc)
+            if score:
+                seen.add(loc)
+                heapq.heappush(heap, (-score, next(order), loc))
+        return None
+
+    def explore(self, soup, base_url: str) -> Tuple[List[str], int]:
+        """トップページから候補ページを優先度順に辿って問い合わせURLを探す
+
+        戻り値は (問い合わせURLリスト, 追加で取得したページ数)。
+        """
+        heap = []
+        seen = {base_url}
+        order = itertools.count()
+        self._push_candidates(heap, seen, order, soup, base_url)
+        sitemap_url = urljoin(base_url, '/sitemap.xml')
+        if sitemap_url not in seen:
+            seen.add(sitemap_url)
+            heapq.heappush(heap, (-2, next(order), sitemap_url))
+
+        fetched = 0
+        while heap and fetched + 1 < self.max_pages_per_site:
+            _, _, url = heapq.heappop(heap)
+            if not self._take_budget():
+                break
+            fetched += 1
+            try:
+                response = self.fetch(url)
+            except requests.exceptions.RequestException:
+                continue
+
+            if _is_sitemap(url):
+                contact_url = self._push_sitemap(heap, seen, order, response.text, base_url)
+                if contact_url:
+                    return [contact_url], fetched
+                continue
+
+            with self._timer('parse'):
+                page = make_soup(response.content, parse_only=self.strainer)
+            with self._timer('extract'):
+                contact_urls = self.find_contact_urls(page, response.url)
+            if contact_urls:
+                return contact_urls, fetched
+            self._push_candidates(heap, seen, order, page, response.url)
+
+        return [], fetched
+
+    def extract_from_site(self, company: Dict) -> Dict:
+        """1つのサイトから問い合わせURLを抽出"""
+        result = {
+            'company_name': company.get('company_name', ''),
+            'official_site_url': company['official_site_url'],
+            'final_url': '',
+            'contact_urls': [],
+            'contact_count': 0,
+            'pages_fetched': 0,
+            'status': 'success',
+        }
+
+        start = time.perf_counter()
+        try:
+            response = self.fetch(normalize_site_url(company['official_site_url']))
+            with self._timer('parse'):
+                soup = make_soup(response.content, parse_only=self.strainer)
+            with self._timer('extract'):
+                contact_urls = self.find_contact_urls(soup, response.url)
+            result['pages_fetched'] = 1
+            if not contact_urls and self.max_pages_per_site > 1:
+                contact_urls, fetched = self.explore(soup, response.url)
+                result['pages_fetched'] += fetched
+            result['final_url'] = response.url
+            result['contact_urls'] = contact_urls
+            result['contact_count'] = len(contact_urls)
+        except requests.exceptions.Timeout:
+            result['status'] = 'timeout'
+        except Exception:
+            result['status'] = 'error'
+
+        self._record(result, time.perf_counter() - start)
+        return result
+
+    def _record(self, result: Dict, seconds: float):
+        with self.lock:
+            self.processed += 1
+            if result['status'] == 'success':
+                self.success += 1
+            elif result['status'] == 'timeout':
+                self.timeouts += 1
+            else:
+                self.errors += 1
+            if result['contact_count']:
+                self.found += 1
+        if self.metrics:
+            self.metrics.item_done()
+        if self.adaptive:
+            self.adaptive.record(seconds, result['status'])
+
+    def _print_progress(self, total: Optional[int]):
+        elapsed = time.time() - self.start_time
+        rate = self.processed / elapsed if elapsed else 0
+        line = f"  進捗: {self.processed:,}"
+        if total:
+            remaining = (total - self.processed) / rate if rate else 0
+            line += f"/{total:,}件 | 成功: {self.success:,} | 発見: {self.found:,} | {rate:.1f}社/秒 | 残り時間: {remaining/60:.1f}分"
+        else:
+            line += f"件 | 成功: {self.success:,} | 発見: {self.found:,} | {rate:.1f}社/秒"
+        if self.adaptive:
+            line += f" | 並列数: {self.adaptive.limit} | 期限: {self.adaptive.deadline():.1f}秒"
+        print(line)
+
+    def _in_flight_limit(self) -> int:
+        return self.adaptive.limit if self.adaptive else self.concurrency * 2
+
+    def run(self, companies: Iterable[Dict], sink=None, total: Optional[int] = None) -> Iterator[Dict]:
+        """全企業を並列処理し、結果を完了順に返す
+
+        投入は並列数の2倍までに抑えるため、入力がジェネレータでも
+        メモリ使用量は企業数に比例しない。adaptive 指定時は処理中の件数を
+        その時点の adaptive.limit までに抑える。
+        """
+        if total is None and hasattr(companies, '__len__'):
+            total = len(companies)
+        self.start_time = time.time()
+        companies = iter(companies)
+
+        completed = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = set()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < self._in_flight_limit():
+                    company = next(companies, None)
+                    if company is None:
+                        exhausted = True
+                        break
+                    pending.add(executor.submit(self.extract_from_site, company))
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    completed += 1
+                    if sink:
+                        sink.write(result)
+                    if self.progress_every and completed % self.progress_every == 0:
+                        self._print_progress(total)
+                    yield result
+
+    def process_all(self, companies: Iterable[Dict], sink=None) -> List[Dict]:
+        """全企業を処理（sink指定時は結果を保持せず空リストを返す）"""
+        results = []
+        for result in self.run(companies, sink=sink):
+            if not sink:
+                results.append(result)
+        return results
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+クロール状態の永続化（再開可能なクロール用のSQLiteストア）
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+
+class CrawlState:
+    """訪問済みの (カテゴリ, ページ) と取得レコードをSQLiteに記録
+
+    1ページ分のレコードを1トランザクションで追記するため、
+    チェックポイントのコストは新規レコード数にのみ比例する。
+    """
+
+    def __init__(self, path: str = 'crawl_state.sqlite3'):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS pages (
+                category_url TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                record_count INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (category_url, page)
+            );
+            CREATE TABLE IF NOT EXISTS categories (
+                category_url TEXT PRIMARY KEY,
+                finished_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category_url TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                category_group TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS records_page ON records (category_url, page);
+            CREATE INDEX IF NOT EXISTS records_group ON records (category_group);
+        ''')
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def reset(self):
+        """記録をすべて消す（前回の続きではなく新しくクロールするとき）"""
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM pages')
+            self.conn.execute('DELETE FROM categories')
+            self.conn.execute('DELETE FROM records')
+
+    def is_category_done(self, category_url: str) -> bool:
+        """カテゴリを最後まで取得済みか"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT 1 FROM categories WHERE category_url = ?', (category_url,)
+            ).fetchone()
+        return row is not None
+
+    def last_page(self, category_url: str) -> int:
+        """取得済みの最終ページ番号（未取得なら0）"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT MAX(page) FROM pages WHERE category_url = ?', (category_url,)
+            ).fetchone()
+        return row[0] or 0
+
+    def record_count(self, category_url: str) -> int:
+        """カテゴリで取得済みのレコード数"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT SUM(record_count) FROM pages WHERE category_url = ?', (category_url,)
+            ).fetchone()
+        return row[0] or 0
+
+    def save_page(self, category_url: str, page: int, records: List[Dict]):
+        """1ページ分のレコードを記録（ページ単位でコミット）"""
+        rows = [
+            (category_url, page, record.get('category_group', ''),
+             json.dumps(record, ensure_ascii=False))
+            for record in records
+        ]
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)',
+                (category_url, page, len(records), time.time())
+            )
+            self.conn.execute(
+                'DELETE FROM records WHERE category_url = ? AND page = ?',
+                (category_url, page)
+            )
+            self.conn.executemany(
+                'INSERT INTO records (category_url, page, category_group, data) VALUES (?, ?, ?, ?)',
+                rows
+            )
+
+    def finish_category(self, category_url: str):
+        """カテゴリの取得完了を記録"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO categories VALUES (?, ?)',
+                (category_url, time.time())
+            )
+
+    def iter_records(
+        self,
+        category_group: Optional[str] = None,
+        category_url: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """記録済みレコードを取得順に返す"""
+        query = 'SELECT data FROM records'
+        conditions = []
+        params = []
+        if category_group is not None:
+            conditions.append('category_group = ?')
+            params.append(category_group)
+        if category_url is not None:
+            conditions.append('category_url = ?')
+            params.append(category_url)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY id'
+
+        # 読み出し専用の接続でカーソルを逐次読みする（全件をメモリに載せない）
+        reader = sqlite3.connect(self.path)
+        try:
+            for (data,) in reader.execute(query, params):
+                yield json.loads(data)
+        finally:
+            reader.close()
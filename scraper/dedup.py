@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+企業の同一性判定（URLの正規化キーと、社名のブロッキング付きあいまい一致）
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+try:
+    import idna
+except ImportError:
+    try:
+        # pip同梱版
+        from pip._vendor import idna
+    except ImportError:
+        idna = None
+
+# 計測・広告用のクエリパラメータ（同一ページの判定では無視する）
+TRACKING_PARAMS = frozenset([
+    'gclid', 'fbclid', 'yclid', 'msclkid', 'dclid', 'mc_cid', 'mc_eid', '_ga', '_gl', 'ref'
+])
+TRACKING_PREFIXES = ('utm_',)
+
+INDEX_PAGES = frozenset(['index.html', 'index.htm', 'index.php', 'default.html', 'default.htm'])
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+# 社名の比較で無視する法人格表記
+CORPORATE_FORMS_RE = re.compile(
+    r'株式会社|有限会社|合同会社|合資会社|合名会社|一般社団法人|一般財団法人|'
+    r'\(株\)|\(有\)|\(同\)|'
+    r'\b(?:inc|co|ltd|llc|corp|corporation|company)\b\.?'
+)
+NAME_NOISE_RE = re.compile(r'[\s\W_]+')
+
+# ドメインの主要ラベルを取り出す際に読み飛ばす第2レベル
+SECOND_LEVEL_LABELS = frozenset(['co', 'ne', 'or', 'ac', 'go', 'gr', 'ed', 'lg', 'com', 'net', 'org'])
+
+
+def _encode_host(host: str) -> str:
+    """ホスト名を小文字のASCII（IDNAはpunycode）にする"""
+    host = host.lower().rstrip('.')
+    if host.isascii():
+        return host
+    if idna is not None:
+        try:
+            return idna.encode(host, uts46=True).decode('ascii')
+        except idna.IDNAError:
+            pass
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+
+def canonical_url(url: str) -> str:
+    """同一サイト判定用のURLキー
+
+    スキーム（http/https）・www.・既定ポート・末尾スラッシュ・index.html・
+    フラグメント・計測用パラメータの違いを吸収し、ホストはIDNAで正規化する。
+    戻り値は「ホスト/パス?クエリ」形式（スキームは含めない）。
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    if '://' not in url:
+        url = 'http://' + url.lstrip('/')
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url.lower()
+
+    host = _encode_host(parts.hostname or '')
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and str(port) != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f'{host}:{port}'
+
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    segments = path.split('/')
+    if segments[-1].lower() in INDEX_PAGES:
+        segments[-1] = ''
+    path = '/'.join(segments).rstrip('/')
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    key = host + path
+    if query:
+        key += '?' + urlencode(sorted(query))
+    return key
+
+
+def normalize_name(name: str) -> str:
+    """社名比較用の正規化（全角半角・大文字小文字・法人格・記号の違いを無視）"""
+    name = unicodedata.normalize('NFKC', name or '').lower()
+    name = CORPORATE_FORMS_RE.sub('', name)
+    return NAME_NOISE_RE.sub('', name)
+
+
+def normalize_address(address: str) -> str:
+    """住所比較用の正規化（全角半角・空白の違いを無視）"""
+    return re.sub(r'\s+', '', unicodedata.normalize('NFKC', address or ''))
+
+
+def host_label(key: str) -> str:
+    """URLキーからドメインの主要ラベル（英数字のみ）を取り出す（例: jam-house.co.jp → jamhouse）"""
+    host = key.split('/', 1)[0].split('?', 1)[0].rsplit(':', 1)[0]
+    labels = [label for label in host.split('.') if label not in SECOND_LEVEL_LABELS]
+    label = max(labels[:-1] or labels, key=len) if labels else ''
+    return re.sub(r'[^a-z0-9]', '', label)
+
+
+class DedupIndex:
+    """URLキーのハッシュ索引と社名のあいまい一致で企業レコードをまとめる
+
+    - URLの正規化キーが同じレコードは同一企業とみなす（O(1)の辞書引き）
+    - 社名は正規化後の先頭・末尾 block_chars 文字でブロック分けし、同じブロック内
+      だけを比較する（全件総当たりにしない）
+    - 社名だけでは同名の別会社が多いため、住所の一致かドメイン名の類似を
+      もう1つの根拠として求める
+    """
+
+    def __init__(
+        self,
+        name_threshold: float = 0.92,
+        domain_threshold: float = 0.9,
+        block_chars: int = 3,
+        max_block: int = 200
+    ):
+        self.name_threshold = name_threshold
+        self.domain_threshold = domain_threshold
+        self.block_chars = block_chars
+        self.max_block = max_block
+        self.records: List[Dict] = []
+        self.url_keys: List[str] = []
+        self.by_url: Dict[str, List[int]] = defaultdict(list)
+        self.parent: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _union(self, a: int, b: int):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def add(self, record: Dict) -> int:
+        """レコードを追加して番号を返す（同じURLキーの既存レコードとまとめる）"""
+        index = len(self.records)
+        key = canonical_url(record.get('official_site_url', ''))
+        self.records.append(record)
+        self.url_keys.append(key)
+        self.parent.append(index)
+        if key:
+            same = self.by_url[key]
+            if same:
+                self._union(same[0], index)
+            same.append(index)
+        return index
+
+    def extend(self, records: Iterable[Dict]):
+        for record in records:
+            self.add(record)
+
+    def url_groups(self) -> List[List[int]]:
+        """生のURLは異なるが正規化キーが一致したレコード群"""
+        groups = []
+        for indexes in self.by_url.values():
+            raw = {self.records[i].get('official_site_url', '').strip() for i in indexes}
+            if len(raw) > 1:
+                groups.append(indexes)
+        return groups
+
+    def _blocks(self, names: Dict[str, List[str]]) -> Iterable[List[str]]:
+        blocks = defaultdict(list)
+        n = self.block_chars
+        for name in names:
+            if len(name) < n:
+                continue
+            blocks[('head', name[:n])].append(name)
+            blocks[('tail', name[-n:])].append(name)
+        for block in blocks.values():
+            if 1 < len(block) <= self.max_block:
+                yield block
+
+    def _name_candidates(self) -> Iterator[Tuple[str, str, float]]:
+        """社名が近い（URLキーは異なる）組を (URLキー, URLキー, 類似度) で返す"""
+        # 同じ正規化名のURLキーはまとめ、比較は正規化名の単位で行う
+        names: Dict[str, List[str]] = defaultdict(list)
+        for key, indexes in self.by_url.items():
+            name = normalize_name(self.records[indexes[0]].get('company_name', ''))
+            if name:
+                names[name].append(key)
+
+        for keys in names.values():
+            for i, key_a in enumerate(keys):
+                for key_b in keys[i + 1:]:
+                    yield key_a, key_b, 1.0
+
+        # ブロック内だけ類似度を計算
+        seen = set()
+        threshold = self.name_threshold
+        for block in self._blocks(names):
+            for i, a in enumerate(block):
+                matcher = SequenceMatcher(None, '', a, autojunk=False)
+                for b in block[i + 1:]:
+                    pair = (a, b) if a < b else (b, a)
+                    if pair in seen:
+                        continue
+                    seen.add(pair)
+                    # 長さの差だけで閾値に届かない組は計算しない
+                    if 2 * min(len(a), len(b)) / (len(a) + len(b)) < threshold:
+                        continue
+                    matcher.set_seq1(b)
+                    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                        continue
+                    ratio = matcher.ratio()
+                    if ratio >= threshold:
+                        for key_a in names[a]:
+                            for key_b in names[b]:
+                                yield key_a, key_b, ratio
+
+    def name_matches(self) -> List[Tuple[str, str, float, str]]:
+        """社名が近く、住所の一致（'address'）かドメイン名の類似（'domain'）も
+        ある組を (URLキー, URLキー, 社名の類似度, 根拠) で返す"""
+        matches = []
+        for key_a, key_b, ratio in self._name_candidates():
+            record_a = self.records[self.by_url[key_a][0]]
+            record_b = self.records[self.by_url[key_b][0]]
+            address = normalize_address(record_a.get('address', ''))
+            if address and address == normalize_address(record_b.get('address', '')):
+                matches.append((key_a, key_b, ratio, 'address'))
+                continue
+            label_a, label_b = host_label(key_a), host_label(key_b)
+            if label_a and label_b and SequenceMatcher(None, label_a, label_b).ratio() >= self.domain_threshold:
+                matches.append((key_a, key_b, ratio, 'domain'))
+        return matches
+
+    def clusters(self, include_names: bool = True) -> List[List[int]]:
+        """同一企業とみなしたレコード番号のまとまり（2件以上のもの）"""
+        if include_names:
+            for key_a, key_b, _, _ in self.name_matches():
+                self._union(self.by_url[key_a][0], self.by_url[key_b][0])
+        groups = defaultdict(list)
+        for i in range(len(self.records)):
+            groups[self._find(i)].append(i)
+        return [members for members in groups.values() if len(members) > 1]
+
+
+def dedup_key(record: Dict) -> Optional[str]:
+    """レコードの重複排除キー（URLが無ければ None）"""
+    key = canonical_url(record.get('official_site_url', ''))
+    return key or None
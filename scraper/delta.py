@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+差分クロール（既知企業に到達したらページ送りを止める夜間更新用）
+"""
+import csv
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from scraper.yuryoweb_scraper import YuryoWebScraper
+
+CATEGORY_COLUMNS = {
+    'area': 'area_categories',
+    'price': 'price_categories',
+    'feature': 'feature_categories',
+    'industry': 'industry_categories',
+}
+
+# カテゴリ名末尾の件数表記（例: 東京都(123) / 東京都（123件））
+COUNT_SUFFIX_RE = re.compile(r'\(\d+[件社]?\)$')
+# 地域名の都府県（fetch_categories の既定カテゴリは「東京」、取得済みCSVは「東京都」）
+# 「京都」の「都」は落とさないよう、都は東京都だけ
+PREFECTURE_SUFFIX_RE = re.compile(r'(?<=東京)都$|(?<=..)[府県]$')
+
+
+def category_key(group: str, name: str) -> Tuple[str, str]:
+    """CSVのカテゴリ名とカテゴリ一覧のリンク文字列を突き合わせるキー
+
+    マージ済みCSVにはカテゴリのURLが無いため名前で照合する。
+    全角半角・空白・件数表記・（地域のみ）都府県の有無の違いを吸収する。
+    """
+    name = re.sub(r'\s+', '', unicodedata.normalize('NFKC', name or ''))
+    name = COUNT_SUFFIX_RE.sub('', name)
+    if group == 'area':
+        name = PREFECTURE_SUFFIX_RE.sub('', name)
+    return group, name
+
+
+def load_known_urls(csv_path: str) -> Dict[Tuple[str, str], Set[str]]:
+    """マージ済みCSVから category_key() ごとの既知 yuryoweb_url を読む"""
+    known = defaultdict(set)
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            url = row.get('yuryoweb_url', '')
+            if not url:
+                continue
+            for group, column in CATEGORY_COLUMNS.items():
+                for name in (row.get(column) or '').split('｜'):
+                    if name:
+                        known[category_key(group, name)].add(url)
+    return known
+
+
+class ChangeSet:
+    """差分クロールの結果（追加・削除された企業）"""
+
+    def __init__(self):
+        self.added: List[Dict] = []
+        self.removed: List[Dict] = []
+        self.stop_reasons: Dict[Tuple[str, str], str] = {}
+
+    def to_records(self) -> List[Dict]:
+        """シンクへ書き出せる形式に変換"""
+        records = [dict(record, change='added') for record in self.added]
+        records.extend(dict(record, change='removed') for record in self.removed)
+        return records
+
+    def summary(self) -> Dict:
+        return {
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'categories': len(self.stop_reasons),
+            'walked_to_end': sum(1 for r in self.stop_reasons.values() if r == 'end'),
+            'stopped_at_known': sum(1 for r in self.stop_reasons.values() if r == 'known'),
+            'stopped_at_empty': sum(1 for r in self.stop_reasons.values() if r == 'empty'),
+            'errors': sum(1 for r in self.stop_reasons.values() if r == 'error'),
+        }
+
+
+def delta_scrape_category(
+    scraper: YuryoWebScraper,
+    category: Dict,
+    category_group: str,
+    known_urls: Set[str],
+    changes: Optional[ChangeSet] = None
+) -> ChangeSet:
+    """1カテゴリを差分モードで取得し、変化を changes に追加
+
+    一覧は新着順に並ぶ前提で、全件既知のページに到達したら打ち切る。
+    既知ページで止まった場合はそれ以降を見ていないため、削除の判定は
+    企業のあるページを取得し、かつ最後のページが次ページなし（'end'）だった
+    カテゴリでのみ行う。0件のページ（'empty'）は一時的な取得失敗と区別
+    できないので、削除とはみなさない。
+    """
+    if changes is None:
+        changes = ChangeSet()
+
+    seen = set()
+    records = scraper.scrape_category(
+        category_url=category['url'],
+        category_group=category_group,
+        category_name=category['name'],
+        known_urls=known_urls
+    )
+    while True:
+        try:
+            record = next(records)
+        except StopIteration as stop:
+            reason = stop.value
+            break
+        url = record.get('yuryoweb_url')
+        seen.add(url)
+        if url not in known_urls:
+            changes.added.append(record)
+
+    changes.stop_reasons[(category_group, category['name'])] = reason
+
+    if reason == 'end' and seen:
+        for url in sorted(known_urls - seen):
+            changes.removed.append({
+                'yuryoweb_url': url,
+                'category_group': category_group,
+                'category_name': category['name'],
+            })
+
+    return changes
+
+
+def delta_crawl(
+    scraper: YuryoWebScraper,
+    categories: Dict[str, List[Dict]],
+    known: Dict[Tuple[str, str], Set[str]],
+    groups: Optional[List[str]] = None
+) -> ChangeSet:
+    """全カテゴリを差分モードで取得"""
+    changes = ChangeSet()
+    for group in groups or list(categories):
+        for category in categories.get(group, []):
+            delta_scrape_category(
+                scraper, category, group,
+                known.get(category_key(group, category['name']), set()),
+                changes
+            )
+    return changes
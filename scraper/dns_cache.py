@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+プロセス内のDNSキャッシュ（TTL付き・件数上限あり、全ワーカーで共有）
+"""
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import List
+
+from scraper.http_timing import resolve
+
+
+class DnsCache:
+    """ホスト名 → IPアドレスリストのキャッシュ
+
+    - 解決結果は ttl 秒、解決できなかったホストは negative_ttl 秒覚えておく
+    - max_entries を超えたら最も古く使われたホストから捨てる
+    - 同じホストの同時解決は1回にまとめる（他のスレッドは結果を待つ）
+    getaddrinfo はTTLを返さないため、有効期限は一律 ttl で扱う。
+    """
+
+    def __init__(self, ttl: float = 300, negative_ttl: float = 30, max_entries: int = 10000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.lookups: dict = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, host: str):
+        entry = self.entries.get(host)
+        if entry is None:
+            return None
+        expires, addresses, error = entry
+        if expires < time.monotonic():
+            del self.entries[host]
+            return None
+        self.entries.move_to_end(host)
+        return entry
+
+    def _put(self, host: str, addresses, error):
+        ttl = self.negative_ttl if error else self.ttl
+        self.entries[host] = (time.monotonic() + ttl, addresses, error)
+        self.entries.move_to_end(host)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """キャッシュを使って解決（失敗時は socket.gaierror）"""
+        host = host.lower()
+        while True:
+            with self.lock:
+                entry = self._get(host)
+                if entry is not None:
+                    self.hits += 1
+                    break
+                event = self.lookups.get(host)
+                if event is None:
+                    event = self.lookups[host] = threading.Event()
+                    self.misses += 1
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                event.wait()
+                continue
+
+            addresses, error = [], None
+            try:
+                addresses = resolve(host, port)
+            except socket.gaierror as e:
+                error = e
+            finally:
+                # 想定外の例外でも待っているスレッドは解放する（その場合はキャッシュしない）
+                with self.lock:
+                    if addresses or error:
+                        self._put(host, addresses, error)
+                    del self.lookups[host]
+                event.set()
+            entry = (None, addresses, error)
+            break
+
+        _, addresses, error = entry
+        if error is not None:
+            raise error
+        return list(addresses)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
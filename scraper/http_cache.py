@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+スクレイパー用のディスクHTTPキャッシュ（ETag / Last-Modified による条件付きGET）
+
+キャッシュの判定には cachecontrol の CacheController を使い、アダプタ自体は
+トップレベルの requests の HTTPAdapter（または TimedHTTPAdapter）の上に組む。
+pip同梱版の CacheControlAdapter は pip._vendor.requests の上に作られていて、
+そのレスポンス・例外（pip._vendor.requests.exceptions.*）が混ざるので使わない。
+"""
+import functools
+import hashlib
+import io
+import os
+import tempfile
+import weakref
+import zlib
+from typing import Dict, Optional, Type
+
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+try:
+    from cachecontrol.cache import BaseCache
+    from cachecontrol.caches import FileCache
+    from cachecontrol.controller import PERMANENT_REDIRECT_STATUSES, CacheController
+    from cachecontrol.filewrapper import CallbackFileWrapper
+    from cachecontrol.heuristics import BaseHeuristic
+    from cachecontrol.serialize import Serializer
+except ImportError:
+    try:
+        # pip同梱版（ツリー内の cachecontrol/ はこちらを参照している）。
+        # 判定ロジックだけを借り、HTTPのやり取りはトップレベルの requests / urllib3 で行う
+        from pip._vendor.cachecontrol.cache import BaseCache
+        from pip._vendor.cachecontrol.caches import FileCache
+        from pip._vendor.cachecontrol.controller import PERMANENT_REDIRECT_STATUSES, CacheController
+        from pip._vendor.cachecontrol.filewrapper import CallbackFileWrapper
+        from pip._vendor.cachecontrol.heuristics import BaseHeuristic
+        from pip._vendor.cachecontrol.serialize import Serializer
+    except ImportError:
+        CacheController = None
+        BaseCache = object
+        FileCache = None
+        BaseHeuristic = object
+        Serializer = object
+
+
+class ForcedMaxAge(BaseHeuristic):
+    """サーバーの指定に関わらず max-age を付与する（一覧ページ用）
+
+    期限切れ後は保存済みの ETag / Last-Modified で再検証されるため、
+    変更のないページは304で済む。
+    """
+
+    def __init__(self, max_age: int):
+        self.max_age = max_age
+
+    def update_headers(self, response):
+        if 'no-store' in response.headers.get('cache-control', ''):
+            return {}
+        return {'cache-control': f'max-age={self.max_age}'}
+
+    def warning(self, response):
+        return None
+
+
+class DirectoryCache(BaseCache):
+    """filelock / lockfile が無い環境用の簡易ディスクキャッシュ
+
+    書き込みは一時ファイル＋os.replace で行うのでロック無しでも壊れない。
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        hashed = hashlib.sha224(key.encode()).hexdigest()
+        return os.path.join(self.directory, hashed[:2], hashed)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value, expires=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(value)
+        os.replace(tmp, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class _Serializer(Serializer):
+    """キャッシュから戻すレスポンスをトップレベルの urllib3 の HTTPResponse で作る"""
+
+    def prepare_response(self, request, cached, body_file=None):
+        # Vary: * や、Vary の対象ヘッダーが今回のリクエストと違うものは使えない
+        vary = cached.get('vary', {})
+        if '*' in vary:
+            return None
+        for header, value in vary.items():
+            if request.headers.get(header, None) != value:
+                return None
+
+        response = dict(cached['response'])
+        body_raw = response.pop('body')
+        headers = CaseInsensitiveDict(data=response['headers'])
+        if headers.get('transfer-encoding', '') == 'chunked':
+            headers.pop('transfer-encoding')
+        response['headers'] = headers
+        response.pop('strict', None)
+        body = io.BytesIO(body_raw) if body_file is None else body_file
+        return HTTPResponse(body=body, preload_content=False, **response)
+
+
+class CachingAdapterMixin:
+    """HTTPAdapter にディスクキャッシュを足す（CacheControlAdapter と同じ手順）
+
+    TimedHTTPAdapter と組み合わせれば、キャッシュを使っても接続段階の計測は続く。
+    """
+
+    cacheable_methods = ('GET',)
+
+    def __init__(self, *args, cache=None, heuristic: Optional[BaseHeuristic] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+        self.heuristic = heuristic
+        self.controller = CacheController(cache, cache_etags=True, serializer=_Serializer())
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if request.method in self.cacheable_methods:
+            try:
+                cached_response = self.controller.cached_request(request)
+            except zlib.error:
+                cached_response = None
+            if cached_response:
+                return self.build_response(request, cached_response, from_cache=True)
+            # ETag / Last-Modified があれば条件付きGETにする
+            request.headers.update(self.controller.conditional_headers(request))
+        return super().send(request, stream, timeout, verify, cert, proxies)
+
+    def build_response(self, request, response, from_cache=False):
+        if not from_cache and request.method in self.cacheable_methods:
+            if self.heuristic:
+                response = self.heuristic.apply(response)
+
+            if response.status == 304:
+                # 保存済みのレスポンスを更新して返す（本文は読み捨てて接続を返す）
+                cached_response = self.controller.update_cached_response(request, response)
+                if cached_response is not response:
+                    from_cache = True
+                response.read(decode_content=False)
+                response.release_conn()
+                response = cached_response
+            elif int(response.status) in PERMANENT_REDIRECT_STATUSES:
+                self.controller.cache_response(request, response)
+            else:
+                # 本文を読み終えた時点でキャッシュに保存する
+                response._fp = CallbackFileWrapper(
+                    response._fp,
+                    functools.partial(self.controller.cache_response, request, weakref.ref(response))
+                )
+                if response.chunked:
+                    super_update_chunk_length = response.__class__._update_chunk_length
+
+                    def _update_chunk_length(weak_self):
+                        self = weak_self()
+                        if self is None:
+                            return
+                        super_update_chunk_length(self)
+                        if self.chunk_left == 0:
+                            self._fp._close()
+
+                    response._update_chunk_length = functools.partial(
+                        _update_chunk_length, weakref.ref(response)
+                    )
+
+        resp = super().build_response(request, response)
+        resp.from_cache = from_cache
+        return resp
+
+    def close(self):
+        close = getattr(self.cache, 'close', None)
+        if close is not None:
+            close()
+        super().close()
+
+
+_caching_classes: Dict[type, type] = {}
+
+
+def caching_adapter_class(adapter_class: Type[HTTPAdapter] = HTTPAdapter) -> type:
+    """adapter_class（HTTPAdapter の派生）にキャッシュを足したクラス"""
+    caching_class = _caching_classes.get(adapter_class)
+    if caching_class is None:
+        caching_class = _caching_classes[adapter_class] = type(
+            'Caching' + adapter_class.__name__, (CachingAdapterMixin, adapter_class), {}
+        )
+    return caching_class
+
+
+def _file_cache(cache_dir: str):
+    try:
+        return FileCache(cache_dir)
+    except ImportError:
+        return DirectoryCache(cache_dir)
+
+
+def install_http_cache(
+    session,
+    base_url: str,
+    cache_dir: str,
+    listing_max_age: Optional[int] = None,
+    listing_prefix: str = '/search',
+    pool_maxsize: int = 10,
+    adapter_class: Type[HTTPAdapter] = HTTPAdapter,
+    **adapter_kwargs
+):
+    """セッションにキャッシュ付きアダプタを取り付ける
+
+    base_url 以下は通常のHTTPキャッシュ規則に従い、
+    listing_prefix 以下には listing_max_age 秒の有効期限を強制する。
+    adapter_class（例: TimedHTTPAdapter）と adapter_kwargs で土台のアダプタを選ぶ。
+    """
+    if CacheController is None:
+        raise ImportError("HTTPキャッシュには cachecontrol が必要です: pip install cachecontrol")
+
+    cache = _file_cache(cache_dir)
+    caching_class = caching_adapter_class(adapter_class)
+    adapter = caching_class(
+        cache=cache,
+        pool_connections=pool_maxsize,
+        pool_maxsize=pool_maxsize,
+        **adapter_kwargs
+    )
+    session.mount(base_url.rstrip('/') + '/', adapter)
+
+    if listing_max_age is not None:
+        listing_adapter = caching_class(
+            cache=cache,
+            heuristic=ForcedMaxAge(listing_max_age),
+            pool_connections=pool_maxsize,
+            pool_maxsize=pool_maxsize,
+            **adapter_kwargs
+        )
+        session.mount(base_url.rstrip('/') + listing_prefix, listing_adapter)
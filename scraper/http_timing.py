@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+接続段階の計測（名前解決・TCP接続・TLSハンドシェイクの時間を urllib3 の接続クラスで測る）
+と、DNSキャッシュ・接続の再利用状況の記録
+"""
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError
+from urllib3.util.connection import allowed_gai_family
+
+_local = threading.local()
+
+
+@contextmanager
+def capture_timings() -> Iterator[Dict[str, float]]:
+    """このスレッドで行う接続の段階別時間（秒）を辞書に集める
+
+    接続を再利用したリクエストでは dns / connect / tls は記録されない。
+    リダイレクトで複数回接続した場合は合計になる。
+    """
+    timings: Dict[str, float] = {}
+    previous = getattr(_local, 'timings', None)
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+
+def _note(stage: str, seconds: float):
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def resolve(host: str, port: int) -> List[str]:
+    """ホスト名をIPアドレスのリストにする（getaddrinfo の順、重複なし）"""
+    addresses = []
+    for *_, sockaddr in socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM):
+        if sockaddr[0] not in addresses:
+            addresses.append(sockaddr[0])
+    return addresses
+
+
+class ConnectionStats:
+    """リクエスト数と新規接続・TLSハンドシェイク数（差が再利用で省けた接続）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+
+    def add(self, field: str):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.connections, 0)
+
+    def summary_lines(self, dns_cache=None) -> List[str]:
+        lines = [
+            f"リクエスト: {self.requests:,}件",
+            f"新規接続: {self.connections:,}件（うちTLS {self.tls_handshakes:,}件）",
+            f"接続の再利用: {self.reused:,}件（省けたハンドシェイク）",
+        ]
+        if dns_cache is not None:
+            lookups = dns_cache.hits + dns_cache.misses
+            rate = dns_cache.hits / lookups * 100 if lookups else 0.0
+            lines.append(f"DNSキャッシュ: ヒット {dns_cache.hits:,} / 解決 {dns_cache.misses:,}（ヒット率 {rate:.1f}%）")
+        return lines
+
+
+class _TimedConnectionMixin:
+    """名前解決を接続と分けて行い、それぞれの時間を記録する
+
+    解決したアドレスを _dns_host に入れて順に接続を試す
+    （TLSのSNI・証明書検証は host を使うので影響しない）。
+    dns_cache（DnsCache）・stats（ConnectionStats）はアダプタごとのサブクラスで設定する。
+    """
+
+    dns_cache = None
+    stats: Optional[ConnectionStats] = None
+
+    def _resolve(self, host: str) -> List[str]:
+        if self.dns_cache is not None:
+            return self.dns_cache.resolve(host, self.port)
+        return resolve(host, self.port)
+
+    def request(self, *args, **kwargs):
+        # 接続は送信時に張られるので、送れたものだけ数える
+        super().request(*args, **kwargs)
+        if self.stats is not None:
+            self.stats.add('requests')
+
+    def _new_conn(self) -> socket.socket:
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            addresses = self._resolve(host)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        finally:
+            self._dns_seconds = time.perf_counter() - start
+            _note('dns', self._dns_seconds)
+
+        start = time.perf_counter()
+        try:
+            for i, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    conn = super()._new_conn()
+                    if self.stats is not None:
+                        self.stats.add('connections')
+                    return conn
+                except ConnectTimeoutError:
+                    # 最後のアドレスまで失敗したらそのまま送出
+                    if i == len(addresses) - 1:
+                        raise
+            raise NameResolutionError(self.host, self, socket.gaierror('no addresses'))
+        finally:
+            self._dns_host = host
+            self._tcp_seconds = time.perf_counter() - start
+            _note('connect', self._tcp_seconds)
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        self._dns_seconds = self._tcp_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            super().connect()
+            if self.stats is not None:
+                self.stats.add('tls_handshakes')
+        finally:
+            tls = time.perf_counter() - start - self._dns_seconds - self._tcp_seconds
+            _note('tls', max(tls, 0.0))
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """接続段階を計測する接続クラスを使うアダプタ（プロキシ経由は対象外）
+
+    dns_cache を渡すと名前解決をキャッシュし、stats を渡すとリクエスト数と
+    新規接続数を数える。段階別の時間は capture_timings() の中でだけ記録される。
+    """
+
+    pool_classes = {
+        'http': TimedHTTPConnectionPool,
+        'https': TimedHTTPSConnectionPool,
+    }
+
+    def __init__(self, *args, dns_cache=None, stats: Optional[ConnectionStats] = None, **kwargs):
+        if dns_cache is not None or stats is not None:
+            # このアダプタ専用の接続クラスに DNSキャッシュ・集計先を持たせる
+            attrs = {'dns_cache': dns_cache, 'stats': stats}
+            self.pool_classes = {
+                scheme: type(pool.__name__, (pool,), {
+                    'ConnectionCls': type(pool.ConnectionCls.__name__, (pool.ConnectionCls,), attrs)
+                })
+                for scheme, pool in self.pool_classes.items()
+            }
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = dict(self.pool_classes)
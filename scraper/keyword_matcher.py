@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+キーワード照合（全キーワードを1本の正規表現にまとめ、1回の走査で重み付きスコアを出す）
+"""
+import re
+from typing import Dict, Iterable, List, NamedTuple
+
+
+class KeywordMatch(NamedTuple):
+    score: float
+    matched: List[str]
+    excluded: bool
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """共通接頭辞をまとめた正規表現（re は選択肢を順に試すため、枝分かれを減らす）"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        alternatives = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        if '' in node:
+            # 接頭辞で終わるキーワードもあるので続きは省略可（貪欲なので長い方が優先）
+            return '(?:%s)?' % '|'.join(alternatives)
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return '(?:%s)' % '|'.join(alternatives)
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """重み付きキーワードと除外キーワードを一度にコンパイルした照合器
+
+    大半のリンクはどのキーワードにも一致しないため、まず search() 1回で足切りする。
+    一致した場合だけ先読み (?=(...)) で全ての開始位置を試し、「お問い合わせ」と
+    「問い合わせ」のように重なるキーワードも拾う。同じ開始位置で一致した短い
+    キーワード（長いキーワードの接頭辞）は照合後に補う。
+    入力は小文字化してから照合するので、キーワードは小文字で渡す。
+    """
+
+    def __init__(self, weights: Dict[str, float], exclude: Iterable[str] = ()):
+        self.weights = dict(weights)
+        self.exclude = frozenset(exclude)
+        keywords = sorted(set(self.weights) | self.exclude)
+        trie = _trie_pattern(keywords)
+        self.any_pattern = re.compile(trie)
+        self.pattern = re.compile('(?=(%s))' % trie)
+        self.include_pattern = re.compile(_trie_pattern(sorted(self.weights)))
+        self.exclude_pattern = re.compile(_trie_pattern(sorted(self.exclude))) if self.exclude else None
+        self.prefixes = {}
+        for keyword in keywords:
+            prefixes = [k for k in keywords if k != keyword and keyword.startswith(k)]
+            if prefixes:
+                self.prefixes[keyword] = prefixes
+
+    def matches(self, *texts: str) -> bool:
+        """重み付きキーワードを含み、除外キーワードを含まないか（スコアは計算しない）"""
+        # 改行はどのキーワードにも含まれないので、連結しても跨いだ一致は起きない
+        joined = '\n'.join(texts).lower()
+        if self.exclude_pattern is not None and self.exclude_pattern.search(joined):
+            return False
+        return self.include_pattern.search(joined) is not None
+
+    def scan(self, *texts: str) -> KeywordMatch:
+        """texts のいずれかに含まれるキーワードを集計（各キーワードは1回だけ数える）"""
+        joined = '\n'.join(texts).lower()
+        if not self.any_pattern.search(joined):
+            return KeywordMatch(0, [], False)
+
+        found = set(self.pattern.findall(joined))
+        for keyword in [k for k in found if k in self.prefixes]:
+            found.update(self.prefixes[keyword])
+
+        excluded = not self.exclude.isdisjoint(found)
+        matched = [k for k in self.weights if k in found]
+        score = sum(self.weights[k] for k in matched)
+        return KeywordMatch(score, matched, excluded)
+
+    def score(self, *texts: str) -> float:
+        """除外キーワードを含めば 0、そうでなければ重みの合計"""
+        result = self.scan(*texts)
+        return 0 if result.excluded else result.score
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+一覧ページの抽出プラン（正規表現は一度だけコンパイルし、木の走査は1回で済ませる）
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString, Tag
+
+# 企業アイテムのセレクタ（優先順）
+ITEM_SELECTORS = (
+    ('div', 'company-item'),
+    ('article', 'company'),
+    ('li', 'company-list-item'),
+)
+
+NAME_CLASS_RE = re.compile(r'company|title')
+SITE_TEXT_RE = re.compile(r'公式|サイト|website', re.I)
+ABSOLUTE_URL_RE = re.compile(r'^https?://')
+ADDRESS_TEXT_RE = re.compile(r'〒|都|府|県|市|区|町|村')
+ADDRESS_CLASS_RE = re.compile(r'addr|location')
+DETAIL_HREF_RE = re.compile(r'/company/|/detail/')
+NEXT_TEXT_RE = re.compile(r'次|next|→', re.I)
+
+NAME_TAGS = frozenset(['h2', 'h3', 'h4'])
+ADDRESS_TAGS = frozenset(['span', 'p'])
+
+
+def _classes(tag: Tag) -> List[str]:
+    value = tag.get('class')
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return value.split()
+    return value
+
+
+def _class_matches(tag: Tag, pattern) -> bool:
+    return any(pattern.search(c) for c in _classes(tag))
+
+
+def extract_company(element: Tag, base_url: str) -> Optional[Dict]:
+    """企業アイテム1件を1回の走査で抽出（_extract_company_info と同じ結果）"""
+    name_heading = None
+    name_link = None
+    site_link = None
+    external_link = None
+    address_text = None
+    address_tag = None
+    detail_link = None
+
+    for node in element.descendants:
+        if isinstance(node, Tag):
+            name = node.name
+            if name == 'a':
+                href = node.get('href')
+                if name_link is None and _class_matches(node, NAME_CLASS_RE):
+                    name_link = node
+                if site_link is None:
+                    string = node.string
+                    if string is not None and SITE_TEXT_RE.search(string):
+                        site_link = node
+                if href is not None:
+                    if (external_link is None and ABSOLUTE_URL_RE.search(href)
+                            and 'yuryoweb.com' not in href):
+                        external_link = node
+                    if detail_link is None and DETAIL_HREF_RE.search(href):
+                        detail_link = node
+            elif name in NAME_TAGS:
+                if name_heading is None and _class_matches(node, NAME_CLASS_RE):
+                    name_heading = node
+            elif name in ADDRESS_TAGS:
+                if address_tag is None and _class_matches(node, ADDRESS_CLASS_RE):
+                    address_tag = node
+        elif address_text is None and isinstance(node, NavigableString):
+            if ADDRESS_TEXT_RE.search(node):
+                address_text = node
+
+    company_info = {}
+
+    name_elem = name_heading or name_link
+    if name_elem is not None:
+        company_info['company_name'] = name_elem.text.strip()
+
+    if site_link is not None:
+        company_info['official_site_url'] = site_link.get('href', '')
+    elif external_link is not None:
+        company_info['official_site_url'] = external_link.get('href', '')
+
+    if address_text is not None:
+        company_info['address'] = address_text.strip()
+    elif address_tag is not None:
+        company_info['address'] = address_tag.text.strip()
+
+    if detail_link is not None:
+        company_info['yuryoweb_url'] = urljoin(base_url, detail_link.get('href', ''))
+
+    return company_info if company_info.get('company_name') else None
+
+
+def scan_page(soup: BeautifulSoup) -> Tuple[List[Tag], bool]:
+    """ページを1回走査して企業アイテムと次ページの有無を取得"""
+    found = {selector: [] for selector in ITEM_SELECTORS}
+    next_link = False
+    pagination = None
+
+    for node in soup.descendants:
+        if not isinstance(node, Tag):
+            continue
+        name = node.name
+        for selector in ITEM_SELECTORS:
+            if name == selector[0] and selector[1] in _classes(node):
+                found[selector].append(node)
+        if name == 'a':
+            if not next_link:
+                string = node.string
+                if string is not None and NEXT_TEXT_RE.search(string):
+                    next_link = True
+        elif name == 'nav' and pagination is None and 'pagination' in _classes(node):
+            pagination = node
+
+    company_items = []
+    for selector in ITEM_SELECTORS:
+        if found[selector]:
+            company_items = found[selector]
+            break
+
+    has_next = next_link
+    if not has_next and pagination is not None:
+        current = pagination.find('span', class_='current')
+        has_next = current is not None and current.find_next_sibling('a') is not None
+
+    return company_items, has_next
+
+
+def parse_listing(soup: BeautifulSoup, base_url: str) -> Tuple[List[Dict], bool]:
+    """一覧ページから企業情報リストと次ページの有無を返す"""
+    company_items, has_next = scan_page(soup)
+    company_list = []
+    for item in company_items:
+        company_data = extract_company(item, base_url)
+        if company_data:
+            company_list.append(company_data)
+    return company_list, has_next
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+クロールの計測（段階別の時間ヒストグラム・エラー分類・ドメイン別集計と、
+rich のライブ表示・Prometheus形式のテキスト出力）
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from urllib3.exceptions import NameResolutionError, NewConnectionError, TimeoutError as Urllib3TimeoutError
+
+from scraper.http_timing import capture_timings
+
+try:
+    from rich.console import Group
+    from rich.live import Live
+    from rich.progress import BarColumn, Progress, TextColumn, TimeRemainingColumn
+    from rich.table import Table
+except ImportError:
+    try:
+        # pip同梱版
+        from pip._vendor.rich.console import Group
+        from pip._vendor.rich.live import Live
+        from pip._vendor.rich.progress import BarColumn, Progress, TextColumn, TimeRemainingColumn
+        from pip._vendor.rich.table import Table
+    except ImportError:
+        Live = None
+
+# 1リクエストの段階（dns〜download は通信、parse / extract は取得後の処理）
+STAGES = ('dns', 'connect', 'tls', 'ttfb', 'download', 'parse', 'extract')
+
+ERROR_KINDS = ('timeout', 'ssl', 'dns', 'connection', 'redirect', 'http_4xx', 'http_5xx', 'other')
+
+# ヒストグラムの上限値（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def classify_error(exc: Optional[BaseException] = None, status_code: Optional[int] = None) -> str:
+    """例外またはステータスコードを ERROR_KINDS のいずれかに分類する"""
+    if exc is None:
+        if status_code and 400 <= status_code < 500:
+            return 'http_4xx'
+        if status_code and status_code >= 500:
+            return 'http_5xx'
+        return 'other'
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return classify_error(status_code=exc.response.status_code)
+    # SSLError・ConnectTimeout は ConnectionError の派生なので先に判定
+    if isinstance(exc, requests.exceptions.SSLError):
+        return 'ssl'
+    if isinstance(exc, requests.exceptions.Timeout):
+        return 'timeout'
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        cause = exc.args[0] if exc.args else None
+        reason = getattr(cause, 'reason', cause)
+        if isinstance(reason, NameResolutionError) or isinstance(cause, NameResolutionError):
+            return 'dns'
+        # 接続拒否など（urllib3 では ConnectTimeoutError の派生）
+        if isinstance(reason, NewConnectionError):
+            return 'connection'
+        # 本文の受信中のタイムアウトは ConnectionError で届く
+        if isinstance(reason, Urllib3TimeoutError) or isinstance(cause, Urllib3TimeoutError):
+            return 'timeout'
+        return 'connection'
+    if isinstance(exc, requests.exceptions.TooManyRedirects):
+        return 'redirect'
+    return 'other'
+
+
+class Histogram:
+    """固定バケットのヒストグラム（Prometheus の histogram と同じ le 区切り）"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """バケット内を線形補間した分位点（最上位バケットは最大値で打ち切る）"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, count in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if count and seen + count >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+            lower = upper
+        return self.max
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, その値以下の件数) のリスト（最後は +Inf）"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append(('+Inf' if bound == float('inf') else repr(bound), total))
+        return result
+
+
+class DomainStats:
+    """1ドメイン分の集計"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.bytes = 0
+
+
+class CrawlMetrics:
+    """クロール全体の計測値（複数スレッドから更新してよい）
+
+    record_response / record_error を fetch ごとに、observe（または timer）を
+    parse / extract などの処理ごとに呼ぶ。
+    """
+
+    def __init__(self, name: str = 'crawl', total: Optional[int] = None, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.total = total
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        self.stages: Dict[str, Histogram] = {stage: Histogram(buckets) for stage in STAGES}
+        self.request_seconds = Histogram(buckets)
+        self.requests = 0
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.bytes = 0
+        self.items = 0
+        self.domains: Dict[str, DomainStats] = {}
+
+    def _domain(self, url: str) -> DomainStats:
+        host = urlparse(url).netloc.lower()
+        stats = self.domains.get(host)
+        if stats is None:
+            stats = self.domains[host] = DomainStats()
+        return stats
+
+    def observe(self, stage: str, seconds: float):
+        with self.lock:
+            self.stages[stage].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def record_response(self, url: str, response: requests.Response, seconds: float, timings: Optional[Dict] = None):
+        """取得できたレスポンスを記録（seconds は本文の受信完了までの時間）
+
+        timings は http_timing.capture_timings() の結果。response.elapsed
+        （ヘッダー受信まで）から接続時間を引いたものを TTFB、残りを download とする。
+        """
+        timings = timings or {}
+        elapsed = sum(r.elapsed.total_seconds() for r in list(response.history) + [response])
+        connect = sum(timings.get(stage, 0.0) for stage in ('dns', 'connect', 'tls'))
+        size = len(response.content)
+        with self.lock:
+            for stage in ('dns', 'connect', 'tls'):
+                if stage in timings:
+                    self.stages[stage].observe(timings[stage])
+            self.stages['ttfb'].observe(max(elapsed - connect, 0.0))
+            self.stages['download'].observe(max(seconds - elapsed, 0.0))
+            self.request_seconds.observe(seconds)
+            self.requests += 1
+            self.statuses[f'{response.status_code // 100}xx'] += 1
+            self.bytes += size
+            domain = self._domain(url)
+            domain.requests += 1
+            domain.seconds += seconds
+            domain.bytes += size
+            if response.status_code >= 400:
+                self.errors[classify_error(status_code=response.status_code)] += 1
+                domain.errors += 1
+
+    def record_error(self, url: str, exc: Optional[BaseException] = None, seconds: float = 0.0) -> str:
+        """失敗したリクエストを記録して分類を返す（HTTPError は record_response 済みなら二重に数えない）"""
+        kind = classify_error(exc)
+        with self.lock:
+            if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+                return kind
+            self.requests += 1
+            self.errors[kind] += 1
+            self.request_seconds.observe(seconds)
+            domain = self._domain(url)
+            domain.requests += 1
+            domain.errors += 1
+            domain.seconds += seconds
+        return kind
+
+    def item_done(self, count: int = 1):
+        """処理単位（サイト・ページ）の完了を数える"""
+        with self.lock:
+            self.items += count
+
+    def top_domains(self, limit: int = 10) -> List[Tuple[str, DomainStats]]:
+        """合計時間の長いドメイン"""
+        with self.lock:
+            domains = list(self.domains.items())
+        return sorted(domains, key=lambda item: item[1].seconds, reverse=True)[:limit]
+
+    def summary_lines(self) -> List[str]:
+        """段階別の件数・平均・p50・p95・最大と、エラー分類（レポート用）"""
+        lines = [f"{'stage':<10}{'count':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        with self.lock:
+            for stage, histogram in self.stages.items():
+                if not histogram.count:
+                    continue
+                lines.append(
+                    f"{stage:<10}{histogram.count:>10,}{histogram.mean * 1000:>10.1f}"
+                    f"{histogram.quantile(0.5) * 1000:>10.1f}{histogram.quantile(0.95) * 1000:>10.1f}"
+                    f"{histogram.max * 1000:>10.1f}"
+                )
+            errors = ', '.join(f"{kind}: {self.errors[kind]:,}" for kind in ERROR_KINDS if self.errors[kind])
+        lines.append(f"エラー: {errors or 'なし'}")
+        return lines
+
+    def prometheus(self) -> str:
+        """Prometheus のテキスト形式（0.0.4）"""
+        prefix = self.name
+        lines = []
+        with self.lock:
+            lines.append(f'# TYPE {prefix}_stage_seconds histogram')
+            for stage, histogram in self.stages.items():
+                for le, count in histogram.cumulative():
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {count}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            lines.append(f'# TYPE {prefix}_requests_total counter')
+            lines.append(f'{prefix}_requests_total {self.requests}')
+            lines.append(f'# TYPE {prefix}_responses_total counter')
+            for status, count in sorted(self.statuses.items()):
+                lines.append(f'{prefix}_responses_total{{status="{status}"}} {count}')
+            lines.append(f'# TYPE {prefix}_errors_total counter')
+            for kind in ERROR_KINDS:
+                lines.append(f'{prefix}_errors_total{{kind="{kind}"}} {self.errors[kind]}')
+            lines.append(f'# TYPE {prefix}_response_bytes_total counter')
+            lines.append(f'{prefix}_response_bytes_total {self.bytes}')
+            lines.append(f'# TYPE {prefix}_items_total counter')
+            lines.append(f'{prefix}_items_total {self.items}')
+            if self.total:
+                lines.append(f'# TYPE {prefix}_items_expected gauge')
+                lines.append(f'{prefix}_items_expected {self.total}')
+            lines.append(f'# TYPE {prefix}_domains gauge')
+            lines.append(f'{prefix}_domains {len(self.domains)}')
+        return '\n'.join(lines) + '\n'
+
+
+def timed_get(session: requests.Session, url: str, metrics: Optional[CrawlMetrics], **kwargs) -> requests.Response:
+    """session.get して結果を metrics に記録する（metrics が None なら普通に取得）"""
+    if metrics is None:
+        return session.get(url, **kwargs)
+
+    start = time.perf_counter()
+    try:
+        with capture_timings() as timings:
+            response = session.get(url, **kwargs)
+            # 本文の受信完了までを計測に含める
+            response.content
+    except Exception as e:
+        metrics.record_error(url, e, time.perf_counter() - start)
+        raise
+    metrics.record_response(url, response, time.perf_counter() - start, timings)
+    return response
+
+
+class MetricsServer:
+    """/metrics で CrawlMetrics.prometheus() を返すHTTPサーバー（別スレッド）"""
+
+    def __init__(self, metrics: CrawlMetrics, port: int = 9108, host: str = '127.0.0.1'):
+        self.metrics = metrics
+        self.address = (host, port)
+        self.httpd = None
+
+    def start(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(self.address, Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/metrics'
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class MetricsDashboard:
+    """rich.live による進捗・段階別時間・エラー・遅いドメインのライブ表示
+
+    rich が無い環境では何もしない（available が False）。
+    """
+
+    def __init__(self, metrics: CrawlMetrics, refresh_per_second: float = 2, top_domains: int = 8):
+        self.metrics = metrics
+        self.refresh_per_second = refresh_per_second
+        self.top_domains = top_domains
+        self.available = Live is not None
+        self.live = None
+
+    def _render(self):
+        metrics = self.metrics
+        progress = Progress(
+            TextColumn('[bold]{task.description}'), BarColumn(),
+            TextColumn('{task.completed:,}/{task.total:,}'), TimeRemainingColumn()
+        )
+        elapsed = time.time() - metrics.start_time
+        rate = metrics.items / elapsed if elapsed else 0
+        progress.add_task(f'{metrics.name} {rate:.1f}/秒', total=metrics.total or max(metrics.items, 1),
+                          completed=metrics.items)
+
+        stages = Table(title='段階別時間 (ms)', expand=True)
+        for column in ('stage', 'count', 'mean', 'p50', 'p95', 'max'):
+            stages.add_column(column, justify='left' if column == 'stage' else 'right')
+        with metrics.lock:
+            for stage, histogram in metrics.stages.items():
+                stages.add_row(
+                    stage, f'{histogram.count:,}', f'{histogram.mean * 1000:.1f}',
+                    f'{histogram.quantile(0.5) * 1000:.1f}', f'{histogram.quantile(0.95) * 1000:.1f}',
+                    f'{histogram.max * 1000:.1f}'
+                )
+            errors = Table(title=f'エラー（リクエスト {metrics.requests:,}件）', expand=True)
+            errors.add_column('kind')
+            errors.add_column('count', justify='right')
+            for kind in ERROR_KINDS:
+                errors.add_row(kind, f'{metrics.errors[kind]:,}')
+
+        domains = Table(title='時間の長いドメイン', expand=True)
+        for column in ('domain', 'requests', 'errors', 'sec', 'KB'):
+            domains.add_column(column, justify='left' if column == 'domain' else 'right')
+        for host, stats in metrics.top_domains(self.top_domains):
+            domains.add_row(host, f'{stats.requests:,}', f'{stats.errors:,}', f'{stats.seconds:.1f}',
+                            f'{stats.bytes / 1024:,.0f}')
+
+        return Group(progress, stages, errors, domains)
+
+    def start(self):
+        if self.available:
+            self.live = Live(get_renderable=self._render, refresh_per_second=self.refresh_per_second)
+            self.live.start()
+        return self
+
+    def stop(self):
+        if self.live:
+            self.live.stop()
+            self.live = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+HTMLパーサーの選択と、必要な部分だけを木にする parse_only ストレーナー
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+def _importable(module: str) -> bool:
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+HAS_LXML = _importable('lxml')
+HAS_HTML5LIB = _importable('html5lib')
+
+# lxml があればC実装のパーサーを使う
+DEFAULT_PARSER = 'lxml' if HAS_LXML else 'html.parser'
+
+
+def available_parsers() -> List[str]:
+    """この環境で使えるパーサー名の一覧"""
+    parsers = ['html.parser']
+    if HAS_LXML:
+        parsers.append('lxml')
+    if HAS_HTML5LIB:
+        parsers.append('html5lib')
+    return parsers
+
+
+class SelectorStrainer(SoupStrainer):
+    """(タグ名, classトークン) のいずれかに一致する要素だけを木に残すストレーナー
+
+    classトークンが None の場合はタグ名だけで判定する。
+    require_attrs に含まれる属性を持たないタグは除外する（例: href の無い <a>）。
+    """
+
+    def __init__(self, selectors: Iterable[Tuple[str, Optional[str]]], require_attrs: Iterable[str] = ()):
+        self.selectors = {}
+        for name, class_token in selectors:
+            self.selectors.setdefault(name, set()).add(class_token)
+        self.require_attrs = tuple(require_attrs)
+        super().__init__(name=sorted(self.selectors))
+
+    def _allowed(self, name: str, class_value, has_attr) -> bool:
+        tokens = self.selectors.get(name)
+        if tokens is None:
+            return False
+        for attr in self.require_attrs:
+            if not has_attr(attr):
+                return False
+        if None in tokens:
+            return True
+        if not class_value:
+            return False
+        if isinstance(class_value, str):
+            class_value = class_value.split()
+        return any(token in tokens for token in class_value)
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        attrs = attrs or {}
+        return self._allowed(name, attrs.get('class'), attrs.__contains__)
+
+    def matches_tag(self, tag) -> bool:
+        return self._allowed(tag.name, tag.get('class'), tag.has_attr)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} selectors={self.selectors}>"
+
+
+# 一覧ページ: 企業アイテム・ページネーション・次ページリンクだけ
+LISTING_STRAINER = SelectorStrainer([
+    ('div', 'company-item'),
+    ('article', 'company'),
+    ('li', 'company-list-item'),
+    ('nav', 'pagination'),
+    ('a', None),
+])
+
+# 企業サイト: リンクとフォームだけ
+ANCHOR_STRAINER = SelectorStrainer([('a', None)], require_attrs=['href'])
+CONTACT_STRAINER = SelectorStrainer([('a', None), ('form', None)])
+
+
+def make_soup(
+    content,
+    parser: Optional[str] = None,
+    parse_only: Optional[SoupStrainer] = None,
+    build_index: bool = False
+) -> BeautifulSoup:
+    """指定パーサー（省略時は DEFAULT_PARSER）でパース
+
+    html5lib は parse_only に対応しないため、その場合は全体をパースする。
+    build_index=True でタグ名・class・id の索引を作る（同じ木に find_all を
+    何度も呼ぶ場合に速い。木を変更すると索引は破棄される）。
+    """
+    parser = parser or DEFAULT_PARSER
+    if parser == 'html5lib':
+        parse_only = None
+    return BeautifulSoup(content, parser, parse_only=parse_only, build_index=build_index)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+レコードを逐次書き出すJSONLシンク（全件をメモリに溜めない）
+"""
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, Optional
+
+
+class JsonlSink:
+    """レコードを1行1JSONで追記するシンク
+
+    - パスが .gz で終わる場合（または compress=True）はgzipで書き出す
+    - flush_every 件ごとにflushし、別プロセスから tail_jsonl で追える
+    - fsync_every 件ごとにfsyncしてディスクへの書き込みを保証する
+    - 複数スレッドから write してよい
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compress: Optional[bool] = None,
+        append: bool = True,
+        flush_every: int = 1,
+        fsync_every: int = 1000
+    ):
+        self.path = path
+        self.compress = path.endswith('.gz') if compress is None else compress
+        self.flush_every = max(1, flush_every)
+        self.fsync_every = fsync_every
+        self.count = 0
+        self.lock = threading.Lock()
+
+        mode = 'ab' if append else 'wb'
+        self.raw = open(path, mode)
+        if self.compress:
+            self.stream = gzip.GzipFile(fileobj=self.raw, mode=mode)
+        else:
+            self.stream = self.raw
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record: Dict):
+        """1レコードを書き出す"""
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self.lock:
+            self.stream.write(line.encode('utf-8'))
+            self.count += 1
+            if self.count % self.flush_every == 0:
+                self._flush()
+            if self.fsync_every and self.count % self.fsync_every == 0:
+                os.fsync(self.raw.fileno())
+
+    def consume(self, records: Iterable[Dict]) -> int:
+        """イテラブルのレコードを全て書き出し、件数を返す"""
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def _flush(self):
+        if self.compress:
+            # 同期フラッシュで、ここまでの内容を読み手が展開できる状態にする
+            self.stream.flush(zlib.Z_SYNC_FLUSH)
+        self.raw.flush()
+
+    def close(self):
+        with self.lock:
+            if self.raw.closed:
+                return
+            if self.compress:
+                self.stream.close()
+            self.raw.flush()
+            os.fsync(self.raw.fileno())
+            self.raw.close()
+
+
+def _open_text(path: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """JSONLファイルを1レコードずつ読む（書きかけの末尾行は無視）"""
+    with _open_text(path) as f:
+        try:
+            for line in f:
+                if line.endswith('\n'):
+                    yield json.loads(line)
+        except EOFError:
+            # 書き込み中のgzipは終端がまだ無い
+            return
+
+
+def tail_jsonl(path: str, poll_interval: float = 0.5, stop: Optional[threading.Event] = None) -> Iterator[Dict]:
+    """書き込み中のJSONLファイルを追いかけて読む（非圧縮のみ）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        while not (stop and stop.is_set()):
+            chunk = f.readline()
+            if not chunk:
+                time.sleep(poll_interval)
+                continue
+            buffer += chunk
+            if buffer.endswith('\n'):
+                yield json.loads(buffer)
+                buffer = ''
+
+
+def load_records(path: str) -> Iterator[Dict]:
+    """.json（配列）/ .jsonl / .jsonl.gz のいずれからもレコードを返す"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+    else:
+        yield from read_jsonl(path)
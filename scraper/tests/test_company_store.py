@@ -0,0 +1,129 @@
+"""企業ストア（scraper.company_store）のテスト"""
+import csv
+import json
+
+from scraper.company_store import CompanyStore
+
+
+def record(url, name='サンプル制作', group='area', category='東京都', address='東京都渋谷区1-2-3'):
+    return {
+        'company_name': name,
+        'official_site_url': url,
+        'yuryoweb_url': 'https://yuryoweb.com/company/1/',
+        'address': address,
+        'category_group': group,
+        'category_name': category,
+    }
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_url_variants_are_one_company(tmp_path):
+    with CompanyStore(str(tmp_path / 'store.sqlite3')) as store:
+        store.upsert_records([
+            record('http://www.example.co.jp'),
+            record('https://example.co.jp/', group='price', category='〜30万円'),
+            record(' https://www.example.co.jp/index.html ', group='feature', category='SEO'),
+        ])
+        assert len(store) == 1
+        assert store.write_csv(str(tmp_path / 'out.csv')) == 1
+
+    rows = read_csv(tmp_path / 'out.csv')
+    # 表示用には最後に見た生のURLを残す
+    assert rows[0]['official_site_url'] == 'https://www.example.co.jp/index.html'
+    assert rows[0]['area_categories'] == '東京都'
+    assert rows[0]['price_categories'] == '〜30万円'
+    assert rows[0]['feature_categories'] == 'SEO'
+
+
+def test_url_key_survives_reopen(tmp_path):
+    path = str(tmp_path / 'store.sqlite3')
+    with CompanyStore(path) as store:
+        store.upsert_records([record('https://www.example.co.jp/')])
+    with CompanyStore(path) as store:
+        store.upsert_records([record('http://example.co.jp', category='大阪府')])
+        assert len(store) == 1
+        company, = store.iter_companies()
+    assert company['area_categories'] == ['大阪府', '東京都']
+
+
+def write_json(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False)
+    return str(path)
+
+
+RECORDS = [
+    record('https://a.example.jp/', name='A制作', group='area', category='東京都'),
+    record('https://a.example.jp/', name='A制作', group='area', category='神奈川県', address='神奈川県横浜市'),
+    record('https://a.example.jp/', name='A制作', group='industry', category='不動産'),
+    record('https://b.example.jp/', name='B制作', group='price', category='〜30万円'),
+    record('https://b.example.jp/', name='B制作', group='feature', category='SEO'),
+    record('', name='URLなし', group='area', category='東京都'),
+]
+
+
+def test_upsert_is_idempotent(tmp_path):
+    source = write_json(tmp_path / 'area.json', RECORDS)
+    with CompanyStore(str(tmp_path / 'store.sqlite3')) as store:
+        first = store.merge_file(source)
+        assert first['skipped'] is False
+        assert first['records'] == 5
+        assert first['companies'] == 2
+        before = list(store.iter_companies())
+
+        # 変わっていないファイルは読み直さない
+        second = store.merge_file(source)
+        assert second['skipped'] is True
+        assert second['records'] == 5
+
+        # 読み直しても、同じレコードを直接入れ直しても行は増えない
+        store.merge_file(source, force=True)
+        store.upsert_records(RECORDS)
+        assert len(store) == 2
+        after = list(store.iter_companies())
+
+    for company in before + after:
+        del company['id']
+    assert after == before
+
+
+def test_category_membership_round_trip(tmp_path):
+    path = str(tmp_path / 'store.sqlite3')
+    with CompanyStore(path) as store:
+        store.upsert_records(RECORDS)
+        assert store.group_company_counts() == {'area': 1, 'industry': 1, 'price': 1, 'feature': 1}
+
+    # 開き直してもカテゴリIDから (グループ, 名前) に戻せる
+    with CompanyStore(path) as store:
+        a, b = store.iter_companies()
+        assert sorted(store.group_presence()) == [
+            (False, True, True, False), (True, False, False, True)
+        ]
+        assert store.write_csv(str(tmp_path / 'out.csv')) == 2
+
+    assert a['company_name'] == 'A制作'
+    assert a['addresses'] == ['東京都渋谷区1-2-3', '神奈川県横浜市']
+    assert a['area_categories'] == ['東京都', '神奈川県']
+    assert a['industry_categories'] == ['不動産']
+    assert a['price_categories'] == a['feature_categories'] == []
+    assert b['price_categories'] == ['〜30万円']
+    assert b['feature_categories'] == ['SEO']
+
+    row_a, row_b = read_csv(tmp_path / 'out.csv')
+    assert row_a['area_categories'] == '東京都｜神奈川県'
+    assert row_a['address'] == '東京都渋谷区1-2-3｜神奈川県横浜市'
+    assert row_b['price_categories'] == '〜30万円'
+
+
+def test_source_groups_can_be_limited_to_paths(tmp_path):
+    area = write_json(tmp_path / 'area.json', RECORDS[:3])
+    price = write_json(tmp_path / 'price.json', RECORDS[3:4])
+    with CompanyStore(str(tmp_path / 'store.sqlite3')) as store:
+        store.merge_file(area)
+        store.merge_file(price)
+        assert store.source_groups() == {'area': 2, 'industry': 1, 'price': 1}
+        assert store.source_groups([price]) == {'price': 1}
@@ -0,0 +1,66 @@
+"""差分クロール（scraper.delta）のテスト"""
+import csv
+
+from scraper.delta import delta_crawl, delta_scrape_category, load_known_urls
+
+CATEGORY = {'name': '東京', 'url': 'https://yuryoweb.com/search?area=tokyo'}
+KNOWN = {'https://yuryoweb.com/company_info/a/', 'https://yuryoweb.com/company_info/b/'}
+
+
+class StubScraper:
+    """scrape_category が決まったレコードと終了理由を返すスクレイパー"""
+
+    def __init__(self, urls, reason):
+        self.urls = urls
+        self.reason = reason
+        self.calls = []
+
+    def scrape_category(self, category_url, category_group='', category_name='', known_urls=None):
+        self.calls.append((category_url, known_urls))
+        for url in self.urls:
+            yield {'yuryoweb_url': url, 'category_group': category_group, 'category_name': category_name}
+        return self.reason
+
+
+def test_removals_after_walking_to_end():
+    scraper = StubScraper(['https://yuryoweb.com/company_info/a/', 'https://yuryoweb.com/company_info/c/'], 'end')
+    changes = delta_scrape_category(scraper, CATEGORY, 'area', KNOWN)
+    assert [r['yuryoweb_url'] for r in changes.added] == ['https://yuryoweb.com/company_info/c/']
+    assert [r['yuryoweb_url'] for r in changes.removed] == ['https://yuryoweb.com/company_info/b/']
+
+
+def test_no_removals_when_first_page_is_empty():
+    changes = delta_scrape_category(StubScraper([], 'empty'), CATEGORY, 'area', KNOWN)
+    assert changes.removed == []
+    assert changes.stop_reasons == {('area', '東京'): 'empty'}
+    assert changes.summary()['stopped_at_empty'] == 1
+
+
+def test_no_removals_when_a_later_page_is_empty():
+    scraper = StubScraper(['https://yuryoweb.com/company_info/c/'], 'empty')
+    changes = delta_scrape_category(scraper, CATEGORY, 'area', KNOWN)
+    assert len(changes.added) == 1
+    assert changes.removed == []
+
+
+def test_known_urls_match_fetched_category_names(tmp_path):
+    path = tmp_path / 'merged.csv'
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, ['yuryoweb_url', 'area_categories', 'industry_categories'])
+        writer.writeheader()
+        writer.writerow({
+            'yuryoweb_url': 'https://yuryoweb.com/company_info/a/',
+            'area_categories': '東京都｜大阪府',
+            'industry_categories': '不動産',
+        })
+
+    known = load_known_urls(str(path))
+    scraper = StubScraper([], 'known')
+    categories = {
+        'area': [CATEGORY, {'name': '大阪府 (12)', 'url': 'https://yuryoweb.com/search?area=osaka'}],
+        'industry': [{'name': '不動産', 'url': 'https://yuryoweb.com/search?industry=4'}],
+    }
+    delta_crawl(scraper, categories, known)
+    assert [known_urls for _, known_urls in scraper.calls] == [
+        {'https://yuryoweb.com/company_info/a/'}
+    ] * 3
@@ -0,0 +1,88 @@
+"""ディスクHTTPキャッシュ（scraper.http_cache）のテスト（ローカルのHTTPサーバーを使う）"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from scraper.http_cache import install_http_cache
+from scraper.http_timing import TimedHTTPAdapter, capture_timings
+
+
+class Handler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+        if self.path == '/slow':
+            time.sleep(1)
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            return
+        body = f'page {self.path}'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.requests_seen = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_revalidates_with_etag(server, tmp_path):
+    session = requests.Session()
+    install_http_cache(session, server, str(tmp_path / 'cache'))
+
+    first = session.get(server + '/company/1')
+    second = session.get(server + '/company/1')
+    assert isinstance(first, requests.Response)
+    assert isinstance(second, requests.Response)
+    assert first.text == second.text == 'page /company/1'
+    assert not first.from_cache
+    assert second.from_cache
+    assert Handler.requests_seen == [('/company/1', None), ('/company/1', '"v1"')]
+
+
+def test_listing_max_age_skips_the_request(server, tmp_path):
+    session = requests.Session()
+    install_http_cache(session, server, str(tmp_path / 'cache'), listing_max_age=3600)
+
+    session.get(server + '/search?page=1')
+    response = session.get(server + '/search?page=1')
+    assert response.from_cache
+    assert response.text == 'page /search?page=1'
+    assert len(Handler.requests_seen) == 1
+
+
+def test_errors_are_top_level_requests_exceptions(server, tmp_path):
+    session = requests.Session()
+    install_http_cache(session, server, str(tmp_path / 'cache'))
+    with pytest.raises(requests.exceptions.Timeout):
+        session.get(server + '/slow', timeout=0.1)
+
+
+def test_timing_adapter_still_measures(server, tmp_path):
+    session = requests.Session()
+    install_http_cache(session, server, str(tmp_path / 'cache'), adapter_class=TimedHTTPAdapter)
+    adapter = session.get_adapter(server + '/')
+    assert isinstance(adapter, TimedHTTPAdapter)
+
+    with capture_timings() as timings:
+        session.get(server + '/company/1')
+    assert 'connect' in timings
@@ -0,0 +1,133 @@
+"""一覧ページのクロール（scraper.yuryoweb_scraper）のテスト"""
+import time
+
+from scraper.crawl_state import CrawlState
+from scraper.yuryoweb_scraper import YuryoWebScraper
+
+CATEGORY_URL = 'https://yuryoweb.com/search?area=tokyo'
+CATEGORY = {'group': 'area', 'name': '東京', 'url': CATEGORY_URL}
+
+
+def companies(page, count=2):
+    return [
+        {'company_name': f'{page}-{i}', 'yuryoweb_url': f'https://yuryoweb.com/company_info/{page}-{i}/'}
+        for i in range(count)
+    ]
+
+
+class FakeResponse:
+    def __init__(self, url):
+        self.status_code = 200
+        self.content = url.encode('utf-8')
+
+
+class FakeSession:
+    """URLをそのまま本文として返すセッション（取得したURLを記録する）"""
+
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        return FakeResponse(url)
+
+
+def make_scraper(pages):
+    """pages: {ページ番号: (企業リスト, 次ページの有無)}。無いページは0件"""
+    scraper = YuryoWebScraper(delay_seconds=0)
+    scraper.session = FakeSession()
+    scraper._mount_adapters = lambda pool_maxsize: None
+
+    def parse(content):
+        url = content.decode('utf-8')
+        page = int(url.rsplit('page=', 1)[1])
+        return pages.get(page, ([], False))
+
+    scraper._parse_listing_page = parse
+    return scraper
+
+
+def scrape(scraper, **kwargs):
+    records = []
+    generator = scraper.scrape_category(CATEGORY_URL, category_group='area', category_name='東京', **kwargs)
+    while True:
+        try:
+            records.append(next(generator))
+        except StopIteration as stop:
+            return records, stop.value
+
+
+def test_empty_page_is_not_checkpointed(tmp_path):
+    with CrawlState(str(tmp_path / 'state.sqlite3')) as state:
+        records, reason = scrape(make_scraper({}), state=state)
+        assert (records, reason) == ([], 'empty')
+        assert not state.is_category_done(CATEGORY_URL)
+
+        records, reason = scrape(make_scraper({1: (companies(1), False)}), state=state)
+        assert reason == 'end'
+        assert len(records) == 2
+        assert state.is_category_done(CATEGORY_URL)
+
+
+def test_async_empty_page_is_not_checkpointed(tmp_path):
+    with CrawlState(str(tmp_path / 'state.sqlite3')) as state:
+        # 2ページ目が一時的に0件
+        scraper = make_scraper({1: (companies(1), True)})
+        records = list(scraper.crawl_categories([CATEGORY], rate_per_host=1000, page_window=1, state=state))
+        assert len(records) == 2
+        assert not state.is_category_done(CATEGORY_URL)
+        assert state.last_page(CATEGORY_URL) == 1
+
+        # 再開すると2ページ目から取り直す
+        scraper = make_scraper({1: (companies(1), True), 2: (companies(2), False)})
+        records = list(scraper.crawl_categories([CATEGORY], rate_per_host=1000, page_window=1, state=state))
+        assert [r['company_name'] for r in records] == ['2-0', '2-1']
+        assert scraper.session.requested == [CATEGORY_URL + '&page=2']
+        assert state.is_category_done(CATEGORY_URL)
+
+
+def test_closing_crawl_stops_pending_fetches():
+    pages = {page: (companies(page), True) for page in range(1, 100)}
+    scraper = make_scraper(pages)
+    categories = [dict(CATEGORY, url=f'{CATEGORY_URL}&n={n}') for n in range(5)]
+    # 1ホスト毎秒2件なので、取り消さなければ先読み分（5カテゴリ×3ページ）の消化に数秒かかる
+    records = scraper.crawl_categories(categories, concurrency=5, rate_per_host=2, burst=1, page_window=3)
+
+    start = time.monotonic()
+    next(records)
+    records.close()
+    assert time.monotonic() - start < 2
+    assert len(scraper.session.requested) < 5
+
+
+def test_page_cut_short_by_limit_is_not_checkpointed(tmp_path):
+    pages = {1: (companies(1, 3), True), 2: (companies(2, 3), False)}
+    with CrawlState(str(tmp_path / 'state.sqlite3')) as state:
+        records, reason = scrape(make_scraper(pages), state=state, limit=4)
+        assert reason == 'limit'
+        assert len(records) == 4
+        assert state.last_page(CATEGORY_URL) == 1
+
+        # 再開時は途中までだった2ページ目を全件取り直す
+        records, reason = scrape(make_scraper(pages), state=state)
+        assert reason == 'end'
+        assert [r['company_name'] for r in records] == ['2-0', '2-1', '2-2']
+
+    with CrawlState(str(tmp_path / 'async.sqlite3')) as state:
+        records = list(make_scraper(pages).crawl_categories(
+            [CATEGORY], rate_per_host=1000, page_window=2, limit=4, state=state
+        ))
+        assert len(records) == 4
+        assert state.last_page(CATEGORY_URL) == 1
+        assert not state.is_category_done(CATEGORY_URL)
+
+
+def test_reset_forgets_previous_run(tmp_path):
+    with CrawlState(str(tmp_path / 'state.sqlite3')) as state:
+        scrape(make_scraper({1: (companies(1), False)}), state=state)
+        assert state.is_category_done(CATEGORY_URL)
+
+        state.reset()
+        assert not state.is_category_done(CATEGORY_URL)
+        assert state.last_page(CATEGORY_URL) == 0
+        assert list(state.iter_records()) == []
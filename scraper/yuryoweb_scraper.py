@@ -4,19 +4,75 @@
 """
 import requests
 from bs4 import BeautifulSoup
+import asyncio
+import queue
+import threading
 import time
 import re
-from typing import Dict, List, Optional, Generator
+from typing import Dict, List, Optional, Generator, Set, Tuple
 from urllib.parse import urljoin, urlparse, parse_qs
 
+from scraper.crawl_state import CrawlState
+from scraper.http_cache import install_http_cache
+from scraper.http_timing import TimedHTTPAdapter
+from scraper.listing_parser import parse_listing
+from scraper.metrics import CrawlMetrics, timed_get
+from scraper.parsing import DEFAULT_PARSER, LISTING_STRAINER, make_soup
+from scraper.ratelimit import HostRateLimiter
+
 class YuryoWebScraper:
-    def __init__(self, delay_seconds: float = 2.0):
+    # crawl_categories の呼び出し側が止めたかを確認する間隔（秒）
+    STOP_POLL_SECONDS = 0.1
+    
+    def __init__(
+        self,
+        delay_seconds: float = 2.0,
+        cache_dir: Optional[str] = None,
+        listing_max_age: Optional[int] = None,
+        parser: Optional[str] = None,
+        metrics: Optional[CrawlMetrics] = None
+    ):
+        """cache_dir を指定するとディスクHTTPキャッシュを使う（条件付きGET）
+        
+        listing_max_age は一覧ページ（/search）に強制する有効期限（秒）。
+        期限内は再取得せず、期限切れ後は ETag / Last-Modified で再検証する。
+        parser はBeautifulSoupのパーサー名（省略時は lxml があれば lxml）。
+        metrics（CrawlMetrics）を渡すと一覧ページの取得・パースを計測する。
+        """
         self.base_url = "https://yuryoweb.com"
         self.delay_seconds = delay_seconds
+        self.parser = parser or DEFAULT_PARSER
+        self.cache_dir = cache_dir
+        self.listing_max_age = listing_max_age
+        self.metrics = metrics
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
+        self._mount_adapters(10)
+    
+    def _mount_adapters(self, pool_maxsize: int):
+        """コネクションプール（とキャッシュ）付きのアダプタを取り付ける
+
+        キャッシュも同じアダプタクラスの上に組むので、metrics の接続段階の計測は続く。
+        """
+        adapter_class = TimedHTTPAdapter if self.metrics else requests.adapters.HTTPAdapter
+        adapter = adapter_class(
+            pool_connections=pool_maxsize,
+            pool_maxsize=pool_maxsize
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        if self.cache_dir:
+            install_http_cache(
+                self.session,
+                self.base_url,
+                self.cache_dir,
+                listing_max_age=self.listing_max_age,
+                pool_maxsize=pool_maxsize,
+                adapter_class=adapter_class
+            )
     
     def fetch_categories(self) -> Dict[str, List[Dict]]:
         """カテゴリ一覧を取得"""
@@ -29,7 +85,8 @@ class YuryoWebScraper:
         
         url = self.base_url
         response = self.session.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # ページ全体を木にしてセクションごとに何度も探すので索引を作る
+        soup = make_soup(response.content, self.parser, build_index=True)
         
         # カテゴリセクションを探す
         category_sections = soup.find_all('div', class_='category-section')
@@ -129,73 +186,298 @@ class YuryoWebScraper:
         category_url: str,
         limit: Optional[int] = None,
         category_group: str = '',
-        category_name: str = ''
-    ) -> Generator[Dict, None, None]:
-        """カテゴリページから企業情報を取得"""
+        category_name: str = '',
+        state: Optional[CrawlState] = None,
+        known_urls: Optional[Set[str]] = None
+    ) -> Generator[Dict, None, str]:
+        """カテゴリページから企業情報を取得
+        
+        state を渡すとページ単位で取得結果を記録し、再実行時は
+        取得済みページを飛ばして続きから再開する。
+        known_urls（既知の yuryoweb_url）を渡すと差分モードになり、
+        全件が既知のページに到達した時点でページ送りを止める。
+        
+        ジェネレータの戻り値（StopIteration.value）は終了理由:
+        'end'（次ページなしのページまで取得）/ 'known'（既知ページで停止）/
+        'empty'（企業が0件のページで停止。一時的な取得失敗と区別できない）/
+        'limit'（件数上限）/ 'error'（取得失敗）
+        """
         
         page = 1
         total_scraped = 0
         
+        if state:
+            if state.is_category_done(category_url):
+                return 'end'
+            page = state.last_page(category_url) + 1
+            total_scraped = state.record_count(category_url)
+        
         while True:
             if limit and total_scraped >= limit:
-                break
+                return 'limit'
             
-            # ページネーション対応
-            if '?' in category_url:
-                page_url = f"{category_url}&page={page}"
-            else:
-                page_url = f"{category_url}?page={page}"
+            page_url = self._page_url(category_url, page)
             
             try:
                 time.sleep(self.delay_seconds)
-                response = self.session.get(page_url)
+                response = timed_get(self.session, page_url, self.metrics)
                 
                 if response.status_code != 200:
-                    break
+                    return 'error'
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
+                company_list, has_next = self._parse_listing_page(response.content)
                 
-                # 企業リストを探す
-                company_items = soup.find_all('div', class_='company-item')
-                if not company_items:
-                    company_items = soup.find_all('article', class_='company')
-                if not company_items:
-                    company_items = soup.find_all('li', class_='company-list-item')
+                if not company_list:
+                    # 最終ページとは限らないので取得済みにはしない（再開時に取り直す）
+                    return 'empty'
                 
-                if not company_items:
-                    break
+                if known_urls is not None and all(
+                    company_data.get('yuryoweb_url') in known_urls
+                    for company_data in company_list
+                ):
+                    return 'known'
                 
-                for item in company_items:
-                    if limit and total_scraped >= limit:
-                        break
-                    
-                    company_data = self._extract_company_info(item)
-                    if company_data:
-                        company_data['category_group'] = category_group
-                        company_data['category_name'] = category_name
-                        yield company_data
-                        total_scraped += 1
+                # 件数上限で途中まで取ったページは、再開時に取り直すよう記録しない
+                truncated = bool(limit) and len(company_list) > limit - total_scraped
+                if truncated:
+                    company_list = company_list[:limit - total_scraped]
+                for company_data in company_list:
+                    company_data['category_group'] = category_group
+                    company_data['category_name'] = category_name
                 
-                # 次のページがあるか確認
-                next_link = soup.find('a', text=re.compile(r'次|next|→', re.I))
-                if not next_link:
-                    pagination = soup.find('nav', class_='pagination')
-                    if pagination:
-                        current = pagination.find('span', class_='current')
-                        if current:
-                            next_sibling = current.find_next_sibling('a')
-                            if not next_sibling:
-                                break
-                        else:
-                            break
-                    else:
-                        break
+                if state and not truncated:
+                    state.save_page(category_url, page, company_list)
+                
+                for company_data in company_list:
+                    yield company_data
+                    total_scraped += 1
+                
+                if truncated:
+                    return 'limit'
+                if not has_next:
+                    if state:
+                        state.finish_category(category_url)
+                    return 'end'
                 
                 page += 1
                 
             except Exception as e:
                 print(f"Error scraping page {page}: {e}")
+                return 'error'
+    
+    def crawl_categories(
+        self,
+        categories: List[Dict],
+        concurrency: int = 8,
+        rate_per_host: float = 2.0,
+        burst: Optional[float] = None,
+        page_window: int = 3,
+        limit: Optional[int] = None,
+        timeout: float = 30.0,
+        state: Optional[CrawlState] = None
+    ) -> Generator[Dict, None, None]:
+        """複数カテゴリを並行取得（asyncio版）
+        
+        categories は {'group', 'name', 'url'} の辞書リスト。
+        固定sleepの代わりにホスト単位のトークンバケットで流量を制限し、
+        各カテゴリ内では page_window ページずつ先読みする。
+        返すレコードは scrape_category と同じ形式（カテゴリ間の順序は不定）。
+        state を渡すと scrape_category と同様に途中から再開できる。
+        """
+        # 並列数に合わせてコネクションプールを拡張
+        self._mount_adapters(max(10, concurrency))
+        
+        batches = queue.Queue(maxsize=concurrency * 4)
+        stop = threading.Event()
+        
+        def run():
+            try:
+                asyncio.run(self._crawl_categories_async(
+                    categories, batches, stop, concurrency,
+                    HostRateLimiter(rate_per_host, burst),
+                    page_window, limit, timeout, state
+                ))
+            except Exception as e:
+                print(f"Error in async crawl: {e}")
+            finally:
+                batches.put(None)
+        
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    break
+                yield from batch
+        finally:
+            # 呼び出し側が途中で止めた場合もワーカーを終了させる
+            stop.set()
+            while worker.is_alive():
+                try:
+                    batches.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+    
+    async def _crawl_categories_async(
+        self, categories, batches, stop, concurrency, limiter, page_window, limit, timeout, state
+    ):
+        """全カテゴリのクロールタスクを起動（stop が立ったら残りのタスクを取り消す）"""
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [
+            asyncio.create_task(self._crawl_category_async(
+                category, batches, stop, semaphore, limiter, page_window, limit, timeout, state
+            ))
+            for category in categories
+        ]
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=self.STOP_POLL_SECONDS)
+            if stop.is_set():
+                for task in pending:
+                    task.cancel()
                 break
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+    
+    async def _crawl_category_async(
+        self, category, batches, stop, semaphore, limiter, page_window, limit, timeout, state
+    ):
+        """1カテゴリを page_window ページずつ先読みしながら取得"""
+        category_url = category['url']
+        page = 1
+        total_scraped = 0
+        
+        if state:
+            if state.is_category_done(category_url):
+                return
+            page = state.last_page(category_url) + 1
+            total_scraped = state.record_count(category_url)
+        
+        while not stop.is_set():
+            if limit and total_scraped >= limit:
+                return
+            
+            page_numbers = list(range(page, page + max(1, page_window)))
+            contents = await asyncio.gather(*(
+                self._fetch_page_async(self._page_url(category_url, p), stop, semaphore, limiter, timeout)
+                for p in page_numbers
+            ))
+            
+            for page_number, content in zip(page_numbers, contents):
+                if content is None:
+                    return
+                
+                company_list, has_next = await asyncio.to_thread(
+                    self._parse_listing_page, content
+                )
+                if not company_list:
+                    # scrape_category と同じく、最終ページとは限らないので取得済みにはしない
+                    return
+                
+                # 件数上限で途中まで取ったページは、再開時に取り直すよう記録しない
+                truncated = bool(limit) and len(company_list) > limit - total_scraped
+                if truncated:
+                    company_list = company_list[:limit - total_scraped]
+                for company_data in company_list:
+                    company_data['category_group'] = category.get('group', '')
+                    company_data['category_name'] = category.get('name', '')
+                total_scraped += len(company_list)
+                
+                if state and not truncated:
+                    await asyncio.to_thread(state.save_page, category_url, page_number, company_list)
+                await asyncio.to_thread(batches.put, company_list)
+                
+                if truncated:
+                    return
+                if not has_next:
+                    if state:
+                        await asyncio.to_thread(state.finish_category, category_url)
+                    return
+                if (limit and total_scraped >= limit) or stop.is_set():
+                    return
+            
+            page += len(page_numbers)
+    
+    async def _fetch_page_async(self, page_url, stop, semaphore, limiter, timeout) -> Optional[bytes]:
+        """1ページ取得（200以外・エラー時・停止要求時はNone）"""
+        async with semaphore:
+            if stop.is_set():
+                return None
+            await limiter.acquire_async(page_url)
+            if stop.is_set():
+                return None
+            try:
+                response = await asyncio.to_thread(
+                    timed_get, self.session, page_url, self.metrics, timeout=timeout
+                )
+            except Exception as e:
+                print(f"Error fetching {page_url}: {e}")
+                return None
+        
+        if response.status_code != 200:
+            return None
+        return response.content
+    
+    def _page_url(self, category_url: str, page: int) -> str:
+        """ページネーション付きURLを作成"""
+        if '?' in category_url:
+            return f"{category_url}&page={page}"
+        return f"{category_url}?page={page}"
+    
+    def _parse_listing_page(self, content: bytes) -> Tuple[List[Dict], bool]:
+        """一覧ページから企業情報と次ページの有無を取得（1回の走査）
+        
+        企業アイテムとページネーション以外は木を作らない。
+        """
+        if not self.metrics:
+            soup = make_soup(content, self.parser, parse_only=LISTING_STRAINER)
+            return parse_listing(soup, self.base_url)
+        
+        with self.metrics.timer('parse'):
+            soup = make_soup(content, self.parser, parse_only=LISTING_STRAINER)
+        with self.metrics.timer('extract'):
+            result = parse_listing(soup, self.base_url)
+        self.metrics.item_done()
+        return result
+    
+    def _parse_listing_page_legacy(self, content: bytes) -> Tuple[List[Dict], bool]:
+        """旧実装（セレクタごとの find_all と項目ごとの find）。比較・ベンチマーク用"""
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        # 企業リストを探す
+        company_items = soup.find_all('div', class_='company-item')
+        if not company_items:
+            company_items = soup.find_all('article', class_='company')
+        if not company_items:
+            company_items = soup.find_all('li', class_='company-list-item')
+        
+        company_list = []
+        for item in company_items:
+            company_data = self._extract_company_info(item)
+            if company_data:
+                company_list.append(company_data)
+        
+        return company_list, self._has_next_page(soup)
+    
+    def _has_next_page(self, soup) -> bool:
+        """次のページがあるか確認"""
+        next_link = soup.find('a', text=re.compile(r'次|next|→', re.I))
+        if next_link:
+            return True
+        
+        pagination = soup.find('nav', class_='pagination')
+        if not pagination:
+            return False
+        
+        current = pagination.find('span', class_='current')
+        if not current:
+            return False
+        
+        return current.find_next_sibling('a') is not None
     
     def _extract_company_info(self, element) -> Optional[Dict]:
         """企業情報を抽出"""
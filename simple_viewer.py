@@ -2,14 +2,12 @@
 """
 シンプルなデータビューア（標準ライブラリのみ使用）
 """
-import http.server
-import socketserver
-import json
-import csv
-import os
 from urllib.parse import parse_qs, urlparse
 
-class DataHandler(http.server.SimpleHTTPRequestHandler):
+from data_index import get_index, resolve_data_file
+from viewer_http import ViewerRequestHandler, derived_etag, serve
+
+class DataHandler(ViewerRequestHandler):
     def do_GET(self):
         if self.path == '/' or self.path == '/index.html':
             self.serve_html()
@@ -376,43 +374,18 @@ class DataHandler(http.server.SimpleHTTPRequestHandler):
     
     def serve_data(self):
         """JSONデータを提供"""
-        csv_file = 'yuryoweb_complete_with_contact_20250814_005638.csv'
-        
-        if not os.path.exists(csv_file):
-            csv_file = 'yuryoweb_final_complete_20250814_001100.csv'
-        
         try:
-            data = []
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    data.append(row)
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.end_headers()
-            self.wfile.write(json.dumps(data[:500], ensure_ascii=False).encode('utf-8'))
+            index = get_index()
+            etag = derived_etag(index.etag, 'head500')
+            if self.not_modified(etag):
+                return
+            self.send_json(index.rows[:500], etag=etag)
         except Exception as e:
             self.send_error(500, str(e))
     
     def serve_download(self):
-        """CSVダウンロード"""
-        csv_file = 'yuryoweb_complete_with_contact_20250814_005638.csv'
-        
-        if not os.path.exists(csv_file):
-            csv_file = 'yuryoweb_final_complete_20250814_001100.csv'
-        
-        if os.path.exists(csv_file):
-            with open(csv_file, 'rb') as f:
-                content = f.read()
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'text/csv')
-            self.send_header('Content-Disposition', 'attachment; filename="yuryoweb_data.csv"')
-            self.end_headers()
-            self.wfile.write(content)
-        else:
-            self.send_error(404, "File not found")
+        """CSVダウンロード（ファイルをそのままソケットへ流す）"""
+        self.send_download(resolve_data_file(), 'yuryoweb_data.csv')
 
 def main():
     PORT = 8080
@@ -426,8 +399,7 @@ def main():
     print(f"\nCtrl+C で終了")
     print("="*60)
     
-    with socketserver.TCPServer(("", PORT), DataHandler) as httpd:
-        httpd.serve_forever()
+    serve(PORT, DataHandler)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
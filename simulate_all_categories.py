@@ -2,12 +2,40 @@
 """
 全カテゴリ（地域・価格・特徴）のデータを取得してマージ
 """
+from scraper.dedup import dedup_key
 from scraper.yuryoweb_scraper import YuryoWebScraper
-import json
-import csv
+from scraper.sink import JsonlSink, load_records
+import os
 from datetime import datetime
 from collections import defaultdict
 
+def add_record(companies, record):
+    """1レコードを企業ごとの集計に反映（URLの正規化キーで同一企業をまとめる）"""
+    key = dedup_key(record)
+    if key is None:
+        return
+    
+    company = companies[key]
+    company['company_name'] = record.get('company_name', '')
+    company['official_site_url'] = record['official_site_url'].strip()
+    company['yuryoweb_url'] = record.get('yuryoweb_url', '')
+    
+    address = record.get('address', '').strip()
+    if address:
+        company['addresses'].add(address)
+    
+    category_group = record.get('category_group', '')
+    category_name = record.get('category_name', '')
+    
+    if category_group == 'area':
+        company['area_categories'].add(category_name)
+    elif category_group == 'price':
+        company['price_categories'].add(category_name)
+    elif category_group == 'feature':
+        company['feature_categories'].add(category_name)
+    elif category_group == 'industry':
+        company['industry_categories'].add(category_name)
+
 def fetch_all_categories_and_merge():
     """全カテゴリを取得してマージ"""
     
@@ -16,15 +44,30 @@ def fetch_all_categories_and_merge():
     print(f"開始時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*80)
     
+    # ユニーク企業を集計（レコードは保持せず逐次反映する）
+    companies = defaultdict(lambda: {
+        'company_name': '',
+        'official_site_url': '',
+        'yuryoweb_url': '',
+        'addresses': set(),
+        'area_categories': set(),
+        'price_categories': set(),
+        'feature_categories': set(),
+        'industry_categories': set()
+    })
+    total_count = 0
+    
     # 既存の業種データを読み込み
     print("\n既存の業種データを読み込み中...")
-    industry_data = []
+    industry_count = 0
     try:
-        with open('industry_all_complete_20250813_233813.json', 'r', encoding='utf-8') as f:
-            industry_data = json.load(f)
-        print(f"  業種データ: {len(industry_data):,}件")
+        for record in load_records('industry_all_complete_20250813_233813.json'):
+            add_record(companies, record)
+            industry_count += 1
+        print(f"  業種データ: {industry_count:,}件")
     except Exception as e:
         print(f"  エラー: {e}")
+    total_count += industry_count
     
     # スクレイパー初期化
     print("\nスクレイパーを初期化中...")
@@ -34,8 +77,9 @@ def fetch_all_categories_and_merge():
     print("カテゴリ情報を取得中...")
     categories = scraper.fetch_categories()
     
-    all_data = industry_data.copy()
-    new_data = []
+    # 新規取得分はJSONLへ逐次書き出す
+    test_file = f"test_all_categories_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    sink = JsonlSink(test_file, append=False)
     
     # 地域、価格、特徴カテゴリのデータを取得（サンプル）
     for group_name in ['area', 'price', 'feature']:
@@ -55,8 +99,8 @@ def fetch_all_categories_and_merge():
                     category_group=group_name,
                     category_name=category['name']
                 ):
-                    new_data.append(data)
-                    all_data.append(data)
+                    sink.write(data)
+                    add_record(companies, data)
                     count += 1
                 
                 print(f"{count}件")
@@ -64,56 +108,20 @@ def fetch_all_categories_and_merge():
             except Exception as e:
                 print(f"エラー: {e}")
     
-    print(f"\n新規取得: {len(new_data)}件")
-    print(f"全データ: {len(all_data)}件")
+    sink.close()
+    total_count += sink.count
     
-    # ユニーク企業を集計
-    companies = defaultdict(lambda: {
-        'company_name': '',
-        'official_site_url': '',
-        'yuryoweb_url': '',
-        'addresses': set(),
-        'area_categories': set(),
-        'price_categories': set(),
-        'feature_categories': set(),
-        'industry_categories': set()
-    })
-    
-    for record in all_data:
-        url = record.get('official_site_url', '').strip()
-        if not url:
-            continue
-        
-        company = companies[url]
-        company['company_name'] = record.get('company_name', '')
-        company['official_site_url'] = url
-        company['yuryoweb_url'] = record.get('yuryoweb_url', '')
-        
-        address = record.get('address', '').strip()
-        if address:
-            company['addresses'].add(address)
-        
-        category_group = record.get('category_group', '')
-        category_name = record.get('category_name', '')
-        
-        if category_group == 'area':
-            company['area_categories'].add(category_name)
-        elif category_group == 'price':
-            company['price_categories'].add(category_name)
-        elif category_group == 'feature':
-            company['feature_categories'].add(category_name)
-        elif category_group == 'industry':
-            company['industry_categories'].add(category_name)
+    print(f"\n新規取得: {sink.count}件")
+    print(f"全データ: {total_count}件")
     
     print(f"\nユニーク企業数: {len(companies):,}社")
     print(f"目標（11,341社）との差: {11341 - len(companies):+,}社")
     
-    # テスト用JSONを保存
-    if new_data:
-        test_file = f"test_all_categories_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(test_file, 'w', encoding='utf-8') as f:
-            json.dump(new_data, f, ensure_ascii=False, indent=2)
+    # テスト用JSONLを保存
+    if sink.count:
         print(f"\nテストデータ保存: {test_file}")
+    else:
+        os.remove(test_file)
     
     return len(companies)
 
@@ -7,36 +7,7 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 
-# 問い合わせ関連のキーワード
-CONTACT_KEYWORDS = [
-    'contact', 'inquiry', 'form', '問い合わせ', 'お問い合わせ', '問合せ', '問合わせ',
-    'toiawase', 'otoiawase', 'mail', 'メール', 'フォーム', '相談', 'soudan',
-    '見積', 'estimate', 'mitsumori', '資料請求', 'request', '申し込み', 'apply',
-    'support', 'サポート', 'ご相談', 'ご質問', 'question'
-]
-
-# 除外するキーワード
-EXCLUDE_KEYWORDS = [
-    'privacy', 'policy', 'terms', 'プライバシー', '規約', '利用規約',
-    'sitemap', 'サイトマップ', 'recruit', '採用', 'career', 'login', 'ログイン'
-]
-
-def is_contact_url(url, text=''):
-    """URLや付随テキストが問い合わせ関連か判定"""
-    url_lower = url.lower()
-    text_lower = text.lower()
-    
-    # 除外キーワードチェック
-    for keyword in EXCLUDE_KEYWORDS:
-        if keyword in url_lower or keyword in text_lower:
-            return False
-    
-    # 問い合わせキーワードチェック
-    for keyword in CONTACT_KEYWORDS:
-        if keyword in url_lower or keyword in text_lower:
-            return True
-    
-    return False
+from scraper.contact_engine import is_contact_url
 
 def extract_contact_urls(site_url):
     """1つのサイトから問い合わせURLを詳細抽出"""
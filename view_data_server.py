@@ -2,11 +2,12 @@
 """
 データ閲覧用簡易Webサーバー
 """
-from flask import Flask, render_template_string, send_file, jsonify
-import pandas as pd
+from flask import Flask, render_template_string, send_file, jsonify, request
 import os
 from datetime import datetime
 
+from data_index import get_index, parse_filters
+
 app = Flask(__name__)
 
 # HTMLテンプレート
@@ -288,23 +289,16 @@ HTML_TEMPLATE = '''
 @app.route('/')
 def index():
     """メインページ"""
-    # 最新のCSVファイルを読み込み
-    csv_file = 'yuryoweb_complete_with_contact_20250814_005638.csv'
-    
-    if not os.path.exists(csv_file):
-        # 代替ファイル
-        csv_file = 'yuryoweb_final_complete_20250814_001100.csv'
-    
     try:
-        df = pd.read_csv(csv_file)
+        # 共有の索引（CSVは初回とファイル更新時にだけ読む）
+        data = get_index()
         
         # 統計情報
-        total = len(df)
-        with_contact = df['contact_url'].notna().sum() if 'contact_url' in df.columns else 0
+        total = len(data)
+        with_contact = data.counts['contact_url']
         rate = round(with_contact / total * 100, 1) if total > 0 else 0
         
-        # DataFrameをdictに変換
-        companies = df.fillna('').to_dict('records')
+        companies = data.rows
         
         return render_template_string(
             HTML_TEMPLATE,
@@ -332,27 +326,33 @@ def download():
 @app.route('/api/stats')
 def api_stats():
     """統計情報API"""
-    csv_file = 'yuryoweb_complete_with_contact_20250814_005638.csv'
-    
-    if not os.path.exists(csv_file):
-        csv_file = 'yuryoweb_final_complete_20250814_001100.csv'
-    
     try:
-        df = pd.read_csv(csv_file)
+        data = get_index()
         
         stats = {
-            'total_companies': len(df),
-            'with_contact': df['contact_url'].notna().sum() if 'contact_url' in df.columns else 0,
-            'with_area': df['area_categories'].notna().sum() if 'area_categories' in df.columns else 0,
-            'with_price': df['price_categories'].notna().sum() if 'price_categories' in df.columns else 0,
-            'with_feature': df['feature_categories'].notna().sum() if 'feature_categories' in df.columns else 0,
-            'with_industry': df['industry_categories'].notna().sum() if 'industry_categories' in df.columns else 0,
+            'total_companies': len(data),
+            'with_contact': data.counts['contact_url'],
+            'with_area': data.counts['area_categories'],
+            'with_price': data.counts['price_categories'],
+            'with_feature': data.counts['feature_categories'],
+            'with_industry': data.counts['industry_categories'],
         }
         
         return jsonify(stats)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/facets')
+def api_facets():
+    """カテゴリ別件数API（search / contact_only / カテゴリ列で絞り込んだ条件での件数）"""
+    try:
+        params = request.args.to_dict(flat=False)
+        search = request.args.get('search', '')
+        contact_only = request.args.get('contact_only', 'false') == 'true'
+        return jsonify(get_index().facet_counts(search, contact_only, parse_filters(params)))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
     print("="*60)
     print("優良WEB データビューアー")
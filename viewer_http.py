@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+データビューア共通のHTTP処理（スレッド並列サーバー・gzip/ETag付きJSON・sendfile/ストリーミングによるダウンロード）
+"""
+import gzip
+import hashlib
+import http.server
+import json
+import os
+
+# これより小さいJSONは圧縮しない（ヘッダーの方が大きくなる）
+GZIP_MIN_SIZE = 1024
+
+
+def file_etag(path: str) -> str:
+    """ファイルの更新時刻とサイズから作るETag"""
+    stat = os.stat(path)
+    return '"%x-%x"' % (stat.st_size, stat.st_mtime_ns)
+
+
+def derived_etag(base: str, *parts: str) -> str:
+    """元データのETagと問い合わせ内容から作るETag（同じデータ・同じ条件なら同じ値）"""
+    digest = hashlib.sha1('\n'.join((base,) + parts).encode('utf-8')).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+class ViewerRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """ビューア用ハンドラーの共通部分
+
+    - JSONは Accept-Encoding に gzip があれば圧縮して返す
+    - ETag が If-None-Match と一致すれば本文を作らずに 304 を返す
+    - ファイルは読み込まずに sendfile でソケットへ直接流す
+    """
+
+    def not_modified(self, etag: str) -> bool:
+        """If-None-Match が etag と一致すれば 304 を送って True を返す"""
+        header = self.headers.get('If-None-Match', '')
+        tags = [tag.strip() for tag in header.split(',')]
+        if etag not in tags and '*' not in tags:
+            return False
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.end_headers()
+        return True
+
+    def accepts_gzip(self) -> bool:
+        return 'gzip' in self.headers.get('Accept-Encoding', '').lower()
+
+    def send_json(self, data, etag: str = None, cors: bool = False):
+        """JSONを返す（etag を渡すとキャッシュ検証に使えるようにする）"""
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        encoded = len(body) >= GZIP_MIN_SIZE and self.accepts_gzip()
+        if encoded:
+            body = gzip.compress(body, compresslevel=5)
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoded:
+            self.send_header('Content-Encoding', 'gzip')
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if cors:
+            self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_download(self, path: str, filename: str, content_type: str = 'text/csv; charset=utf-8'):
+        """ファイルを添付ファイルとして返す（メモリに読み込まない）"""
+        if not os.path.exists(path):
+            self.send_error(404, "File not found")
+            return
+
+        etag = file_etag(path)
+        if self.not_modified(etag):
+            return
+
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self.send_response(200)
+            self.send_header('Content-type', content_type)
+            self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+            self.send_header('Content-Length', str(size))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.flush()
+            # os.sendfile が使えないソケットでは socket.sendfile が send() に切り替える
+            self.connection.sendfile(f)
+
+    def send_stream(self, chunks, filename: str, content_type: str):
+        """長さの分からない本文を添付ファイルとして少しずつ返す（送り終えたら接続を閉じる）"""
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        for chunk in chunks:
+            self.wfile.write(chunk)
+
+
+class ViewerServer(http.server.ThreadingHTTPServer):
+    """リクエストごとにスレッドで処理するサーバー（遅いダウンロードが他の閲覧を止めない）"""
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def serve(port: int, handler):
+    """port で handler を並列処理するサーバーを起動する"""
+    with ViewerServer(("", port), handler) as httpd:
+        httpd.serve_forever()